@@ -0,0 +1,302 @@
+import base_vendas
+import conexao_oracle
+import dimensoes
+import jobs
+import temporario
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime, timedelta
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import threading
+import time
+
+# --- AGENDADOR DE EXTRAÇÕES (DAG) ---
+# Cada nó declara o que lê (arquivos de entrada) e o que grava (saídas); as arestas saem
+# do casamento entradas x saídas. Ramos independentes rodam em paralelo e um nó é pulado
+# quando a assinatura (SQL/código + impressão digital das entradas) não mudou desde a
+# última execução bem-sucedida. Nós que leem do Winthor também vencem após VALIDADE_HORAS,
+# já que a mudança nas tabelas de origem não é visível daqui.
+
+ARQUIVO_ESTADO = 'estado_agendador.json'
+DIRETORIO = os.path.dirname(os.path.abspath(__file__))
+VALIDADE_HORAS = float(os.getenv('AGENDADOR_VALIDADE_HORAS', '12'))
+
+_trava_estado = threading.Lock()
+
+
+def _executar_painel_vendas(pool):
+    # Fatos pela marca d'água incremental; dimensões só gravam o que mudou. As extrações pegam
+    # sessões do pool do agendador: somadas às dos outros ramos, nunca passam de --paralelo
+    args = temporario.criar_parser().parse_args(['--incremental', '--dimensoes-delta', '--paralelo', str(pool.max)])
+    falhas = temporario.executar_em_paralelo(args, pool)
+    if falhas:
+        raise RuntimeError(f"falha em {', '.join(sorted(falhas))}")
+
+
+def _executar_verba_unificada():
+    import analise_verba_unificada
+    if analise_verba_unificada.gerar_verba_unificada().empty:
+        raise RuntimeError('verbas unificadas vazias')
+
+
+def _no_de_job(nome, job):
+    codigo = [inspect.getsourcefile(job['pos'])] if job.get('pos') else []
+    return {
+        'descricao': job['descricao'],
+        'entradas': [],
+        'saidas': list(job['saidas']),
+        # Binds resolvidos: uma janela móvel que andou (ex. novo dia) é uma versão nova
+        'versao': job['sql'] + repr(jobs.parametros(nome)),
+        'codigo': codigo,
+        'banco': True,
+        'ativo': job.get('ativo', True),
+        'executar': lambda conexao: jobs.executar_job(nome, conexao),
+    }
+
+
+NOS = {nome: _no_de_job(nome, job) for nome, job in jobs.JOBS.items()}
+NOS.update({
+    'painel_vendas': {
+        'descricao': 'Dimensões e fatos do painel de vendas (temporario.py)',
+        'entradas': [],
+        'saidas': list(temporario.queries),
+        'versao': ''.join(temporario.queries.values()) + repr(temporario.FATIADOS) + repr(temporario.PARAMETROS),
+        'codigo': [],
+        'banco': True,
+        'ativo': True,
+        # Recebe o pool do agendador em vez de uma conexão: distribui as fatias por ele
+        'executar': lambda pool: _executar_painel_vendas(pool),
+        'usa_pool': True,
+    },
+    'base_vendas': {
+        'descricao': 'Base de vendas preparada em Arrow IPC mapeado pelos painéis (vendas.py)',
+        # Deltas de dimensão mudam a base sem mexer no arquivo da dimensão
+        'entradas': [base_vendas.CAMINHO_FATO_VENDA] + base_vendas.ARQUIVOS_DIM
+                    + [dimensoes.caminho_deltas(dim) for dim in base_vendas.ARQUIVOS_DIM],
+        'saidas': [base_vendas.ARQUIVO_PONTEIRO, base_vendas.ARQUIVO_CUBO],
+        'versao': '',
+        'codigo': [os.path.join(DIRETORIO, 'base_vendas.py')],
+        'banco': False,
+        'ativo': True,
+        'executar': lambda conexao: base_vendas.garantir(),
+    },
+    'verba_unificada': {
+        'descricao': 'Verbas de acompanhamento + devolução pendentes',
+        'entradas': [
+            'dados_acompanhamento_verba.csv', 'dados_acompanhamento_verba.parquet',
+            'dados_acompanhamento_verba_devolucao.csv', 'dados_acompanhamento_verba_devolucao.parquet',
+        ],
+        'saidas': ['dados_verbas_unificadas.csv'],
+        'versao': '',
+        'codigo': [os.path.join(DIRETORIO, arquivo) for arquivo in
+                   ('analise_verba_unificada.py', 'analise_verba.py', 'analise_verba_devolucao.py')],
+        'banco': False,
+        # Sob demanda como os jobs de verba de que depende (jobs.py): rodar por padrão puxaria as duas extrações
+        'ativo': False,
+        'executar': lambda conexao: _executar_verba_unificada(),
+    },
+})
+
+
+def dependencias(nos=NOS):
+    """{no: conjunto de nós que gravam alguma das suas entradas}."""
+    produtor = {saida: nome for nome, no in nos.items() for saida in no['saidas']}
+    return {
+        nome: {produtor[entrada] for entrada in no['entradas'] if entrada in produtor and produtor[entrada] != nome}
+        for nome, no in nos.items()
+    }
+
+
+def fechar_alvos(alvos, deps):
+    """Alvos pedidos mais tudo o que está acima deles no grafo."""
+    selecionados = set()
+    pilha = list(alvos)
+    while pilha:
+        nome = pilha.pop()
+        if nome not in selecionados:
+            selecionados.add(nome)
+            pilha.extend(deps[nome])
+    return selecionados
+
+
+def abaixo_de(nomes, deps):
+    """Nós que dependem, direta ou indiretamente, de algum dos nomes."""
+    resultado = set(nomes)
+    mudou = True
+    while mudou:
+        mudou = False
+        for nome, anteriores in deps.items():
+            if nome not in resultado and anteriores & resultado:
+                resultado.add(nome)
+                mudou = True
+    return resultado
+
+
+def impressao_digital(caminho):
+    """Tamanho + mtime de um arquivo, ou de todos os arquivos de um dataset particionado."""
+    if os.path.isdir(caminho):
+        itens = []
+        for raiz, _, arquivos in os.walk(caminho):
+            for nome in sorted(arquivos):
+                completo = os.path.join(raiz, nome)
+                info = os.stat(completo)
+                itens.append(f'{os.path.relpath(completo, caminho)}:{info.st_size}:{info.st_mtime_ns}')
+        return '|'.join(sorted(itens))
+    if os.path.exists(caminho):
+        info = os.stat(caminho)
+        return f'{info.st_size}:{info.st_mtime_ns}'
+    return None
+
+
+def assinatura(no):
+    h = hashlib.sha1(no['versao'].encode('utf-8'))
+    for arquivo in no['codigo']:
+        with open(arquivo, 'rb') as f:
+            h.update(f.read())
+    for entrada in no['entradas']:
+        h.update(f'{entrada}={impressao_digital(entrada)}'.encode('utf-8'))
+    return h.hexdigest()
+
+
+def _ler_estado():
+    if not os.path.exists(ARQUIVO_ESTADO):
+        return {}
+    with open(ARQUIVO_ESTADO, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def ler_estado():
+    with _trava_estado:
+        return _ler_estado()
+
+
+def gravar_estado(nome, assinatura_no):
+    with _trava_estado:
+        estado = _ler_estado()
+        estado[nome] = {'assinatura': assinatura_no, 'concluido_em': datetime.now().isoformat(timespec='seconds')}
+        temporario_estado = ARQUIVO_ESTADO + '.tmp'
+        with open(temporario_estado, 'w', encoding='utf-8') as f:
+            json.dump(estado, f, indent=2, ensure_ascii=False)
+        os.replace(temporario_estado, ARQUIVO_ESTADO)
+
+
+def motivo_para_rodar(nome, no, estado, validade_horas=VALIDADE_HORAS):
+    """None quando o nó está em dia; senão, o motivo para executá-lo."""
+    anterior = estado.get(nome)
+    if anterior is None:
+        return 'nunca executado'
+    if any(not os.path.exists(saida) for saida in no['saidas']):
+        return 'saída ausente'
+    if anterior['assinatura'] != assinatura(no):
+        return 'SQL, código ou entradas mudaram'
+    if no['banco'] and datetime.now() - datetime.fromisoformat(anterior['concluido_em']) > timedelta(hours=validade_horas):
+        return f'dados do banco com mais de {validade_horas:g}h'
+    return None
+
+
+def executar_no(nome, no, pool):
+    assinatura_no = assinatura(no)
+    if no.get('usa_pool'):
+        inicio = time.perf_counter()
+        no['executar'](pool)
+        resultado = (nome, inicio, time.perf_counter())
+    elif no['banco']:
+        resultado = conexao_oracle.executar_tarefa(pool, nome, no['executar'])
+    else:
+        inicio = time.perf_counter()
+        no['executar'](None)
+        resultado = (nome, inicio, time.perf_counter())
+    # Assinatura tirada antes de rodar: se uma entrada mudar durante a execução, a próxima rodada refaz o nó
+    gravar_estado(nome, assinatura_no)
+    return resultado
+
+
+def executar(alvos=None, paralelo=jobs.MAX_CONEXOES, forcar=(), validade_horas=VALIDADE_HORAS):
+    """Roda o grafo: o que está em dia é pulado, o resto roda assim que as dependências terminam.
+
+    Devolve o conjunto de nós que falharam ou ficaram bloqueados por uma falha acima.
+    """
+    deps = dependencias()
+    desconhecidos = [nome for nome in list(alvos or []) + list(forcar) if nome not in NOS]
+    if desconhecidos:
+        raise KeyError(f"Nó(s) desconhecido(s): {', '.join(desconhecidos)}. Use --listar.")
+    selecionados = fechar_alvos(alvos or [n for n, no in NOS.items() if no['ativo']], deps)
+    forcados = abaixo_de(forcar, deps) & selecionados
+
+    inicio_execucao = time.perf_counter()
+    tempos = []
+    concluidos, falhas, pulados = set(), set(), set()
+    pendentes = set(selecionados)
+    em_execucao = {}
+    precisa_pool = any(NOS[n]['banco'] for n in selecionados)
+    pool = conexao_oracle.criar_pool(paralelo) if precisa_pool else None
+
+    try:
+        with ThreadPoolExecutor(max_workers=paralelo) as executor:
+            while pendentes or em_execucao:
+                estado = ler_estado()
+                for nome in sorted(pendentes):
+                    if deps[nome] & falhas:
+                        falhas.add(nome)
+                        pendentes.discard(nome)
+                        print(f'[x] {nome}: bloqueado por falha acima')
+                        continue
+                    if not (deps[nome] & selecionados) <= concluidos | pulados:
+                        continue
+                    pendentes.discard(nome)
+                    # Rodou algo acima: as entradas mudaram e a assinatura vai acusar
+                    motivo = 'forçado' if nome in forcados else motivo_para_rodar(nome, NOS[nome], estado, validade_horas)
+                    if motivo is None:
+                        pulados.add(nome)
+                        print(f'[=] {nome}: em dia, pulado')
+                        continue
+                    print(f'[>] {nome}: {motivo}')
+                    em_execucao[executor.submit(executar_no, nome, NOS[nome], pool)] = nome
+
+                if not em_execucao:
+                    continue
+                prontos, _ = wait(em_execucao, return_when=FIRST_COMPLETED)
+                for futuro in prontos:
+                    nome = em_execucao.pop(futuro)
+                    try:
+                        tempos.append(futuro.result())
+                        concluidos.add(nome)
+                    except Exception as e:
+                        falhas.add(nome)
+                        print(f'[!] Erro em {nome}: {conexao_oracle.descrever_erro(e)}')
+    finally:
+        if pool is not None:
+            pool.close()
+
+    conexao_oracle.imprimir_resumo(tempos, inicio_execucao)
+    print(f'Executados: {len(concluidos)} | pulados (em dia): {len(pulados)} | falhas: {len(falhas)}')
+    return falhas
+
+
+def listar(validade_horas=VALIDADE_HORAS):
+    deps = dependencias()
+    estado = ler_estado()
+    for nome, no in NOS.items():
+        motivo = motivo_para_rodar(nome, no, estado, validade_horas) or 'em dia'
+        depende = f" <- {', '.join(sorted(deps[nome]))}" if deps[nome] else ''
+        ativo = '' if no['ativo'] else ' (sob demanda)'
+        print(f'{nome:<22} [{motivo}]{ativo}{depende}')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Executa as extrações respeitando dependências e pulando o que está em dia.')
+    parser.add_argument('alvos', nargs='*', help='Nós a atualizar (com tudo acima deles). Padrão: todos os ativos.')
+    parser.add_argument('--paralelo', type=int, default=jobs.MAX_CONEXOES, help='Máximo de nós simultâneos (e sessões no pool).')
+    parser.add_argument('--forcar', nargs='*', default=[], help='Refaz estes nós e tudo abaixo deles mesmo se em dia.')
+    parser.add_argument('--validade-horas', type=float, default=VALIDADE_HORAS, help='Idade máxima dos nós que leem do banco.')
+    parser.add_argument('--listar', action='store_true', help='Mostra o grafo e a situação de cada nó.')
+    args = parser.parse_args()
+
+    if args.listar:
+        listar(args.validade_horas)
+    else:
+        falhas = executar(args.alvos, args.paralelo, args.forcar, args.validade_horas)
+        raise SystemExit(1 if falhas else 0)
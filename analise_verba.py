@@ -3,28 +3,44 @@ import streamlit as st
 import plotly.express as px
 from datetime import date
 import numpy as np 
+import os
+import esquemas
+import manifesto
+import cache_compartilhado
 
 # --------------------------------------------------------
 # 1. FUNÇÕES DE PRÉ-PROCESSAMENTO E CÁLCULO DE SALDOS
 # --------------------------------------------------------
 
 DATA_FILE = 'dados_acompanhamento_verba.csv'
+DATA_FILE_TIPADO = 'dados_acompanhamento_verba.parquet'
 
 
 def formatar_moeda(valor):
     return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
 
 
-@st.cache_data
+def versao_verbas():
+    """Chave de conteúdo do extrato (manifesto); muda só quando chega uma extração nova."""
+    return manifesto.chave_cache(DATA_FILE_TIPADO, DATA_FILE)
+
+
+@cache_compartilhado.compartilhado(versao_verbas)
 def carregar_e_analisar_verbas():
-    """Carrega o CSV, faz o pré-processamento e calcula os novos saldos."""
+    """Carrega o extrato (Parquet tipado, ou o CSV como fallback), faz o pré-processamento e calcula os novos saldos.
+
+    Uma base por processo, recarregada quando versao_verbas() muda (cache_compartilhado).
+    """
     try:
-        df = pd.read_csv(
-            DATA_FILE, 
-            sep=';', 
-            decimal=',', 
-            encoding='utf-8-sig'
-        )
+        if os.path.exists(DATA_FILE_TIPADO):
+            df = esquemas.ler_tipado(DATA_FILE_TIPADO)
+        else:
+            df = pd.read_csv(
+                DATA_FILE, 
+                sep=';', 
+                decimal=',', 
+                encoding='utf-8-sig'
+            )
     except FileNotFoundError:
         st.error(f"ERRO: O arquivo '{DATA_FILE}' não foi encontrado.")
         st.stop() 
@@ -52,7 +68,8 @@ def carregar_e_analisar_verbas():
     # Datas
     date_cols = ['DATA_VENCIMENTO', 'DATA_CADASTRO']
     for col in date_cols:
-        df[col] = pd.to_datetime(df[col], errors='coerce', dayfirst=True)
+        if not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col], errors='coerce', dayfirst=True)
 
     df['ANOCADASTRO'] = df['DATA_CADASTRO'].dt.year.fillna(0).astype(int) 
     
@@ -65,9 +82,9 @@ def carregar_e_analisar_verbas():
             df[col] = 0.0 
 
     # Strings
-    df['COMPRADOR'] = df['COMPRADOR'].fillna('NÃO DEFINIDO')
-    df['FORNECEDOR'] = df['FORNECEDOR'].fillna('NÃO DEFINIDO')
-    df['CLASSIFICACAO'] = df['CLASSIFICACAO'].fillna('NÃO CLASSIFICADO')
+    df['COMPRADOR'] = esquemas.preencher_nulos(df['COMPRADOR'], 'NÃO DEFINIDO')
+    df['FORNECEDOR'] = esquemas.preencher_nulos(df['FORNECEDOR'], 'NÃO DEFINIDO')
+    df['CLASSIFICACAO'] = esquemas.preencher_nulos(df['CLASSIFICACAO'], 'NÃO CLASSIFICADO')
     
     # --- 3. CÁLCULO DOS NOVOS PARÂMETROS ---
     
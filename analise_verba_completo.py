@@ -3,6 +3,9 @@ import streamlit as st
 import numpy as np 
 import os
 from typing import List, Union 
+import esquemas
+import manifesto
+import cache_compartilhado
 
 st.set_page_config(
     page_title="Análise de Verbas",
@@ -115,9 +118,23 @@ class DataFremeAggregator:
         return resultado_agregacao
 
 
-@st.cache_data
+def _caminho_tipado(file_path):
+    return os.path.splitext(file_path)[0] + '.parquet'
+
+
+def versao_arquivo(file_path):
+    """Chave de conteúdo (manifesto) do extrato e da sua cópia tipada."""
+    return manifesto.chave_cache(_caminho_tipado(file_path), file_path)
+
+
+# Uma base por extrato no processo, recarregada quando versao_arquivo() muda
+@cache_compartilhado.compartilhado(versao_arquivo)
 def load_data(file_path):
     try:
+        # Prefere a cópia Parquet tipada do extrato, quando existir ao lado do CSV
+        caminho_tipado = _caminho_tipado(file_path)
+        if os.path.exists(caminho_tipado):
+            return esquemas.ler_tipado(caminho_tipado, categorias=False)
         df = pd.read_csv(file_path, sep=';', decimal=',')
         return df
     except FileNotFoundError:
@@ -148,7 +165,8 @@ def main():
         
         # Extração do Ano da Data de Cadastro
         if 'DATACADASTRO' in df.columns:
-            df['DATACADASTRO'] = pd.to_datetime(df['DATACADASTRO'], errors='coerce')
+            if not pd.api.types.is_datetime64_any_dtype(df['DATACADASTRO']):
+                df['DATACADASTRO'] = pd.to_datetime(df['DATACADASTRO'], errors='coerce')
             df['ANO_EMISSAO'] = df['DATACADASTRO'].dt.year.fillna(0).astype(int)
         
         # Prepara df de devolução
@@ -1,18 +1,24 @@
 import pandas as pd
 from datetime import date
+import os
+import esquemas
 
 DATA_FILE_DEVOLUCAO = 'dados_acompanhamento_verba_devolucao.csv'
+DATA_FILE_DEVOLUCAO_TIPADO = 'dados_acompanhamento_verba_devolucao.parquet'
 
 
 def carregar_analisar_verba_devolucao():
 
     try:
-        df = pd.read_csv(
-            DATA_FILE_DEVOLUCAO,
-            sep=';',
-            decimal=',',
-            encoding='utf-8-sig'
-        )
+        if os.path.exists(DATA_FILE_DEVOLUCAO_TIPADO):
+            df = esquemas.ler_tipado(DATA_FILE_DEVOLUCAO_TIPADO, categorias=False)
+        else:
+            df = pd.read_csv(
+                DATA_FILE_DEVOLUCAO,
+                sep=';',
+                decimal=',',
+                encoding='utf-8-sig'
+            )
 
     except FileNotFoundError:
         print(f"ERRO: O arquivo '{DATA_FILE_DEVOLUCAO}' não foi encontrado.")
@@ -20,9 +26,17 @@ def carregar_analisar_verba_devolucao():
 
     # --- Conversão de Datas ---
     # Usando %Y para 4 dígitos do ano, se seus dados estiverem em 20/09/2024 (dia/mês/ano)
-    df['DATA_VENCIMENTO'] = pd.to_datetime(df['DATA_VENCIMENTO'], format='%d/%m/%Y', errors='coerce')
-    df['DATA_EMISSAO'] = pd.to_datetime(df['DTEMISSAO'], format='%d/%m/%Y', errors='coerce')
-    df['DATA_PAGAMENTO'] = pd.to_datetime(df['DATA_PAGAMENTO'], format='%d/%m/%Y', errors='coerce')
+    # O Parquet tipado já traz as datas nativas; só o CSV precisa de parse.
+    def para_data(coluna):
+        if coluna not in df.columns:
+            return pd.Series(pd.NaT, index=df.index)
+        if pd.api.types.is_datetime64_any_dtype(df[coluna]):
+            return df[coluna]
+        return pd.to_datetime(df[coluna], format='%d/%m/%Y', errors='coerce')
+
+    df['DATA_VENCIMENTO'] = para_data('DATA_VENCIMENTO')
+    df['DATA_EMISSAO'] = para_data('DTEMISSAO')
+    df['DATA_PAGAMENTO'] = para_data('DATA_PAGAMENTO')
 
     # --- LÓGICA DE STATUS: QUITADA vs. PENDENTE ---
     # Uma verba é QUITADA se houver uma DATA_PAGAMENTO.
@@ -106,9 +106,21 @@ def resumo_unificado_por_comprador(df: pd.DataFrame) -> pd.DataFrame:
     return df_resumo
 
 
+ARQUIVO_UNIFICADO = 'dados_verbas_unificadas.csv'
+
+
+def gerar_verba_unificada(nome_arquivo=ARQUIVO_UNIFICADO):
+    """Unifica as verbas e grava o CSV consolidado; retorna o DataFrame (vazio se não houver dados)."""
+    df_unificado = criar_verba_unificada()
+    if df_unificado.empty:
+        return df_unificado
+    df_unificado.to_csv(nome_arquivo, index=False, sep=';', encoding='utf-8-sig', decimal=',')
+    return df_unificado
+
+
 if __name__ == '__main__':
     print("--- INICIANDO ANÁLISE DE VERBAS UNIFICADA ---")
-    df_unificado = criar_verba_unificada()
+    df_unificado = gerar_verba_unificada()
     
     if not df_unificado.empty:
         print("Dados Unificados e Processados com sucesso.")
@@ -120,9 +132,8 @@ if __name__ == '__main__':
         df_resumo = resumo_unificado_por_comprador(df_unificado)
         print(df_resumo.head(5))
         
-        # Opcional: Salvar o resultado unificado para uso em um novo dashboard Streamlit
-        df_unificado.to_csv('dados_verbas_unificadas.csv', index=False, sep=';', encoding='utf-8-sig', decimal=',')
-        print("\nArquivo unificado salvo como 'dados_verbas_unificadas.csv'")
+        # Resultado unificado salvo para uso em um novo dashboard Streamlit
+        print(f"\nArquivo unificado salvo como '{ARQUIVO_UNIFICADO}'")
 
     else:
-        print("Análise abortada devido a erro no carregamento ou dados vazios.")
\ No newline at end of file
+        print("Análise abortada devido a erro no carregamento ou dados vazios.")
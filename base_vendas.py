@@ -0,0 +1,371 @@
+import pandas as pd
+import numpy as np
+import pyarrow as pa
+import dimensoes
+import esquemas
+import manifesto
+from datetime import datetime
+import argparse
+import gc
+import glob
+import hashlib
+import json
+import os
+import time
+
+# --- BASE DE VENDAS PREPARADA (Arrow IPC mapeado em memória) ---
+# O fato de vendas tipado e enriquecido com produto/cliente/vendedor é publicado em um arquivo
+# Arrow IPC sem compressão por ano, cada um montado só com a partição ANO= dele (a memória da
+# publicação é a de um ano, não a do histórico). Cada sessão e cada processo do Streamlit abre
+# os anos escolhidos com memory_map e converte para pandas sem cópia (split_blocks) quando é um
+# ano só: as colunas apontam para as páginas do arquivo no cache do sistema operacional,
+# compartilhadas por todos. Os arquivos levam a versão das fontes no nome (um processo pode
+# estar com os anteriores mapeados) e ARQUIVO_PONTEIRO indica a publicação mais recente.
+# Quem publica é o agendador (nó base_vendas) ou esta linha de comando; os painéis só leem.
+
+# Dataset Hive (ANO=/MES=) gerado pelo extrator; também aceita o Parquet monolítico antigo
+CAMINHO_FATO_VENDA = 'fato_venda.parquet'
+ARQUIVOS_DIM = ['dim_produto.parquet', 'dim_cliente.parquet', 'dim_vendedor.parquet']
+PREFIXO_BASE = os.getenv('BASE_VENDAS_PREFIXO', 'base_vendas')
+ARQUIVO_PONTEIRO = PREFIXO_BASE + '.json'
+# Cubo mensal pré-agregado para a visão executiva (mesmas colunas dos filtros do painel)
+ARQUIVO_CUBO = PREFIXO_BASE + '_cubo.parquet'
+DIMENSOES_CUBO = ['ANO', 'MES', 'COD_FILIAL', 'COD_SUPERVISOR', 'nm_vendedor', 'categoria', 'ORIGEM_PEDIDO']
+SEM_CADASTRO = 'NAO CADASTRADO'
+# Códigos acima disso (ou negativos) não entram no vetor denso e contam como sem cadastro
+MAX_CODIGO_DIM = int(os.getenv('BASE_VENDAS_MAX_CODIGO_DIM', '50000000'))
+
+
+def versao_fontes():
+    """Chave de conteúdo do fato e das dimensões usadas na base (manifestos)."""
+    return manifesto.chave_cache(CAMINHO_FATO_VENDA) + tuple(dimensoes.chave_cache(dim) for dim in ARQUIVOS_DIM)
+
+
+def _texto_versao(versao):
+    return json.dumps(list(versao))
+
+
+def carregar_dim(path, id_col, colunas_uteis):
+    if not os.path.exists(path): return pd.DataFrame()
+    df = esquemas.ler_tipado(path, columns=[c.upper() for c in colunas_uteis])
+    df.columns = [c.lower() for c in df.columns]
+    id_col = id_col.lower()
+    df[id_col] = pd.to_numeric(df[id_col], errors='coerce').fillna(0).astype(np.int32)
+    df = df.drop_duplicates(subset=[id_col])
+    # Colunas de dicionário já chegam como category; o texto é normalizado do mesmo jeito
+    for col in df.select_dtypes(include=['object', 'category']).columns:
+        df[col] = df[col].astype(object).fillna('N/I').astype(str).str.strip().str.upper().astype('category')
+    return df
+
+
+# --- CONSULTA ÀS DIMENSÕES POR ÍNDICE ---
+# Cada atributo vira um vetor denso indexado pelo código da dimensão (int32) com o código de
+# categoria do atributo. Anexar ao fato é indexar esse vetor com a coluna de chave: sem merge
+# (que copia todas as colunas do fato e faz hash da chave), sem coluna de chave duplicada e
+# sem recategorizar o texto depois. A última posição do vetor é a de "sem cadastro".
+def consulta_dim(path, id_col, atributos):
+    """{atributo: (vetor código -> código da categoria, categorias)} para anexar_dim."""
+    df = carregar_dim(path, id_col, [id_col] + atributos)
+    ids = df[id_col.lower()].to_numpy() if not df.empty else np.zeros(0, np.int32)
+    validos = (ids >= 0) & (ids <= MAX_CODIGO_DIM)
+    ids = ids[validos]
+    tamanho = int(ids.max()) + 1 if len(ids) else 0
+    consulta = {}
+    for atributo in atributos:
+        valores = pd.Categorical(df[atributo] if not df.empty else [])
+        categorias = valores.categories.union(pd.Index([SEM_CADASTRO]))
+        vetor = np.full(tamanho + 1, categorias.get_loc(SEM_CADASTRO), dtype=np.int32)
+        vetor[ids] = categorias.get_indexer(valores.categories)[valores.codes[validos]]
+        consulta[atributo] = (vetor, categorias)
+    return consulta
+
+
+def anexar_dim(df, chave, consulta):
+    """Acrescenta ao fato os atributos da consulta, indexando pelos códigos em df[chave]."""
+    codigos = df[chave].to_numpy()
+    for atributo, (vetor, categorias) in consulta.items():
+        sem_cadastro = len(vetor) - 1
+        posicoes = np.where((codigos >= 0) & (codigos < sem_cadastro), codigos, sem_cadastro)
+        df[atributo] = pd.Categorical.from_codes(vetor[posicoes], categories=categorias, validate=False)
+    return df
+
+
+def preparar_base(anos=None):
+    """Lê o fato (só as partições dos anos pedidos), normaliza tipos e junta produto, cliente e vendedor."""
+    if not os.path.exists(CAMINHO_FATO_VENDA): return pd.DataFrame()
+
+    # Otimização de Memória: Carregar apenas colunas necessárias
+    cols_load = ['COD_FILIAL', 'DATA_MOVIMENTACAO', 'NUM_PEDIDO', 'COD_VENDEDOR',
+                 'COD_SUPERVISOR', 'COD_CLIENTE', 'COD_PRODUTO', 'QT_VENDIDA',
+                 'VALOR_LIQUIDO', 'ORIGEM_PEDIDO']
+    # Poda de partições: só as pastas ANO= pedidas são lidas do disco
+    filtros = [('ANO', 'in', list(anos))] if anos and os.path.isdir(CAMINHO_FATO_VENDA) else None
+    try:
+        # Leitura tipada: datas nativas e valores decimais já convertidos para float no Arrow
+        df = esquemas.ler_tipado(CAMINHO_FATO_VENDA, columns=cols_load, filters=filtros)
+    except:
+        df = pd.read_parquet(CAMINHO_FATO_VENDA, filters=filtros)
+        df.columns = [c.upper() for c in df.columns]
+        df = df[[c for c in cols_load if c in df.columns]]
+        gc.collect()
+
+    df.columns = [c.upper() for c in df.columns]
+
+    # Garantir colunas opcionais que podem não vir da query SQL
+    for col in ['COD_SUPERVISOR', 'ORIGEM_PEDIDO']:
+        if col not in df.columns:
+            df[col] = 0 if 'COD' in col else 'N/I'
+
+    if not pd.api.types.is_datetime64_any_dtype(df['DATA_MOVIMENTACAO']):
+        df['DATA_MOVIMENTACAO'] = pd.to_datetime(df['DATA_MOVIMENTACAO'], errors='coerce')
+    df['ANO'] = df['DATA_MOVIMENTACAO'].dt.year.fillna(0).astype(np.int16)
+    df['MES'] = df['DATA_MOVIMENTACAO'].dt.month.fillna(0).astype(np.int8)
+    # Sem partição correspondente (arquivo monolítico), o recorte é feito em memória
+    if anos and not os.path.isdir(CAMINHO_FATO_VENDA):
+        df = df[df['ANO'].isin(anos)].reset_index(drop=True)
+
+    # Tratamento Financeiro
+    for col in ['QT_VENDIDA', 'VALOR_LIQUIDO']:
+        if df[col].dtype == 'object':
+            df[col] = df[col].str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
+        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(np.float32)
+
+    # IDs
+    for col in ['COD_FILIAL', 'NUM_PEDIDO', 'COD_VENDEDOR', 'COD_SUPERVISOR', 'COD_CLIENTE', 'COD_PRODUTO']:
+        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(np.int32)
+
+    # Atributos das dimensões por indexação nos códigos (já normalizados e categorizados na dimensão)
+    anexar_dim(df, 'COD_PRODUTO', consulta_dim('dim_produto.parquet', 'cod_produto', ['nm_produto', 'categoria', 'secao']))
+    anexar_dim(df, 'COD_CLIENTE', consulta_dim('dim_cliente.parquet', 'cod_cliente', ['nm_cliente']))
+    anexar_dim(df, 'COD_VENDEDOR', consulta_dim('dim_vendedor.parquet', 'cod_vendedor', ['nm_vendedor']))
+
+    # Higienização de Strings Final
+    df['ORIGEM_PEDIDO'] = df['ORIGEM_PEDIDO'].astype(object).fillna(SEM_CADASTRO).astype(str).str.upper().astype('category')
+
+    return df
+
+
+def anos_do_fato():
+    """Anos presentes no fato: pastas ANO= do dataset ou, no Parquet monolítico, a coluna de data."""
+    if not os.path.exists(CAMINHO_FATO_VENDA): return []
+    if os.path.isdir(CAMINHO_FATO_VENDA):
+        return sorted(int(nome.split('=', 1)[1]) for nome in os.listdir(CAMINHO_FATO_VENDA) if nome.startswith('ANO='))
+    try:
+        datas = esquemas.ler_tipado(CAMINHO_FATO_VENDA, columns=['DATA_MOVIMENTACAO'])['DATA_MOVIMENTACAO']
+    except:
+        datas = pd.read_parquet(CAMINHO_FATO_VENDA).rename(columns=str.upper)['DATA_MOVIMENTACAO']
+    anos = pd.to_datetime(datas, errors='coerce').dt.year.fillna(0).astype(int)
+    return sorted(anos.unique().tolist())
+
+
+# --- PUBLICAÇÃO ---
+def ler_ponteiro():
+    if not os.path.exists(ARQUIVO_PONTEIRO):
+        return None
+    try:
+        with open(ARQUIVO_PONTEIRO, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _completa(ponteiro):
+    # Ponteiro no formato anual com todos os arquivos no disco (o formato antigo não serve)
+    try:
+        arquivos = [info['arquivo'] for info in ponteiro['anos'].values()] + [ponteiro['cubo']]
+    except (KeyError, TypeError, AttributeError):
+        return False
+    return all(os.path.exists(arquivo) for arquivo in arquivos)
+
+
+def ultima_publicada():
+    """Ponteiro da última base publicada, em dia ou não com as fontes; None se não houver."""
+    ponteiro = ler_ponteiro()
+    return ponteiro if ponteiro is not None and _completa(ponteiro) else None
+
+
+def publicada(versao=None):
+    """Ponteiro da base publicada se ela ainda corresponde às fontes em disco; senão None."""
+    ponteiro = ultima_publicada()
+    versao = versao_fontes() if versao is None else versao
+    if ponteiro is None or ponteiro['versao'] != _texto_versao(versao):
+        return None
+    return ponteiro
+
+
+def _arquivos(ponteiro):
+    return {os.path.abspath(info['arquivo']) for info in ponteiro['anos'].values()} if ponteiro else set()
+
+
+def _remover_antigas(manter):
+    # No Windows um arquivo mapeado por outro processo não pode ser apagado: fica para a próxima publicação
+    for arquivo in glob.glob(f'{PREFIXO_BASE}-*.arrow'):
+        if os.path.abspath(arquivo) not in manter:
+            try:
+                os.remove(arquivo)
+                os.remove(manifesto.caminho_manifesto(arquivo))
+            except OSError:
+                pass
+
+
+def montar_cubo(df):
+    """Cubo ANO x MES x filial x supervisor x vendedor x categoria x origem.
+
+    Valor e quantidade somam entre células; PEDIDOS é a contagem distinta dentro da célula
+    (um pedido com várias categorias conta em cada uma).
+    """
+    return df.groupby(DIMENSOES_CUBO, observed=True, sort=False).agg(
+        VALOR_LIQUIDO=('VALOR_LIQUIDO', 'sum'),
+        QT_VENDIDA=('QT_VENDIDA', 'sum'),
+        PEDIDOS=('NUM_PEDIDO', 'nunique'),
+    ).reset_index()
+
+
+def recortar_cubo(cubo, anos=None, filtros=None):
+    """Células dos anos e dos valores escolhidos em {coluna: valores} (vazio = sem filtro)."""
+    mascara = np.ones(len(cubo), dtype=bool)
+    if anos:
+        mascara &= cubo['ANO'].isin(anos).to_numpy()
+    for coluna, escolhidos in (filtros or {}).items():
+        if escolhidos:
+            mascara &= cubo[coluna].isin(escolhidos).to_numpy()
+    return cubo[mascara]
+
+
+def _publicar_ano(ano, prefixo):
+    """Monta e grava o arquivo de um ano; devolve (arquivo, registros, cubo do ano)."""
+    df = preparar_base(anos=[ano])
+    # Ordenada por cliente: as linhas de cada cliente ficam juntas no ano (indice_clientes)
+    df = df.sort_values(['nm_cliente', 'DATA_MOVIMENTACAO'], kind='stable', ignore_index=True)
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    arquivo = f'{prefixo}-{ano}.arrow'
+    temporario = arquivo + '.tmp'
+    # Sem compressão e num único lote: é o que permite mapear e converter sem cópia
+    with pa.OSFile(temporario, 'wb') as destino:
+        with pa.ipc.new_file(destino, tabela.schema) as writer:
+            writer.write_table(tabela, max_chunksize=max(tabela.num_rows, 1))
+    os.replace(temporario, arquivo)
+    manifesto.gravar_manifesto(arquivo, df)
+    del tabela
+    resultado = (arquivo, len(df), montar_cubo(df))
+    del df
+    gc.collect()
+    return resultado
+
+
+def publicar():
+    """Publica um Arrow IPC por ano do fato e o cubo; devolve o ponteiro gravado."""
+    inicio = time.perf_counter()
+    versao = versao_fontes()
+    texto_versao = _texto_versao(versao)
+    prefixo = f"{PREFIXO_BASE}-{hashlib.sha256(texto_versao.encode('utf-8')).hexdigest()[:12]}"
+    anterior = ultima_publicada()
+
+    # Um ano por vez: o pico de memória é o do maior ano, não o do histórico
+    anos, cubos = {}, []
+    for ano in anos_do_fato():
+        arquivo, registros, cubo_ano = _publicar_ano(ano, prefixo)
+        anos[str(ano)] = {'arquivo': arquivo, 'registros': registros}
+        cubos.append(cubo_ano)
+        print(f'[i] {arquivo}: {registros} registros')
+
+    # ANO está nas dimensões do cubo: os cubos anuais não se sobrepõem
+    cubo = pd.concat(cubos, ignore_index=True) if cubos else pd.DataFrame(columns=DIMENSOES_CUBO + ['VALOR_LIQUIDO', 'QT_VENDIDA', 'PEDIDOS'])
+    for coluna in ['COD_FILIAL', 'COD_SUPERVISOR', 'nm_vendedor', 'categoria', 'ORIGEM_PEDIDO']:
+        if cubo[coluna].dtype == object:
+            cubo[coluna] = cubo[coluna].astype('category')
+    cubo.to_parquet(ARQUIVO_CUBO + '.tmp', index=False)
+    os.replace(ARQUIVO_CUBO + '.tmp', ARQUIVO_CUBO)
+    manifesto.gravar_manifesto(ARQUIVO_CUBO, cubo)
+    celulas = len(cubo)
+    del cubo, cubos
+
+    ponteiro = {
+        'versao': texto_versao,
+        'registros': sum(info['registros'] for info in anos.values()),
+        'anos': anos,
+        'cubo': ARQUIVO_CUBO,
+        'celulas_cubo': celulas,
+        'gerado_em': datetime.now().isoformat(timespec='seconds'),
+    }
+    with open(ARQUIVO_PONTEIRO + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(ponteiro, f, indent=2, ensure_ascii=False)
+    os.replace(ARQUIVO_PONTEIRO + '.tmp', ARQUIVO_PONTEIRO)
+    # A publicação anterior fica no disco: um painel pode ter lido o ponteiro antigo e ainda não ter mapeado os arquivos
+    _remover_antigas(_arquivos(ponteiro) | _arquivos(anterior))
+    print(f"[+] Base de vendas publicada: {len(anos)} anos, {ponteiro['registros']} registros, cubo com {celulas} células ({time.perf_counter() - inicio:.1f}s)")
+    return ponteiro
+
+
+def garantir(versao=None):
+    """Ponteiro da base em dia com as fontes, publicando-a antes se preciso."""
+    return publicada(versao) or publicar()
+
+
+def abrir(ponteiro, anos=None):
+    """DataFrame somente leitura sobre os arquivos anuais mapeados dos anos pedidos (todos, se vazio).
+
+    Um ano só é convertido sem cópia; vários anos são concatenados (cópia só dos anos pedidos).
+    """
+    anos = sorted(int(ano) for ano in (anos or ponteiro['anos']) if str(ano) in ponteiro['anos'])
+    tabelas = [pa.ipc.open_file(pa.memory_map(ponteiro['anos'][str(ano)]['arquivo'], 'r')).read_all() for ano in anos]
+    if not tabelas:
+        if not ponteiro['anos']:
+            return pd.DataFrame()
+        # Nenhum dos anos pedidos publicado: base vazia com as colunas de sempre
+        primeiro = next(iter(ponteiro['anos'].values()))['arquivo']
+        tabelas = [pa.ipc.open_file(pa.memory_map(primeiro, 'r')).read_all().slice(0, 0)]
+    tabela = tabelas[0] if len(tabelas) == 1 else pa.concat_tables(tabelas, promote_options='permissive').combine_chunks()
+    return tabela.to_pandas(split_blocks=True)
+
+
+# --- ÍNDICE DE CLIENTES ---
+# Com a base ordenada por ano e cliente, as linhas de um cliente formam uma faixa por ano. O
+# índice guarda essas faixas [início, fim) agrupadas por cliente (ponteiros no formato CSR) e
+# selecionar um cliente custa o número de linhas dele, não uma varredura da base. Numa base
+# em outra ordem o índice continua correto, só com mais faixas.
+def indice_clientes(df):
+    """{'clientes', 'ponteiros', 'inicios', 'fins'}: faixas de linhas de cada nm_cliente."""
+    categorias = df['nm_cliente'].cat.categories
+    codigos = df['nm_cliente'].cat.codes.to_numpy()
+    anos = df['ANO'].to_numpy()
+    if len(df):
+        quebras = np.flatnonzero((codigos[1:] != codigos[:-1]) | (anos[1:] != anos[:-1])) + 1
+        inicios = np.concatenate(([0], quebras)).astype(np.int64)
+        fins = np.concatenate((quebras, [len(df)])).astype(np.int64)
+    else:
+        inicios = fins = np.zeros(0, np.int64)
+    donos = codigos[inicios]
+    ordem = np.argsort(donos, kind='stable')
+    ponteiros = np.concatenate(([0], np.cumsum(np.bincount(donos, minlength=len(categorias)))))
+    indice = {'clientes': categorias, 'ponteiros': ponteiros, 'inicios': inicios[ordem], 'fins': fins[ordem]}
+    for vetor in (ponteiros, indice['inicios'], indice['fins']):
+        vetor.flags.writeable = False
+    return indice
+
+
+def clientes_do_indice(indice):
+    """Clientes com ao menos uma linha na base, em ordem alfabética."""
+    return sorted(indice['clientes'][np.diff(indice['ponteiros']) > 0])
+
+
+def linhas_cliente(indice, cliente):
+    """Posições (iloc) das linhas do cliente, em ordem de ano e data."""
+    posicao = indice['clientes'].get_indexer([cliente])[0]
+    if posicao < 0:
+        return np.zeros(0, np.int64)
+    faixas = slice(indice['ponteiros'][posicao], indice['ponteiros'][posicao + 1])
+    return np.concatenate([np.arange(ini, fim) for ini, fim in zip(indice['inicios'][faixas], indice['fins'][faixas])]
+                          or [np.zeros(0, np.int64)])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Publica a base de vendas preparada em Arrow IPC para os painéis.')
+    parser.add_argument('--forcar', action='store_true', help='Publica mesmo se a base já estiver em dia com as fontes.')
+    args = parser.parse_args()
+
+    ponteiro = None if args.forcar else publicada()
+    if ponteiro is None:
+        publicar()
+    else:
+        print(f"[=] Base de vendas em dia com as fontes ({len(ponteiro['anos'])} anos, {ponteiro['registros']} registros).")
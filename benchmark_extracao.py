@@ -0,0 +1,102 @@
+import pandas as pd
+import conexao_oracle
+import esquemas
+import temporario
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+
+# --- BENCHMARK: pd.read_sql x fetchmany x fetch Arrow nativo ---
+# Roda a mesma query de fato_venda pelos caminhos de extração e compara tempo e vazão.
+# Por padrão usa um mês só (fatia de DATA_MOVIMENTACAO) para caber no read_sql.
+
+ARQUIVO = 'fato_venda.parquet'
+
+
+def caminho_read_sql(query, destino, conexao, tamanho_lote, params):
+    df = pd.read_sql(query, con=conexao, params=params)
+    esquemas.gravar_tipado(df, destino)
+    return len(df)
+
+
+def caminho_fetchmany(query, destino, conexao, tamanho_lote, params):
+    return temporario.exportar_streaming(query, destino, conexao, tamanho_lote, params)
+
+
+def caminho_arrow(query, destino, conexao, tamanho_lote, params):
+    return temporario.exportar_arrow(query, destino, conexao, tamanho_lote, params)
+
+
+CAMINHOS = [
+    ('read_sql', caminho_read_sql, 'fato_venda.parquet'),
+    ('fetchmany', caminho_fetchmany, 'fato_venda.parquet'),
+    ('arrow_parquet', caminho_arrow, 'fato_venda.parquet'),
+    ('arrow_ipc', caminho_arrow, 'fato_venda.arrow'),
+]
+
+
+def montar_query(mes):
+    """Query de fato_venda restrita ao mês AAAAMM (None = tabela inteira)."""
+    query = temporario.queries[ARQUIVO]
+    params = dict(temporario.PARAMETROS[ARQUIVO])
+    if mes is None:
+        return query, params
+    inicio = datetime.strptime(mes, '%Y%m')
+    return (f"SELECT * FROM ({query}) WHERE DATA_MOVIMENTACAO >= :dt_inicio AND DATA_MOVIMENTACAO < :dt_fim",
+            {**params, 'dt_inicio': inicio, 'dt_fim': temporario._proximo_mes(inicio)})
+
+
+def executar(mes, repeticoes, tamanho_lote):
+    query, params = montar_query(mes)
+    resultados = []
+    with conexao_oracle.conectar() as conexao, \
+            tempfile.TemporaryDirectory() as pasta:
+        for nome, funcao, arquivo in CAMINHOS:
+            destino = os.path.join(pasta, arquivo)
+            for rodada in range(1, repeticoes + 1):
+                if os.path.exists(destino):
+                    os.remove(destino)
+                inicio = time.perf_counter()
+                try:
+                    total = funcao(query, destino, conexao, tamanho_lote, params)
+                except Exception as e:
+                    print(f'[!] {nome}: {e}')
+                    break
+                duracao = time.perf_counter() - inicio
+                resultados.append({
+                    'caminho': nome, 'rodada': rodada, 'registros': total, 'segundos': round(duracao, 2),
+                    'reg_s': round(total / duracao) if duracao > 0 else 0,
+                    'mb_arquivo': round(os.path.getsize(destino) / 1e6, 1),
+                })
+                print(f'[+] {nome} #{rodada}: {total} registros em {duracao:.1f}s')
+    return pd.DataFrame(resultados)
+
+
+def imprimir_comparativo(df):
+    if df.empty:
+        print('Nenhum resultado.')
+        return
+    resumo = df.groupby('caminho', sort=False).agg(
+        registros=('registros', 'max'), segundos=('segundos', 'median'),
+        reg_s=('reg_s', 'median'), mb_arquivo=('mb_arquivo', 'max'))
+    if 'read_sql' in resumo.index:
+        resumo['x_read_sql'] = (resumo.loc['read_sql', 'segundos'] / resumo['segundos']).round(2)
+    print('\n--- Comparativo (mediana das rodadas) ---')
+    print(resumo.to_string())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compara pd.read_sql, fetchmany e fetch Arrow nativo em fato_venda.')
+    parser.add_argument('--mes', default=f'{datetime.now():%Y%m}',
+                        help="Mês AAAAMM usado como amostra; 'todos' extrai a tabela inteira.")
+    parser.add_argument('--repeticoes', type=int, default=3, help='Rodadas por caminho (usa a mediana).')
+    parser.add_argument('--lote', type=int, default=temporario.TAMANHO_LOTE, help='Linhas por lote.')
+    parser.add_argument('--csv', help='Grava as medições brutas neste CSV.')
+    args = parser.parse_args()
+
+    df_resultados = executar(None if args.mes == 'todos' else args.mes, args.repeticoes, args.lote)
+    imprimir_comparativo(df_resultados)
+    if args.csv:
+        df_resultados.to_csv(args.csv, index=False, sep=';', encoding='utf-8-sig', decimal=',')
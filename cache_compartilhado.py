@@ -0,0 +1,76 @@
+import pandas as pd
+from collections import OrderedDict
+from functools import wraps
+import threading
+
+# --- CACHE COMPARTILHADO DOS PAINÉIS ---
+# Um objeto por (função, argumentos) no processo, como o st.cache_resource: todas as sessões
+# recebem a mesma base já carregada, sem a desserialização e a cópia que o st.cache_data faz a
+# cada rerun. A identidade das entradas (manifesto.chave_cache: checksum do conteúdo ou
+# tamanho + mtime) é conferida a cada acesso; quando um arquivo muda, a versão antiga sai do
+# cache e a nova é carregada uma única vez. DataFrames são entregues como cópia rasa, o que só
+# é seguro com copy-on-write (sempre ligado a partir do pandas 3, exigido no requirements.txt):
+# quem acrescenta ou altera colunas mexe só na própria cópia, e a base compartilhada continua
+# imutável. Tuplas são percorridas (base e índices juntos).
+
+_caches = []
+
+
+def _entregar(valor):
+    if isinstance(valor, tuple):
+        return tuple(_entregar(v) for v in valor)
+    return valor.copy(deep=False) if isinstance(valor, (pd.DataFrame, pd.Series)) else valor
+
+
+def compartilhado(identidade, max_entradas=8):
+    """Decorador: `identidade(*args, **kwargs)` devolve a chave das entradas (ex. manifesto.chave_cache).
+
+    max_entradas limita as combinações de argumentos mantidas (a menos usada sai primeiro);
+    de cada combinação só a versão atual das entradas fica em memória.
+    """
+    def decorador(funcao):
+        entradas = OrderedDict()
+        travas = {}
+        trava_geral = threading.Lock()
+
+        @wraps(funcao)
+        def envoltorio(*args, **kwargs):
+            chave = (args, tuple(sorted(kwargs.items())))
+            versao = identidade(*args, **kwargs)
+            with trava_geral:
+                atual = entradas.get(chave)
+                if atual is not None and atual[0] == versao:
+                    entradas.move_to_end(chave)
+                    return _entregar(atual[1])
+                trava = travas.setdefault(chave, threading.Lock())
+
+            # Uma carga por chave de cada vez: sessões simultâneas esperam a mesma carga
+            with trava:
+                with trava_geral:
+                    atual = entradas.get(chave)
+                    if atual is not None and atual[0] == versao:
+                        return _entregar(atual[1])
+                    # A versão antiga sai antes da carga: o pico não soma as duas bases
+                    entradas.pop(chave, None)
+                valor = funcao(*args, **kwargs)
+                with trava_geral:
+                    entradas[chave] = (versao, valor)
+                    entradas.move_to_end(chave)
+                    while len(entradas) > max_entradas:
+                        antiga, _ = entradas.popitem(last=False)
+                        travas.pop(antiga, None)
+            return _entregar(valor)
+
+        def limpar():
+            with trava_geral:
+                entradas.clear()
+
+        envoltorio.limpar = limpar
+        _caches.append(envoltorio)
+        return envoltorio
+    return decorador
+
+
+def limpar_tudo():
+    for cache in _caches:
+        cache.limpar()
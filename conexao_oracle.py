@@ -0,0 +1,107 @@
+import oracledb
+import telemetria
+from dotenv import load_dotenv
+import os
+import threading
+import time
+
+# --- CONEXÃO COMPARTILHADA COM O WINTHOR ---
+# Credenciais, DSN e o cliente Oracle (thick mode) ficam só aqui; os scripts de extração
+# importam este módulo em vez de repetir load_dotenv / init_oracle_client / dsn fixo.
+# Com ORACLE_MODO_THIN=1 o Instant Client não é carregado (thin mode do python-oracledb),
+# o que basta para o banco local de gerar_winthor_local.py.
+
+load_dotenv()
+ORACLE_USER = os.getenv('ORACLE_USER')
+ORACLE_PASSWORD = os.getenv('ORACLE_PASSWORD')
+ORACLE_DSN = os.getenv('ORACLE_DSN', '192.168.0.1/wint')
+ORACLE_LIB_DIR = os.getenv('ORACLE_LIB_DIR', r"C:\instantclient_23_9")
+ORACLE_MODO_THIN = os.getenv('ORACLE_MODO_THIN', '0') == '1'
+# Statements preparados mantidos por sessão: SQL repetido (mesmo texto, binds diferentes) não é reanalisado
+TAMANHO_CACHE_SQL = int(os.getenv('ORACLE_CACHE_SQL', '50'))
+
+_trava_cliente = threading.Lock()
+_cliente_iniciado = False
+
+
+def iniciar_cliente():
+    """Inicializa o Oracle Instant Client uma única vez por processo (chamadas seguintes não fazem nada)."""
+    global _cliente_iniciado
+    with _trava_cliente:
+        if _cliente_iniciado or ORACLE_MODO_THIN:
+            return
+        try:
+            oracledb.init_oracle_client(lib_dir=ORACLE_LIB_DIR)
+        except Exception as e:
+            print(f'Aviso: Não foi possível inicializar o cliente oracle: {e}')
+        _cliente_iniciado = True
+
+
+def conectar():
+    iniciar_cliente()
+    with telemetria.etapa('conectar'):
+        return oracledb.connect(user=ORACLE_USER, password=ORACLE_PASSWORD, dsn=ORACLE_DSN,
+                                stmtcachesize=TAMANHO_CACHE_SQL)
+
+
+def criar_pool(max_conexoes):
+    """Pool de sessões no Winthor; max_conexoes é o teto de queries simultâneas no servidor."""
+    iniciar_cliente()
+    return oracledb.create_pool(
+        user=ORACLE_USER, password=ORACLE_PASSWORD, dsn=ORACLE_DSN,
+        min=1, max=max_conexoes, increment=1, stmtcachesize=TAMANHO_CACHE_SQL
+    )
+
+
+def executar_tarefa(pool, rotulo, funcao):
+    """Executa uma tarefa numa conexão emprestada do pool e devolve seus tempos.
+
+    A tarefa inteira vira um registro de telemetria com o rótulo como nome do job.
+    """
+    inicio = time.perf_counter()
+    with telemetria.medir(rotulo):
+        with telemetria.etapa('conectar'):
+            conexao = pool.acquire()
+        with conexao:
+            funcao(conexao)
+    return rotulo, inicio, time.perf_counter()
+
+
+def imprimir_resumo(tempos, inicio_execucao):
+    """Mostra o início/duração de cada tarefa e destaca o caminho crítico.
+
+    As tarefas são independentes, então o caminho crítico é a tarefa mais longa:
+    nenhum aumento de paralelismo derruba o tempo total abaixo dela.
+    """
+    total = max([time.perf_counter()] + [fim for _, _, fim in tempos]) - inicio_execucao
+    soma = sum(fim - ini for _, ini, fim in tempos)
+    critico = max(tempos, key=lambda t: t[2] - t[1])[0] if tempos else None
+
+    print('\n--- Resumo de tempos ---')
+    for rotulo, ini, fim in sorted(tempos, key=lambda t: t[1]):
+        deslocamento = ini - inicio_execucao
+        duracao = fim - ini
+        barra_ini = int(40 * deslocamento / total) if total else 0
+        barra = ' ' * barra_ini + '#' * max(1, int(40 * duracao / total) if total else 1)
+        marcador = '  <- caminho crítico' if rotulo == critico else ''
+        print(f'{rotulo:<40} +{deslocamento:7.1f}s {duracao:8.1f}s |{barra:<40}|{marcador}')
+    print(f'Tempo total: {total:.1f}s | soma sequencial: {soma:.1f}s | ganho: {soma / total if total else 0:.1f}x')
+
+
+def verificar_e_apagar(nome_arquivo):
+    if os.path.exists(nome_arquivo):
+        try:
+            os.remove(nome_arquivo)
+            print(f' Arquivo antigo {nome_arquivo} apagado com sucesso.')
+        except OSError as e:
+            print(f' Erro ao apagar o arquivo {nome_arquivo}: {e}')
+    else:
+        print(f' Arquivo {nome_arquivo} não encontrado. Criando novo...')
+
+
+def descrever_erro(e):
+    """Mensagem padrão para falhas de conexão/execução no Oracle."""
+    if isinstance(e, oracledb.Error) and e.args and hasattr(e.args[0], 'code'):
+        erro = e.args[0]
+        return f'Erro ao se conectar ou executar a query no banco Oracle: {erro.code}:{erro.message}'
+    return f'Ocorreu um erro inesperado: {e}'
@@ -0,0 +1,192 @@
+import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import manifesto
+from datetime import datetime
+import json
+import os
+import shutil
+import threading
+
+# --- DIMENSÕES COM DETECÇÃO DE MUDANÇA ---
+# No modo delta, a dimensão recém-extraída é comparada por chave (hash da linha inteira) com
+# a que está em disco. Sem mudança, nada é gravado; com mudança, só as chaves novas, alteradas
+# e removidas vão para <dim>.parquet.deltas/<carimbo>.parquet (coluna _OPERACAO = I/U/D).
+# esquemas.ler_tipado aplica os deltas sobre a base ao ler, e a base é recompactada quando os
+# deltas acumulados ficam grandes. O conjunto de chaves alteradas de cada dimensão fica em
+# ARQUIVO_ALTERACOES para quem quiser invalidar só o que mudou.
+
+DIMENSOES = {
+    'dim_produto.parquet': 'COD_PRODUTO',
+    'dim_filial.parquet': 'COD_FILIAL',
+    'dim_fornecedor.parquet': 'COD_FORNECEDOR',
+    'dim_cliente.parquet': 'COD_CLIENTE',
+    'dim_vendedor.parquet': 'COD_VENDEDOR',
+    'dim_supervisor.parquet': 'COD_SUPERVISOR',
+    'dim_televendas.parquet': 'COD_TELEVENDA',
+}
+ARQUIVO_ALTERACOES = 'dimensoes_alteracoes.json'
+OPERACAO = '_OPERACAO'
+
+# Recompacta quando os deltas somam mais que esta fração da dimensão (ou passam de MAX_DELTAS arquivos)
+FRACAO_COMPACTAR = float(os.getenv('DIMENSOES_FRACAO_COMPACTAR', '0.2'))
+MAX_DELTAS = int(os.getenv('DIMENSOES_MAX_DELTAS', '30'))
+
+_trava_alteracoes = threading.Lock()
+
+
+def caminho_deltas(arquivo):
+    return arquivo + '.deltas'
+
+
+def chave_de(arquivo):
+    return DIMENSOES.get(os.path.basename(arquivo))
+
+
+def _arquivos_delta(arquivo):
+    pasta = caminho_deltas(arquivo)
+    if not os.path.isdir(pasta):
+        return []
+    return [os.path.join(pasta, nome) for nome in sorted(os.listdir(pasta))
+            if nome.endswith('.parquet') and not nome.startswith(('.', '_'))]
+
+
+def materializar(arquivo, columns=None):
+    """Base + deltas em ordem: a última operação de cada chave vence e as removidas saem."""
+    base = pq.read_table(arquivo)
+    deltas = _arquivos_delta(arquivo)
+    chave = chave_de(arquivo)
+    if deltas and chave is not None:
+        tabela_deltas = pa.concat_tables([pq.read_table(d) for d in deltas])
+        # Só a última ocorrência de cada chave nos deltas importa
+        chaves = tabela_deltas.column(chave).to_pandas()
+        ultimas = np.sort(pd.Series(np.arange(len(chaves))).groupby(chaves.values).max().to_numpy())
+        tabela_deltas = tabela_deltas.take(ultimas)
+        vivas = tabela_deltas.filter(pc.not_equal(tabela_deltas.column(OPERACAO), 'D')).drop_columns([OPERACAO])
+        mantidas = base.filter(pc.invert(pc.is_in(base.column(chave), value_set=tabela_deltas.column(chave))))
+        base = pa.concat_tables([mantidas, vivas.cast(mantidas.schema)]).sort_by(chave)
+    return base.select(columns) if columns else base
+
+
+def _hashes(tabela, chave):
+    """Hash por chave da linha inteira (a primeira ocorrência de cada chave, como os painéis usam)."""
+    df = tabela.to_pandas().drop_duplicates(subset=[chave])
+    return pd.Series(pd.util.hash_pandas_object(df, index=False).to_numpy(), index=df[chave].to_numpy())
+
+
+def comparar(atual, nova, chave):
+    """(inseridos, alterados, removidos) entre a dimensão em disco e a recém-extraída."""
+    antes, depois = _hashes(atual, chave), _hashes(nova, chave)
+    inseridos = depois.index.difference(antes.index)
+    removidos = antes.index.difference(depois.index)
+    comuns = depois.index.intersection(antes.index)
+    alterados = comuns[depois.loc[comuns].to_numpy() != antes.loc[comuns].to_numpy()]
+    return inseridos, alterados, removidos
+
+
+def _linhas_da_chave(tabela, chave, chaves, operacao):
+    # Mesma regra de _hashes: a primeira ocorrência de cada chave
+    primeiras = tabela.take(pd.Series(tabela.column(chave).to_pandas()).drop_duplicates().index.to_numpy())
+    linhas = primeiras.filter(pc.is_in(primeiras.column(chave), value_set=pa.array(chaves, primeiras.schema.field(chave).type)))
+    return linhas.append_column(OPERACAO, pa.array([operacao] * linhas.num_rows, pa.string()))
+
+
+def _gravar_atomico(tabela, destino):
+    pq.write_table(tabela, destino + '.tmp', compression='snappy')
+    os.replace(destino + '.tmp', destino)
+
+
+def ler_alteracoes():
+    if not os.path.exists(ARQUIVO_ALTERACOES):
+        return {}
+    with open(ARQUIVO_ALTERACOES, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def alteracoes(arquivo):
+    """Último conjunto de mudanças da dimensão: versao, modo e chaves inseridas/alteradas/removidas."""
+    return ler_alteracoes().get(os.path.basename(arquivo))
+
+
+def _registrar(arquivo, modo, inseridos=(), alterados=(), removidos=()):
+    agora = datetime.now().isoformat(timespec='seconds')
+    with _trava_alteracoes:
+        todas = ler_alteracoes()
+        nome = os.path.basename(arquivo)
+        anterior = todas.get(nome, {'versao': 0})
+        if modo == 'sem_alteracao':
+            entrada = {**anterior, 'verificado_em': agora}
+        else:
+            entrada = {
+                'versao': anterior['versao'] + 1,
+                'modo': modo,
+                'atualizado_em': agora,
+                'verificado_em': agora,
+                'inseridos': [int(c) for c in inseridos],
+                'alterados': [int(c) for c in alterados],
+                'removidos': [int(c) for c in removidos],
+            }
+        todas[nome] = entrada
+        with open(ARQUIVO_ALTERACOES + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(todas, f, indent=2, ensure_ascii=False)
+        os.replace(ARQUIVO_ALTERACOES + '.tmp', ARQUIVO_ALTERACOES)
+    return entrada
+
+
+def descartar_deltas(arquivo):
+    shutil.rmtree(caminho_deltas(arquivo), ignore_errors=True)
+    if os.path.exists(manifesto.caminho_manifesto(caminho_deltas(arquivo))):
+        os.remove(manifesto.caminho_manifesto(caminho_deltas(arquivo)))
+
+
+def registrar_completa(arquivo):
+    """Registra uma extração completa da base (todas as chaves podem ter mudado)."""
+    if chave_de(arquivo) is not None:
+        _registrar(arquivo, 'completo')
+
+
+def aplicar(arquivo, nova):
+    """Compara a dimensão extraída com a de disco e grava só o delta (ou nada, ou a base recompactada).
+
+    Devolve (modo, entrada registrada em ARQUIVO_ALTERACOES, bytes gravados).
+    """
+    chave = chave_de(arquivo)
+    atual = materializar(arquivo)
+    if atual.schema.names != nova.schema.names:
+        # Colunas mudaram (query ou esquema novo): não há como comparar, a base é regravada
+        descartar_deltas(arquivo)
+        _gravar_atomico(nova, arquivo)
+        manifesto.gravar_manifesto(arquivo)
+        return 'completo', _registrar(arquivo, 'completo'), os.path.getsize(arquivo)
+    nova = nova.cast(atual.schema)
+    inseridos, alterados, removidos = comparar(atual, nova, chave)
+    if not (len(inseridos) or len(alterados) or len(removidos)):
+        return 'sem_alteracao', _registrar(arquivo, 'sem_alteracao'), 0
+
+    delta = pa.concat_tables([
+        _linhas_da_chave(nova, chave, inseridos, 'I'),
+        _linhas_da_chave(nova, chave, alterados, 'U'),
+        _linhas_da_chave(atual, chave, removidos, 'D'),
+    ])
+    acumulado = sum(pq.read_metadata(d).num_rows for d in _arquivos_delta(arquivo)) + delta.num_rows
+    if acumulado > FRACAO_COMPACTAR * max(nova.num_rows, 1) or len(_arquivos_delta(arquivo)) + 1 > MAX_DELTAS:
+        # Deltas saem antes da troca da base: uma queda no meio deixa a base antiga sem deltas,
+        # que a próxima comparação corrige, e nunca deltas velhos sobre uma base nova
+        descartar_deltas(arquivo)
+        _gravar_atomico(nova, arquivo)
+        modo, gravados = 'compactado', os.path.getsize(arquivo)
+    else:
+        os.makedirs(caminho_deltas(arquivo), exist_ok=True)
+        destino = os.path.join(caminho_deltas(arquivo), f'{datetime.now():%Y%m%d%H%M%S%f}.parquet')
+        _gravar_atomico(delta, destino)
+        manifesto.gravar_manifesto(caminho_deltas(arquivo))
+        modo, gravados = 'delta', os.path.getsize(destino)
+    manifesto.gravar_manifesto(arquivo)
+    return modo, _registrar(arquivo, modo, inseridos, alterados, removidos), gravados
+
+
+def chave_cache(arquivo):
+    """Chave de conteúdo da dimensão (base + deltas) para st.cache_data."""
+    return manifesto.chave_cache(arquivo, caminho_deltas(arquivo))
@@ -0,0 +1,241 @@
+import os
+import pandas as pd
+import dimensoes
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+# --- CONTRATO DE TIPOS DOS EXTRATOS ---
+# Um esquema Arrow declarado por extrato. As datas saem como data nativa, os valores
+# como decimal de ponto fixo e os textos repetitivos como dicionário (categoria), tudo
+# gravado em Parquet. Os painéis leem as colunas já tipadas, sem reparsear strings.
+
+DATA = pa.timestamp('s')                      # Oracle DATE (data + hora)
+MOEDA = pa.decimal128(18, 2)
+VALOR_UNITARIO = pa.decimal128(18, 6)
+CATEGORIA = pa.dictionary(pa.int32(), pa.string())
+CODIGO = pa.int32()
+NUMERO = pa.int64()
+
+ESQUEMAS = {
+    # extract.py
+    'valorultent': pa.schema([
+        ('CODPROD', CODIGO), ('VALORULTENT', VALOR_UNITARIO), ('CODFILIAL', CODIGO),
+        ('CLASSIFICACAO', CATEGORIA),
+    ]),
+    'dados_acompanhamento_verba': pa.schema([
+        ('CODIGOFILIAL', CODIGO), ('CLASSIFICACAO', CATEGORIA), ('DATACADASTRO', DATA),
+        ('CODIGOFORNECEDOR', CODIGO), ('FORNECEDOR', CATEGORIA), ('CODCOMPRADOR', CODIGO),
+        ('COMPRADOR', CATEGORIA), ('CODIGOCONTA', NUMERO), ('NUMEROVERBA', NUMERO),
+        ('NUMNOTA', NUMERO), ('NUMEROTRANSVENDA', NUMERO), ('DATAVENCIMENTO', DATA),
+        ('REFERENCIA', pa.string()), ('REFERENCIA1', pa.string()), ('SITUACAO', CATEGORIA),
+        ('VALOR_VERBA', MOEDA), ('VALORAPLICADO', MOEDA), ('ESTORNOAPLIC', CATEGORIA),
+        ('VALORDEBITO', VALOR_UNITARIO), ('VALORCREDITO', VALOR_UNITARIO), ('ESTORNOVERBA', CATEGORIA),
+    ]),
+    'dados_acompanhamento_verba_devolucao': pa.schema([
+        ('CLASSIFICACAO', CATEGORIA), ('FILIAL', CODIGO), ('CODFORNEC', CODIGO),
+        ('FORNECEDOR', CATEGORIA), ('COMPRADOR', CATEGORIA), ('VALOR_VERBA_DEVOLUCAO', MOEDA),
+        ('DTEMISSAO', DATA), ('DATA_VENCIMENTO', DATA), ('DATA_PAGAMENTO', DATA),
+    ]),
+    'dados_cliente': pa.schema([
+        ('COD_CLIENTE', CODIGO), ('NM_CLIENTE', pa.string()), ('FANTASIA', pa.string()),
+        ('CODCLIPRINC', CODIGO), ('DOCUMENTO_LIMPO', pa.string()), ('TP_DOCUMENTO', CATEGORIA),
+    ]),
+    # base_pre_vencido.py / pre_vencido_90.py
+    'dados_pre_vencidos': pa.schema([
+        ('CODFILIAL', CODIGO), ('CLASSIFICACAO', CATEGORIA), ('FORNECEDOR', CATEGORIA),
+        ('CODPROD', CODIGO), ('DESCRICAO', pa.string()), ('QUANTIDADE', pa.float64()),
+        ('VALOR_ULTIMA_ENTRADA', MOEDA), ('DATA_VALIDADE', DATA), ('TOTAL', MOEDA),
+    ]),
+    'dados_pre_vencidos_90': pa.schema([
+        ('CODFILIAL', CODIGO), ('CLASSIFICACAO', CATEGORIA), ('FORNECEDOR', CATEGORIA),
+        ('CODPROD', CODIGO), ('DESCRICAO', pa.string()), ('QUANTIDADE_REALIZADA', pa.float64()),
+        ('VALOR_ULTIMA_ENTRADA', MOEDA), ('TOTAL_REALIZADO', MOEDA),
+    ]),
+    # super_estoque.py
+    'super_estoque': pa.schema([
+        ('CODFILIAL', CODIGO), ('CLASSIFICACAO', CATEGORIA), ('CODPROD', CODIGO), ('PRODUTO', pa.string()),
+        ('CATEGORIA', CATEGORIA), ('SECAO', CATEGORIA), ('DEPARTAMENTO', CATEGORIA),
+        ('COD_COMPRADOR', CODIGO), ('COMPRADOR', CATEGORIA), ('CODFORNEC', CODIGO), ('FORNECEDOR', CATEGORIA),
+        ('VALOR_ULTIMA_ENTRADA', VALOR_UNITARIO), ('QTD_TOTAL_ESTOQUE', pa.float64()), ('QTD_GIRO_DIA', pa.float64()),
+        ('COBERTURA_ESTOQUE_ORIGINAL', pa.float64()), ('COBERTURA_ESTOQUE_AJUSTADA', pa.float64()),
+        ('QTD_VENDAS_90D', pa.float64()), ('QTD_DIAS_ZERADOS', CODIGO), ('VALOR_ESTOQUE', MOEDA),
+        ('GIRO_MEDIO_CORRIGIDO', pa.float64()), ('VALOR_EXCEDENTE', MOEDA), ('IS_PRODUTO_NOVO', CATEGORIA),
+        ('DATA_PRIMEIRA_COMPRA', DATA),
+    ]),
+    # super_final.py
+    'dados_rca_prod': pa.schema([
+        ('FILIAL', CODIGO), ('ORIGEMPEDIDO', CATEGORIA), ('CODIGO_RCA', CODIGO), ('RCA', CATEGORIA),
+        ('SUPERVISOR', CATEGORIA), ('CODPROD', CODIGO), ('FATURAMENTO', MOEDA),
+    ]),
+    'dados_telev_prod': pa.schema([
+        ('FILIAL', CODIGO), ('CODPROD', CODIGO), ('DIA_FATURAMENTO', CODIGO), ('CODIGO_RCA', CODIGO),
+        ('FATURAMENTO', MOEDA),
+    ]),
+    # total_day_prod.py
+    'total_day_rcca': pa.schema([
+        ('FILIAL', CODIGO), ('COD_RCA', CODIGO), ('NM_RCA', CATEGORIA), ('CODSUPERVISOR', CODIGO),
+        ('SUPERVISOR', CATEGORIA), ('COD_CLIENTE', CODIGO), ('NM_CLIENTE', pa.string()), ('COD_PRODUTO', CODIGO),
+        ('NM_PRODUTO', pa.string()), ('QT_VENDIDA', pa.float64()), ('VL_VENDA', VALOR_UNITARIO),
+        ('POSICAO_PEDIDO', CATEGORIA), ('DESCRICAORESUMIDA', pa.string()), ('NUM_PEDIDO', NUMERO),
+    ]),
+    'total_day_televenda': pa.schema([
+        ('FILIAL', CODIGO), ('COD_TELEVENDA', CODIGO), ('NM_TELEVENDA', CATEGORIA), ('CODSUPERVISOR', CODIGO),
+        ('SUPERVISOR', CATEGORIA), ('COD_CLIENTE', CODIGO), ('NM_CLIENTE', pa.string()), ('COD_PRODUTO', CODIGO),
+        ('NM_PRODUTO', pa.string()), ('QT_VENDIDA', pa.float64()), ('VL_VENDA', VALOR_UNITARIO),
+        ('POSICAO_PEDIDO', CATEGORIA), ('NUM_PEDIDO', NUMERO),
+    ]),
+    # temporario.py (dimensões e fatos do painel de vendas)
+    'dim_produto': pa.schema([
+        ('COD_PRODUTO', CODIGO), ('NM_PRODUTO', pa.string()), ('CATEGORIA', CATEGORIA),
+        ('SECAO', CATEGORIA), ('DEPARTAMENTO', CATEGORIA),
+    ]),
+    'dim_filial': pa.schema([('COD_FILIAL', CODIGO), ('NM_FILIAL', pa.string())]),
+    'dim_fornecedor': pa.schema([
+        ('COD_FORNECEDOR', CODIGO), ('NM_FORNECEDOR', pa.string()), ('CLASSIFICACAO', CATEGORIA),
+    ]),
+    'dim_cliente': pa.schema([('COD_CLIENTE', CODIGO), ('NM_CLIENTE', pa.string()), ('TIPO_PJ', CATEGORIA)]),
+    'dim_vendedor': pa.schema([('COD_VENDEDOR', CODIGO), ('NM_VENDEDOR', pa.string())]),
+    'dim_supervisor': pa.schema([('COD_SUPERVISOR', CODIGO), ('NM_SUPERVISOR', pa.string())]),
+    'dim_televendas': pa.schema([('COD_TELEVENDA', CODIGO), ('NM_TELEVENDA', pa.string())]),
+    'fato_venda': pa.schema([
+        ('COD_FILIAL', CODIGO), ('DATA_MOVIMENTACAO', DATA), ('NUM_PEDIDO', NUMERO),
+        ('COD_VENDEDOR', CODIGO), ('COD_TELEVENDA', CODIGO), ('COD_SUPERVISOR', CODIGO),
+        ('COD_CLIENTE', CODIGO), ('COD_FORNECEDOR', CODIGO), ('COD_PRODUTO', CODIGO),
+        ('NUM_LOTE', pa.string()), ('DATA_VALIDADE', DATA), ('ORIGEM_PEDIDO', CATEGORIA),
+        ('QT_VENDIDA', pa.float64()), ('VALOR_BRUTO', MOEDA), ('VALOR_LIQUIDO', MOEDA),
+    ]),
+    'fato_pedido_venda': pa.schema([
+        ('NUMERO_PEDIDO', NUMERO), ('NUMTRANSVENDA', NUMERO), ('DATA_PEDIDO', DATA),
+        ('COD_CLIENTE', CODIGO), ('COD_VENDEDOR', CODIGO), ('COD_EMITENTE', CODIGO),
+        ('COD_FILIAL', CODIGO), ('COD_PRODUTO', CODIGO), ('VALOR_TOTAL', MOEDA),
+        ('VALOR_ATENDIDO', MOEDA), ('VL_VENDA_UNITARIO', VALOR_UNITARIO), ('QUANTIDADE', pa.float64()),
+        ('QTD_FALTA', pa.float64()), ('NUM_LOTE', pa.string()), ('ORIGEM_PEDIDO', CATEGORIA),
+        ('POSICAO_PEDIDO', CATEGORIA),
+    ]),
+    'fato_pretacao_receber': pa.schema([
+        ('COD_CLIENTE', CODIGO), ('PRESTACAO', pa.string()), ('DUPLICATA', NUMERO),
+        ('VALOR', MOEDA), ('DT_VENCIMENTO', DATA), ('VALOR_PAGO', MOEDA), ('TXPERM', pa.float64()),
+        ('DT_PAGAMENTO', DATA), ('DT_EMISSAO', DATA), ('COD_FILIAL', CODIGO),
+        ('COD_VENDEDOR', CODIGO), ('VL_DESCONTO', MOEDA), ('VL_DEVOLUCAO', MOEDA),
+        ('DT_DEVOLUCAO', DATA), ('COD_SUPERVISOR', CODIGO), ('NUMTRANSVENDA', NUMERO),
+        ('NUMPED', NUMERO), ('COD_EMITENTE_PEDIDO', CODIGO),
+    ]),
+}
+
+
+def esquema_de(nome_arquivo):
+    """Esquema declarado para o arquivo (com ou sem extensão), ou None."""
+    nome = os.path.basename(nome_arquivo.rstrip('/\\')).split('.')[0]
+    return ESQUEMAS.get(nome)
+
+
+def _conferir_perdas(serie, valores, nome, descricao):
+    # Valor preenchido que virou nulo na conversão é dado inválido, não ausência
+    perdidos = valores.isna() & serie.notna()
+    if perdidos.any():
+        # Texto em branco é ausência de valor, não dado inválido
+        perdidos &= serie.astype(str).str.strip() != ''
+    if perdidos.any():
+        exemplos = ', '.join(repr(v) for v in serie[perdidos].unique()[:5])
+        raise ValueError(f'{nome}: {int(perdidos.sum())} valor(es) {descricao} para o esquema (ex.: {exemplos})')
+    return valores
+
+
+def _numerico(serie, nome):
+    """pd.to_numeric que falha (em vez de virar nulo) quando há valor preenchido não numérico."""
+    return _conferir_perdas(serie, pd.to_numeric(serie, errors='coerce'), nome, 'não numérico(s)')
+
+
+def _data(serie, nome):
+    """pd.to_datetime que falha (em vez de virar NaT) quando há valor preenchido que não é data."""
+    return _conferir_perdas(serie, pd.to_datetime(serie, errors='coerce'), nome, 'que não são data')
+
+
+def _converter(serie, tipo, nome=''):
+    if pa.types.is_decimal(tipo):
+        valores = pa.array(_numerico(serie, nome), type=pa.float64(), from_pandas=True)
+        return pc.cast(pc.round(valores, tipo.scale), tipo, safe=False)
+    if pa.types.is_integer(tipo) or pa.types.is_floating(tipo):
+        return pa.array(_numerico(serie, nome), type=tipo, from_pandas=True)
+    if pa.types.is_timestamp(tipo):
+        return pc.cast(pa.array(_data(serie, nome), from_pandas=True), tipo, safe=False)
+    texto = serie.astype(object).where(serie.notna(), None).map(lambda v: v if v is None else str(v))
+    return pa.array(texto, type=tipo, from_pandas=True)
+
+
+def para_tabela(df, esquema):
+    """Converte o DataFrame para uma tabela Arrow exatamente no esquema declarado.
+
+    Colunas ausentes no DataFrame viram colunas nulas; colunas fora do esquema são descartadas.
+    """
+    colunas = [
+        _converter(df[campo.name] if campo.name in df.columns else pd.Series([None] * len(df), dtype=object), campo.type, campo.name)
+        for campo in esquema
+    ]
+    return pa.Table.from_arrays(colunas, schema=esquema)
+
+
+def _ajustar_coluna(coluna, tipo):
+    if coluna.type == tipo:
+        return coluna
+    if pa.types.is_decimal(tipo) and (pa.types.is_floating(coluna.type) or pa.types.is_decimal(coluna.type)):
+        coluna = pc.round(coluna, tipo.scale)
+    if pa.types.is_dictionary(tipo) and not pa.types.is_string(coluna.type):
+        coluna = pc.cast(coluna, pa.string())
+    return pc.cast(coluna, tipo, safe=False)
+
+
+def ajustar_tabela(tabela, esquema):
+    """Equivalente Arrow de para_tabela: ajusta uma tabela Arrow ao esquema sem passar pelo pandas.
+
+    A comparação dos nomes ignora maiúsculas/minúsculas (o driver devolve os apelidos em caixa alta).
+    """
+    por_nome = {nome.upper(): i for i, nome in enumerate(tabela.column_names)}
+    colunas = []
+    for campo in esquema:
+        i = por_nome.get(campo.name.upper())
+        if i is None:
+            colunas.append(pa.nulls(tabela.num_rows, type=campo.type))
+        else:
+            colunas.append(_ajustar_coluna(tabela.column(i), campo.type))
+    return pa.Table.from_arrays(colunas, schema=esquema)
+
+
+def gravar_tipado(df, nome_arquivo):
+    """Grava o extrato em Parquet no esquema declarado para ele."""
+    esquema = esquema_de(nome_arquivo)
+    if esquema is None:
+        raise KeyError(f'Sem esquema declarado para {nome_arquivo}')
+    pq.write_table(para_tabela(df, esquema), nome_arquivo, compression='snappy')
+
+
+def ler_tipado(caminho, columns=None, filters=None, categorias=True):
+    """Lê um Parquet tipado (arquivo ou dataset particionado) direto para colunas pandas nativas.
+
+    Decimais viram float64 ainda no Arrow (vetorizado, sem objetos Decimal no pandas) e
+    dicionários viram category; com categorias=False voltam a ser texto simples.
+    Dimensões atualizadas em modo delta chegam já com os deltas aplicados.
+    """
+    if os.path.isdir(dimensoes.caminho_deltas(caminho)):
+        # Os filtros valem sobre a dimensão já com os deltas (podem usar colunas fora de `columns`)
+        tabela = dimensoes.materializar(caminho)
+        if filters is not None:
+            tabela = tabela.filter(pq.filters_to_expression(filters))
+        if columns:
+            tabela = tabela.select(columns)
+    else:
+        tabela = pq.read_table(caminho, columns=columns, filters=filters)
+    for i, campo in enumerate(tabela.schema):
+        if pa.types.is_decimal(campo.type):
+            tabela = tabela.set_column(i, campo.name, pc.cast(tabela.column(i), pa.float64()))
+        elif not categorias and pa.types.is_dictionary(campo.type):
+            tabela = tabela.set_column(i, campo.name, pc.cast(tabela.column(i), pa.string()))
+    return tabela.to_pandas()
+
+
+def preencher_nulos(serie, valor):
+    """fillna que também funciona em colunas category (inclui o valor nas categorias)."""
+    if isinstance(serie.dtype, pd.CategoricalDtype) and valor not in serie.cat.categories:
+        serie = serie.cat.add_categories([valor])
+    return serie.fillna(valor)
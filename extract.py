@@ -1,19 +1,4 @@
-import pandas as pd
-import oracledb
-from dotenv import load_dotenv
-import os
-
-try:
-    oracledb.init_oracle_client(lib_dir=r"C:\instantclient_23_9")
-except Exception as e:
-    print(f'Aviso: Não foi possível inicializar o cliente oracle: {e}')
-
-
-load_dotenv()
-ORACLE_USER = os.getenv('ORACLE_USER')
-ORACLE_PASSWORD = os.getenv('ORACLE_PASSWORD')
-dsn = '192.168.0.1/wint'
-
+# --- SQL (executado pelo runner de jobs.py) ---
 sql_vlultent = """
     SELECT DISTINCT
         p.codprod,
@@ -133,8 +118,9 @@ sql_acompanhamento_verba_devolucao = """
         F.fornecedor,
         E.nome AS comprador,
         SUM(P.VALOR) AS valor_verba_devolucao,
-        TO_CHAR(P.dtemissao, 'DD/MM/YYYY') AS dtemissao,
-        TO_CHAR(P.DTVENC, 'DD/MM/YYYY') AS data_vencimento
+        TRUNC(P.dtemissao) AS dtemissao,
+        TRUNC(P.DTVENC) AS data_vencimento,
+        P.DTPAG AS data_pagamento
     FROM
         PCPREST P
     INNER JOIN
@@ -218,53 +204,7 @@ sql_cliente = """
 """
 
 
-def verificar_e_apagar_csv(nome_arquivo):
-    if os.path.exists(nome_arquivo):
-        try:
-            os.remove(nome_arquivo)
-            print(f' Arquivo antigo {nome_arquivo} apagado com sucesso.')
-        except OSError as e:
-            print(f' Erro ao apagar o arquivo {nome_arquivo}: {e}')
-    else:
-        print(f' Arquivo {nome_arquivo} não encontrado. Criando novo...')
-
-
-try:
-    with oracledb.connect(user=ORACLE_USER, password=ORACLE_PASSWORD, dsn=dsn) as connection:
-        print('Conexão com sucesso.')
-
-        df_vlultent = pd.read_sql(sql_vlultent, con=connection)
-
-        Nome_arquivo_vlultent = 'valorultent.csv'
-        verificar_e_apagar_csv(Nome_arquivo_vlultent)
-        df_vlultent.to_csv(Nome_arquivo_vlultent, index=False, sep=';', encoding='utf-8-sig', decimal=',')
-        print(f' Relatório de vlultent salvo como {Nome_arquivo_vlultent}.')
-
-        # df_acompanhamento_verba = pd.read_sql(sql_acompanhamento_verba, con=connection)
-        
-        # NOME_ARQUIVO_VERBA = 'dados_acompanhamento_verba.csv'
-        # verificar_e_apagar_csv(NOME_ARQUIVO_VERBA)
-        # df_acompanhamento_verba.to_csv(NOME_ARQUIVO_VERBA, index=False, sep=';', encoding='utf-8-sig', decimal=',')
-        # print(f' Relatório de Acompanhamento de Verba salvo como {NOME_ARQUIVO_VERBA}.')
-
-        # df_acompanhamento_verba_devolucao = pd.read_sql(sql_acompanhamento_verba_devolucao, con=connection)
-        
-        # NOME_ARQUIVO_DEVOLUCAO = 'dados_acompanhamento_verba_devolucao.csv'
-        # verificar_e_apagar_csv(NOME_ARQUIVO_DEVOLUCAO) 
-        # df_acompanhamento_verba_devolucao.to_csv(NOME_ARQUIVO_DEVOLUCAO, index=False, sep=';', encoding='utf-8-sig', decimal=',') 
-        # print(f' Relatório de Devolução de Verba salvo como {NOME_ARQUIVO_DEVOLUCAO}.')
-
-        # NOME_ARQUIVO_CLIENTE= 'dados_cliente.csv'
-        # df_cliente = pd.read_sql(sql_cliente, con=connection)
-        # verificar_e_apagar_csv(NOME_ARQUIVO_CLIENTE)
-        # df_cliente.to_csv(NOME_ARQUIVO_CLIENTE, index=False, sep=';', encoding='utf-8-sig', decimal=',')
-        # print(f' Relatório de Cliente salvo como {NOME_ARQUIVO_CLIENTE}.')
-
-
-except oracledb.Error as e:
-    error_obj = e.args[0]
-    print(f'Erro ao se conectar ou executar a query no banco Oracle: {error_obj.code}:{error_obj.message}')
-    print('Verificar as credenciais, DNS e o status do servidor.')
-
-except Exception as e:
-    print(f'Ocorreu um erro inesperado: {e}')
\ No newline at end of file
+if __name__ == "__main__":
+    # Demais extratos deste arquivo: jobs acompanhamento_verba, verba_devolucao e cliente (python jobs.py <job>)
+    import jobs
+    jobs.executar_jobs(['valorultent'])
@@ -0,0 +1,477 @@
+import numpy as np
+import oracledb
+import conexao_oracle
+from datetime import datetime, timedelta
+import argparse
+import itertools
+import math
+import os
+import re
+import time
+
+# --- GERADOR DO WINTHOR LOCAL ---
+# Cria as tabelas PC* de winthor_local.sql no banco apontado por ORACLE_DSN/ORACLE_USER
+# (ver docker-compose.winthor-local.yml) e as popula com dados sintéticos e reproduzíveis:
+# a mesma --semente e os mesmos tamanhos geram sempre o mesmo banco. O volume é guiado por
+# --linhas-mov (1M a 100M linhas de PCMOV); pedidos, títulos e itens acompanham esse volume.
+# Os valores seguem os filtros das queries do repositório (CODOPER 'S', CODFILIAL 10 fora
+# das vendas, emitente 8888 = televendas, PCLIB do usuário 608, validades nos próximos meses).
+
+ARQUIVO_DDL = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'winthor_local.sql')
+INICIO_MOVIMENTO = datetime(2024, 1, 1)
+INICIO_TITULOS = datetime(2025, 1, 1)
+TAMANHO_LOTE = 50_000
+ITENS_POR_PEDIDO = 8
+
+FILIAIS = ['1', '2', '3', '10']
+MATRICULA_TELEVENDAS = 8888
+CODFUNC_LIBERACAO = 608
+CLASSIFICACOES = ['F', 'H', 'O']
+COBRANCAS = ['BK', 'CART', 'C', 'DH', 'DESD', 'DEVP', 'BNF', 'CRED']
+ORIGENS_PEDIDO = ['F', 'T', 'W']
+POSICOES_PEDIDO = ['L', 'M', 'P', 'B', 'F']
+
+
+# --- DDL ---
+def comandos_ddl(caminho=ARQUIVO_DDL):
+    """Comandos do arquivo .sql (sem comentários), na ordem em que aparecem."""
+    with open(caminho, encoding='utf-8') as f:
+        texto = '\n'.join(linha for linha in f if not linha.lstrip().startswith('--'))
+    return [comando.strip() for comando in texto.split(';') if comando.strip()]
+
+
+def recriar_tabelas(conexao):
+    comandos = comandos_ddl()
+    tabelas = [re.match(r'CREATE TABLE (\w+)', c).group(1) for c in comandos if c.startswith('CREATE TABLE')]
+    with conexao.cursor() as cursor:
+        for tabela in tabelas:
+            try:
+                cursor.execute(f'DROP TABLE {tabela} PURGE')
+            except oracledb.DatabaseError as e:
+                if e.args[0].code != 942:  # ORA-00942: tabela não existe
+                    raise
+        for comando in comandos:
+            cursor.execute(comando)
+    print(f'[+] {len(tabelas)} tabelas recriadas a partir de {os.path.basename(ARQUIVO_DDL)}')
+
+
+# --- INSERÇÃO ---
+def _datas(base, dias, nulo=None):
+    """Deslocamentos em dias a partir de base -> lista de datetime para o bind (None onde nulo)."""
+    datas = np.datetime64(base, 'D') + np.asarray(dias).astype('timedelta64[D]')
+    if nulo is not None:
+        datas[nulo] = np.datetime64('NaT')
+    return datas.astype('datetime64[s]').tolist()
+
+
+def _nulos(valores, mascara):
+    """Lista com None onde a máscara é verdadeira."""
+    return [None if nulo else valor for valor, nulo in zip(valores, mascara)]
+
+
+def inserir(conexao, tabela, colunas):
+    """Insere {coluna: lista/array} em lotes de TAMANHO_LOTE (direct-path, um commit por lote)."""
+    nomes = list(colunas)
+    valores = [v.tolist() if isinstance(v, np.ndarray) else v for v in colunas.values()]
+    total = len(valores[0])
+    sql = (f"INSERT /*+ APPEND_VALUES */ INTO {tabela} ({', '.join(nomes)}) "
+           f"VALUES ({', '.join(f':{i + 1}' for i in range(len(nomes)))})")
+    with conexao.cursor() as cursor:
+        for inicio in range(0, total, TAMANHO_LOTE):
+            fim = inicio + TAMANHO_LOTE
+            cursor.executemany(sql, list(zip(*(v[inicio:fim] for v in valores))))
+            conexao.commit()
+    return total
+
+
+def _pesos(rng, n, expoente=1.0):
+    """Popularidade com cauda longa (Zipf) embaralhada entre os códigos."""
+    pesos = 1.0 / np.arange(1, n + 1) ** expoente
+    rng.shuffle(pesos)
+    return pesos / pesos.sum()
+
+
+# --- CADASTROS ---
+def gerar_cadastros(conexao, rng, args):
+    """Tabelas de apoio; devolve o que o movimento precisa para manter as chaves consistentes."""
+    n_prod, n_cli, n_forn, n_rca = args.produtos, args.clientes, args.fornecedores, args.rcas
+    n_superv = max(1, n_rca // 10)
+    hoje = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    inserir(conexao, 'PCFILIAL', {'CODIGO': FILIAIS, 'RAZAOSOCIAL': [f'FILIAL {f}' for f in FILIAIS]})
+    inserir(conexao, 'PCSUPERV', {'CODSUPERVISOR': np.arange(1, n_superv + 1),
+                                  'NOME': [f'SUPERVISOR {i}' for i in range(1, n_superv + 1)]})
+    cod_usur = np.arange(1, n_rca + 1)
+    inserir(conexao, 'PCUSUARI', {'CODUSUR': cod_usur, 'NOME': [f'RCA {i}' for i in cod_usur],
+                                  'CODSUPERVISOR': rng.integers(1, n_superv + 1, n_rca)})
+    # Matrículas: uma por RCA, compradores, operadores de televendas e o emitente 8888
+    n_compradores, n_operadores = max(1, n_forn // 20), 20
+    matriculas = np.concatenate([cod_usur + 1000, np.arange(1, n_compradores + 1),
+                                 np.arange(2001, 2001 + n_operadores), [MATRICULA_TELEVENDAS]])
+    inserir(conexao, 'PCEMPR', {
+        'MATRICULA': matriculas,
+        'NOME': [f'FUNCIONARIO {m}' for m in matriculas],
+        'CODUSUR': cod_usur.tolist() + [None] * (len(matriculas) - n_rca),
+    })
+
+    n_pracas = 50
+    inserir(conexao, 'PCPRACA', {'CODPRACA': np.arange(1, n_pracas + 1),
+                                 'PRACA': [f'PRACA {i}' for i in range(1, n_pracas + 1)]})
+    cod_cli = np.arange(1, n_cli + 1)
+    tipo_fj = rng.choice(['J', 'F'], n_cli, p=[0.8, 0.2])
+    inserir(conexao, 'PCCLIENT', {
+        'CODCLI': cod_cli,
+        'CLIENTE': [f'CLIENTE {i}' for i in cod_cli],
+        'FANTASIA': [f'FANTASIA {i}' for i in cod_cli],
+        'CODCLIPRINC': np.where(rng.random(n_cli) < 0.1, rng.integers(1, n_cli + 1, n_cli), cod_cli),
+        'CGCENT': [f'{i:014d}' if t == 'J' else f'{i:011d}' for i, t in zip(rng.integers(1, 10**11, n_cli), tipo_fj)],
+        'TIPOFJ': tipo_fj,
+        'CODPRACA': rng.integers(1, n_pracas + 1, n_cli),
+    })
+
+    cod_forn = np.arange(1, n_forn + 1)
+    inserir(conexao, 'PCFORNEC', {
+        'CODFORNEC': cod_forn,
+        'FORNECEDOR': [f'FORNECEDOR {i}' for i in cod_forn],
+        'CLASSIFICACAO': rng.choice(CLASSIFICACOES, n_forn, p=[0.5, 0.35, 0.15]),
+        'CODCOMPRADOR': rng.integers(1, n_compradores + 1, n_forn),
+        'REVENDA': rng.choice(['S', 'N'], n_forn, p=[0.9, 0.1]),
+        'CODCLI': rng.integers(1, n_cli + 1, n_forn),
+    })
+
+    n_deptos, n_secoes, n_categorias, n_marcas = 10, 50, 200, 100
+    inserir(conexao, 'PCDEPTO', {'CODEPTO': np.arange(1, n_deptos + 1),
+                                 'DESCRICAO': [f'DEPARTAMENTO {i}' for i in range(1, n_deptos + 1)]})
+    depto_da_secao = rng.integers(1, n_deptos + 1, n_secoes)
+    inserir(conexao, 'PCSECAO', {'CODSEC': np.arange(1, n_secoes + 1), 'CODEPTO': depto_da_secao,
+                                 'DESCRICAO': [f'SECAO {i}' for i in range(1, n_secoes + 1)]})
+    secao_da_categoria = rng.integers(1, n_secoes + 1, n_categorias)
+    inserir(conexao, 'PCCATEGORIA', {'CODCATEGORIA': np.arange(1, n_categorias + 1), 'CODSEC': secao_da_categoria,
+                                     'CATEGORIA': [f'CATEGORIA {i}' for i in range(1, n_categorias + 1)]})
+    inserir(conexao, 'PCMARCA', {'CODMARCA': np.arange(1, n_marcas + 1),
+                                 'MARCA': [f'MARCA {i}' for i in range(1, n_marcas + 1)]})
+
+    cod_prod = np.arange(1, n_prod + 1)
+    categoria = rng.integers(1, n_categorias + 1, n_prod)
+    secao = secao_da_categoria[categoria - 1]
+    fornec_do_prod = rng.choice(cod_forn, n_prod, p=_pesos(rng, n_forn, 0.7))
+    por_lote = rng.random(n_prod) < 0.3
+    inserir(conexao, 'PCPRODUT', {
+        'CODPROD': cod_prod,
+        'DESCRICAO': [f'PRODUTO {i}' for i in cod_prod],
+        'CODFORNEC': fornec_do_prod,
+        'CODEPTO': depto_da_secao[secao - 1],
+        'CODSEC': secao,
+        'CODCATEGORIA': categoria,
+        'CODMARCA': rng.integers(1, n_marcas + 1, n_prod),
+        'ESTOQUEPORLOTE': np.where(por_lote, 'S', 'N'),
+        'DTEXCLUSAO': _datas(hoje, -rng.integers(1, 365, n_prod), nulo=rng.random(n_prod) >= 0.02),
+    })
+
+    # Estoque atual por filial x produto
+    custo = np.round(rng.lognormal(2.5, 1.0, n_prod), 2)
+    popularidade = _pesos(rng, n_prod, 0.9)
+    filial_fp = np.repeat(FILIAIS, n_prod)
+    prod_fp = np.tile(cod_prod, len(FILIAIS))
+    indice_prod = prod_fp - 1
+    n_fp = len(prod_fp)
+    giro = np.round(popularidade[indice_prod] * args.linhas_mov / max(1, (hoje - INICIO_MOVIMENTO).days) / len(FILIAIS), 6)
+    inserir(conexao, 'PCPRODFILIAL', {'CODPROD': prod_fp, 'CODFILIAL': filial_fp,
+                                      'ESTOQUEPORDTVALIDADEPK': rng.choice(['S', 'N'], n_fp, p=[0.3, 0.7])})
+    inserir(conexao, 'PCEST', {
+        'CODFILIAL': filial_fp,
+        'CODPROD': prod_fp,
+        'QTESTGER': np.round(giro * rng.uniform(0, 120, n_fp)),
+        'QTGIRODIA': giro,
+        'VALORULTENT': np.round(custo[indice_prod] * rng.uniform(0.95, 1.05, n_fp), 6),
+        'CUSTOULTENT': np.round(custo[indice_prod] * rng.uniform(0.9, 1.0, n_fp), 6),
+        'DTPRIMCOMPRA': _datas(INICIO_MOVIMENTO, -rng.integers(0, 3650, n_fp)),
+    })
+
+    # Endereços de armazenagem (AP) com validades espalhadas pelos próximos 18 meses
+    cod_endereco = np.arange(1, n_fp + 1)
+    inserir(conexao, 'PCENDERECO', {'CODENDERECO': cod_endereco, 'CODFILIAL': filial_fp,
+                                    'TIPOENDER': rng.choice(['AP', 'PK'], n_fp, p=[0.8, 0.2])})
+    inserir(conexao, 'PCESTENDERECO', {
+        'CODENDERECO': cod_endereco,
+        'CODPROD': prod_fp,
+        'QT': np.round(rng.uniform(0, 500, n_fp)),
+        'DTVAL': _datas(hoje, rng.integers(-30, 540, n_fp)),
+    })
+    com_lote = np.flatnonzero(por_lote[indice_prod])
+    lotes = rng.integers(1, 4, len(com_lote))
+    linha_lote = np.repeat(com_lote, lotes)
+    num_lote = np.concatenate([np.arange(1, n + 1) for n in lotes]) if len(lotes) else np.array([], dtype=int)
+    inserir(conexao, 'PCESTENDERECOI', {
+        'CODENDERECO': cod_endereco[linha_lote],
+        'CODPROD': prod_fp[linha_lote],
+        'NUMLOTE': num_lote.astype(str),
+        'QT': np.round(rng.uniform(1, 200, len(linha_lote))),
+        'DTVAL': _datas(hoje, rng.integers(-30, 540, len(linha_lote))),
+    })
+
+    inserir(conexao, 'PCCOB', {'CODCOB': COBRANCAS, 'COBRANCA': [f'COBRANCA {c}' for c in COBRANCAS]})
+    # Liberações do usuário 608 usadas pelas queries de títulos: todas as cobranças e supervisores
+    inserir(conexao, 'PCLIB', {'CODFUNC': [CODFUNC_LIBERACAO] * 2, 'CODTABELA': ['8', '7'],
+                               'CODIGOA': ['9999', '9999'], 'CODIGON': [None, 9999]})
+    n_promocoes = 20
+    inserir(conexao, 'PCPROMOCAOMED', {'CODPROMOCAOMED': np.arange(1, n_promocoes + 1),
+                                       'DESCRICAORESUMIDA': [f'PROMOCAO {i}' for i in range(1, n_promocoes + 1)]})
+    print(f'[+] Cadastros: {n_prod} produtos, {n_cli} clientes, {n_forn} fornecedores, {n_rca} RCAs')
+
+    return {
+        'hoje': hoje, 'custo': custo, 'popularidade': popularidade, 'fornec_do_prod': fornec_do_prod,
+        'operadores': np.arange(2001, 2001 + n_operadores), 'n_promocoes': n_promocoes,
+    }
+
+
+# --- MOVIMENTO: PCPEDC / PCMOV / PCPEDI / PCPREST ---
+def gerar_movimento(conexao, rng, args, cad):
+    """Pedidos do início de 2024 até hoje, com numped crescente no tempo, até somar --linhas-mov itens."""
+    hoje = cad['hoje']
+    total_dias = (hoje - INICIO_MOVIMENTO).days + 1
+    total_pedidos = math.ceil(args.linhas_mov / ITENS_POR_PEDIDO)
+    inicio_pedi = (hoje - timedelta(days=args.dias_pedidos) - INICIO_MOVIMENTO).days
+    inicio_titulos = (INICIO_TITULOS - INICIO_MOVIMENTO).days
+    pedidos_por_lote = max(1, TAMANHO_LOTE // ITENS_POR_PEDIDO)
+    n_prod = len(cad['custo'])
+    linhas_mov = linhas_pedi = linhas_prest = 0
+    inicio_geracao = time.perf_counter()
+
+    # total_pedidos é a estimativa que espalha os pedidos no calendário; o laço segue até fechar as linhas
+    for primeiro in itertools.count(0, pedidos_por_lote):
+        numped = np.arange(primeiro, primeiro + pedidos_por_lote) + 1
+        # Itens: quantidade por pedido ~ Poisson; o último lote é cortado para fechar --linhas-mov
+        itens = np.clip(rng.poisson(ITENS_POR_PEDIDO - 1, len(numped)) + 1, 1, 40)
+        restante = args.linhas_mov - linhas_mov
+        if itens.sum() > restante:
+            acumulado = np.cumsum(itens)
+            n = int(np.searchsorted(acumulado, restante)) + 1
+            numped, itens = numped[:n], itens[:n]
+            itens[-1] -= acumulado[n - 1] - restante
+        n = len(numped)
+        dia = np.minimum((numped - 1) * total_dias // total_pedidos, total_dias - 1)
+        filial = rng.choice(FILIAIS, n, p=[0.4, 0.3, 0.2, 0.1])
+        cliente = rng.integers(1, args.clientes + 1, n)
+        rca = rng.integers(1, args.rcas + 1, n)
+        origem = rng.choice(ORIGENS_PEDIDO, n, p=[0.5, 0.35, 0.15])
+        emitente = np.where(origem == 'T', np.where(rng.random(n) < 0.4, MATRICULA_TELEVENDAS,
+                                                    rng.choice(cad['operadores'], n)), rca + 1000)
+        cancelado = rng.random(n) < 0.02
+        dtcancel = dia + rng.integers(0, 5, n)
+
+        item_ped = np.repeat(np.arange(n), itens)
+        m = len(item_ped)
+        produto = rng.choice(n_prod, m, p=cad['popularidade'])
+        qt = rng.poisson(3, m) + 1.0
+        punit = np.round(cad['custo'][produto] * rng.uniform(1.1, 1.6, m), 6)
+        valor_item = qt * punit
+        vltotal = np.round(np.bincount(item_ped, weights=valor_item, minlength=n), 2)
+
+        inserir(conexao, 'PCPEDC', {
+            'NUMPED': numped,
+            'NUMTRANSVENDA': numped,
+            'DATA': _datas(INICIO_MOVIMENTO, dia),
+            'DTCANCEL': _datas(INICIO_MOVIMENTO, dtcancel, nulo=~cancelado),
+            'CODCLI': cliente,
+            'CODUSUR': rca,
+            'CODEMITENTE': emitente,
+            'CODFILIAL': filial,
+            'VLTOTAL': vltotal,
+            'VLATEND': np.round(vltotal * rng.uniform(0.9, 1.0, n), 2),
+            'TIPOFV': rng.choice(['OL', 'PE'], n, p=[0.6, 0.4]),
+            'ORIGEMPED': origem,
+            'POSICAO': np.where(dia < total_dias - 3, 'F', rng.choice(POSICOES_PEDIDO, n)),
+            'CONDVENDA': rng.choice([1, 5, 7], n, p=[0.85, 0.1, 0.05]),
+        })
+
+        linhas = np.arange(linhas_mov, linhas_mov + m) + 1
+        codoper = rng.choice(['S', 'E'], m, p=[0.95, 0.05])
+        com_lote = rng.random(m) < 0.3
+        inserir(conexao, 'PCMOV', {
+            'NUMTRANSITEM': linhas,
+            'CODOPER': codoper,
+            'DTMOV': _datas(INICIO_MOVIMENTO, dia[item_ped]),
+            'DTCANCEL': _datas(INICIO_MOVIMENTO, dtcancel[item_ped], nulo=~cancelado[item_ped]),
+            'CODFILIAL': filial[item_ped],
+            'NUMPED': numped[item_ped],
+            'CODUSUR': rca[item_ped],
+            'CODCLI': cliente[item_ped],
+            'CODFORNEC': cad['fornec_do_prod'][produto],
+            'CODPROD': produto + 1,
+            'NUMLOTE': _nulos(rng.integers(1, 4, m).astype(str).tolist(), ~com_lote),
+            'DATAVALIDADE': _datas(INICIO_MOVIMENTO, dia[item_ped] + rng.integers(90, 720, m), nulo=~com_lote),
+            'QT': qt,
+            'PUNIT': punit,
+            'VLOUTROS': np.round(valor_item * rng.uniform(0, 0.02, m), 6),
+            'VLOUTRASDESP': np.zeros(m),
+            'VLFRETE_RATEIO': np.round(valor_item * rng.uniform(0, 0.01, m), 6),
+            'VLREPASSE': np.zeros(m),
+            'ST': np.round(valor_item * rng.choice([0, 0.12], m, p=[0.7, 0.3]), 6),
+            'VLIPI': np.zeros(m),
+        })
+        linhas_mov += m
+
+        # PCPEDI só para a janela recente que os painéis do dia e de pedidos leem
+        recente = dia[item_ped] >= inicio_pedi
+        if recente.any():
+            seq = linhas - np.repeat(linhas[np.cumsum(itens) - itens], itens) + 1
+            qt_r = qt[recente]
+            linhas_pedi += inserir(conexao, 'PCPEDI', {
+                'NUMPED': numped[item_ped][recente],
+                'CODPROD': produto[recente] + 1,
+                'NUMSEQ': seq[recente],
+                'QT': qt_r,
+                'QTFALTA': np.where(rng.random(len(qt_r)) < 0.05, np.floor(qt_r / 2), 0.0),
+                'PVENDA': punit[recente],
+                'NUMLOTE': _nulos(np.ones(len(qt_r), dtype=int).astype(str).tolist(), ~com_lote[recente]),
+                'POSICAO': np.where(dia[item_ped][recente] < total_dias - 3, 'F', rng.choice(POSICOES_PEDIDO, len(qt_r))),
+                'CODPROMOCAOMED': _nulos(rng.integers(1, cad['n_promocoes'] + 1, len(qt_r)).tolist(),
+                                         rng.random(len(qt_r)) > 0.1),
+            })
+
+        # Um título por pedido faturado a partir de 2025; ~70% já pagos
+        titulo = (dia >= inicio_titulos) & ~cancelado
+        if titulo.any():
+            k = int(titulo.sum())
+            dia_t = dia[titulo]
+            vencimento = dia_t + rng.choice([7, 14, 28, 35], k)
+            pago = rng.random(k) < 0.7
+            linhas_prest += inserir(conexao, 'PCPREST', {
+                'CODCLI': cliente[titulo],
+                'PREST': ['1'] * k,
+                'DUPLIC': numped[titulo],
+                'VALOR': vltotal[titulo],
+                'DTVENC': _datas(INICIO_MOVIMENTO, vencimento),
+                'VPAGO': np.where(pago, vltotal[titulo], 0.0),
+                'TXPERM': np.full(k, 0.033),
+                'DTPAG': _datas(INICIO_MOVIMENTO, vencimento + rng.integers(-5, 10, k), nulo=~pago),
+                'DTEMISSAO': _datas(INICIO_MOVIMENTO, dia_t),
+                'DTCANCEL': [None] * k,
+                'CODFILIAL': filial[titulo],
+                'CODUSUR': rca[titulo],
+                'CODSUPERVISOR': [None] * k,
+                'CODCOB': rng.choice(COBRANCAS, k, p=[0.4, 0.2, 0.15, 0.1, 0.05, 0.04, 0.03, 0.03]),
+                'VALORDESC': np.zeros(k),
+                'VLDEVOL': np.zeros(k),
+                'DTDEVOL': [None] * k,
+                'NUMTRANSVENDA': numped[titulo],
+                'NUMPED': numped[titulo],
+                'CODEMITENTEPEDIDO': emitente[titulo],
+            })
+
+        if (primeiro // pedidos_por_lote) % 20 == 0 or linhas_mov >= args.linhas_mov:
+            decorrido = time.perf_counter() - inicio_geracao
+            print(f'[i] PCMOV: {linhas_mov:,} / {args.linhas_mov:,} linhas ({linhas_mov / decorrido:,.0f} linhas/s)')
+        if linhas_mov >= args.linhas_mov:
+            break
+
+    print(f'[+] Movimento: {linhas_mov:,} PCMOV | {linhas_pedi:,} PCPEDI | {linhas_prest:,} PCPREST')
+
+
+# --- HISTÓRICO DE ESTOQUE: PCHISTEST ---
+def gerar_historico_estoque(conexao, rng, args, cad):
+    """Uma foto por dia de filial x produto nos últimos --dias-hist dias, com ~10% de dias zerados."""
+    n_prod = min(args.produtos, args.produtos_hist)
+    filial = np.repeat(FILIAIS, n_prod)
+    produto = np.tile(np.arange(1, n_prod + 1), len(FILIAIS))
+    custo = cad['custo'][produto - 1]
+    estoque = np.round(rng.uniform(0, 500, len(produto)))
+    dias_por_lote = max(1, TAMANHO_LOTE // len(produto))
+    total = 0
+    for primeiro in range(args.dias_hist, 0, -dias_por_lote):
+        dias = range(primeiro, max(0, primeiro - dias_por_lote), -1)
+        qts, datas = [], []
+        for dias_atras in dias:
+            estoque = np.maximum(0, estoque + rng.normal(0, 20, len(produto))).round()
+            qts.append(np.where(rng.random(len(produto)) < 0.1, 0.0, estoque))
+            datas.append(np.full(len(produto), -dias_atras))
+        k = len(qts)
+        total += inserir(conexao, 'PCHISTEST', {
+            'CODFILIAL': np.tile(filial, k),
+            'CODPROD': np.tile(produto, k),
+            'DATA': _datas(cad['hoje'], np.concatenate(datas)),
+            'QTESTGER': np.concatenate(qts),
+            'CUSTOREP': np.tile(custo, k),
+        })
+    print(f'[+] PCHISTEST: {total:,} linhas ({args.dias_hist} dias x {len(produto)} filial/produto)')
+
+
+# --- VERBAS: PCVERBA / PCAPLICVERBA / PCMOVCRFOR ---
+def gerar_verbas(conexao, rng, args, cad):
+    n = args.verbas
+    numverba = np.arange(1, n + 1)
+    dias = (cad['hoje'] - INICIO_MOVIMENTO).days
+    cadastro = rng.integers(0, dias + 1, n)
+    valor = np.round(rng.lognormal(7, 1.2, n), 2)
+    inserir(conexao, 'PCVERBA', {
+        'NUMVERBA': numverba,
+        'CODFILIAL': rng.choice(FILIAIS[:-1], n),
+        'CODFORNEC': rng.integers(1, args.fornecedores + 1, n),
+        'CODCONTA': rng.choice(['2001', '2002', '3010'], n).tolist(),
+        'NUMNOTA': rng.integers(1, 10**6, n),
+        'NUMTRANSENTDEVFORNEC': _nulos(rng.integers(1, 10**6, n).tolist(), rng.random(n) > 0.3),
+        'DTCADASTRO': _datas(INICIO_MOVIMENTO, cadastro),
+        'DTVENC': _datas(INICIO_MOVIMENTO, cadastro + rng.integers(30, 120, n)),
+        'DTCANCEL': _datas(INICIO_MOVIMENTO, cadastro + 1, nulo=rng.random(n) >= 0.05),
+        'REFERENCIA': [f'ACORDO {i}' for i in numverba],
+        'REFERENCIA1': [f'REF {i}' for i in numverba],
+        'VALOR': valor,
+    })
+    # Aplicações parciais e lançamentos de débito/crédito por verba
+    aplicacoes = rng.integers(0, 4, n)
+    verba_aplic = np.repeat(numverba, aplicacoes)
+    inserir(conexao, 'PCAPLICVERBA', {
+        'NUMVERBA': verba_aplic,
+        'VLAPLIC': np.round(valor[verba_aplic - 1] * rng.uniform(0.05, 0.3, len(verba_aplic)), 2),
+        'DTESTORNO': _datas(cad['hoje'], np.full(len(verba_aplic), -1), nulo=rng.random(len(verba_aplic)) >= 0.03),
+    })
+    lancamentos = rng.integers(1, 4, n)
+    verba_lanc = np.repeat(numverba, lancamentos)
+    inserir(conexao, 'PCMOVCRFOR', {
+        'NUMVERBA': verba_lanc,
+        'TIPO': rng.choice(['D', 'C'], len(verba_lanc), p=[0.7, 0.3]),
+        'VALOR': np.round(valor[verba_lanc - 1] * rng.uniform(0.1, 0.5, len(verba_lanc)), 6),
+        'DTESTORNO': _datas(cad['hoje'], np.full(len(verba_lanc), -1), nulo=rng.random(len(verba_lanc)) >= 0.03),
+    })
+    print(f'[+] Verbas: {n} PCVERBA | {len(verba_aplic)} PCAPLICVERBA | {len(verba_lanc)} PCMOVCRFOR')
+
+
+def coletar_estatisticas(conexao):
+    with conexao.cursor() as cursor:
+        cursor.execute("BEGIN DBMS_STATS.GATHER_SCHEMA_STATS(USER); END;")
+    print('[+] Estatísticas do otimizador atualizadas')
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(description='Cria e popula o Winthor local (tabelas PC*) com dados sintéticos.')
+    parser.add_argument('--recriar', action='store_true', help='Apaga e recria as tabelas de winthor_local.sql antes de gerar.')
+    parser.add_argument('--semente', type=int, default=42, help='Semente do gerador (mesma semente = mesmo banco).')
+    parser.add_argument('--linhas-mov', type=int, default=1_000_000, help='Linhas de PCMOV (1M a 100M).')
+    parser.add_argument('--produtos', type=int, default=5000)
+    parser.add_argument('--clientes', type=int, default=20000)
+    parser.add_argument('--fornecedores', type=int, default=300)
+    parser.add_argument('--rcas', type=int, default=100)
+    parser.add_argument('--verbas', type=int, default=5000)
+    parser.add_argument('--dias-pedidos', type=int, default=120, help='Janela recente com itens em PCPEDI.')
+    parser.add_argument('--dias-hist', type=int, default=400, help='Dias de fotos de estoque em PCHISTEST.')
+    parser.add_argument('--produtos-hist', type=int, default=2000, help='Produtos com histórico em PCHISTEST.')
+    return parser
+
+
+if __name__ == "__main__":
+    args = criar_parser().parse_args()
+    rng = np.random.default_rng(args.semente)
+    inicio = time.perf_counter()
+    print(f'Gerando Winthor local em {conexao_oracle.ORACLE_USER}@{conexao_oracle.ORACLE_DSN} (semente {args.semente})')
+
+    with conexao_oracle.conectar() as conexao:
+        if args.recriar:
+            recriar_tabelas(conexao)
+        cadastros = gerar_cadastros(conexao, rng, args)
+        gerar_movimento(conexao, rng, args, cadastros)
+        gerar_historico_estoque(conexao, rng, args, cadastros)
+        gerar_verbas(conexao, rng, args, cadastros)
+        coletar_estatisticas(conexao)
+
+    print(f'Concluído em {time.perf_counter() - inicio:.1f}s')
@@ -1,26 +1,20 @@
 import pandas as pd
-import oracledb
+import conexao_oracle
+import manifesto
+import telemetria
 import os
-from dotenv import load_dotenv
+import argparse
+import hashlib
+import time
+from datetime import date
 
 # --- CONFIGURAÇÕES ---
-load_dotenv()
-
-ORACLE_LIB_DIR = r"C:\instantclient_23_9" 
-ORACLE_USER = os.getenv('ORACLE_USER')
-ORACLE_PASSWORD = os.getenv('ORACLE_PASSWORD')
-ORACLE_DSN = os.getenv('ORACLE_DSN', '192.168.0.1/wint')
-
-try:
-    oracledb.init_oracle_client(lib_dir=ORACLE_LIB_DIR)
-    print("✅ Oracle Thick Mode inicializado.")
-except Exception as e:
-    print(f"⚠️ Aviso: {e}")
+DIRETORIO_CACHE = os.getenv('HIST_SUPER_EST_CACHE', 'cache_excesso_estoque')
 
 # --- SQL ---
 SQL_EXCESSO_MENSAL = """
 WITH base_date AS (
-    SELECT TO_DATE('01/' || LPAD(:mes_ref, 2, '0') || '/2025', 'DD/MM/YYYY') AS dt_ref FROM DUAL
+    SELECT TO_DATE('01/' || LPAD(:mes_ref, 2, '0') || '/' || :ano, 'DD/MM/YYYY') AS dt_ref FROM DUAL
 ),
 dias_estoque_zerado AS (
     SELECT
@@ -69,7 +63,7 @@ estoque_posicional AS (
     LEFT JOIN pcsecao sec    ON sec.codsec = p.codsec AND sec.codepto = dep.codepto
     LEFT JOIN pccategoria cat ON cat.codcategoria = p.codcategoria AND cat.codsec = sec.codsec
     LEFT JOIN pcempr ep      ON ep.matricula = f.codcomprador
-    WHERE TRIM(UPPER(dep.descricao) NOT IN ('IMOBILIZADO', 'ESTOQUE DE INSUMOS', 'MATERIAIS DE CONSUMO')
+    WHERE TRIM(UPPER(dep.descricao)) NOT IN ('IMOBILIZADO', 'ESTOQUE DE INSUMOS', 'MATERIAIS DE CONSUMO')
 ),
 produtos_novos AS (
     SELECT codfilial, codprod, dtprimcompra
@@ -130,49 +124,263 @@ LEFT JOIN produtos_novos n        ON e.codfilial = n.codfilial AND e.codprod = n
 ORDER BY e.codfilial, valor_excedente DESC
 """
 
-def verificar_e_apagar_csv(nome_arquivo):
-    if os.path.exists(nome_arquivo):
-        try:
-            os.remove(nome_arquivo)
-            print(f' Arquivo antigo {nome_arquivo} apagado com sucesso.')
-        except OSError as e:
-            print(f' Erro ao apagar o arquivo {nome_arquivo}: {e}')
-    else:
-        print(f' Arquivo {nome_arquivo} não encontrado. Criando novo...')
-
-def processar_anual():
+# Versão anual em uma passada: o histórico diário de pchistest e pcmov da janela inteira
+# (90 dias antes do primeiro mês até o último) é lido uma única vez e as 12 datas de
+# referência são avaliadas sobre ele, em vez de 12 execuções com janelas sobrepostas.
+SQL_EXCESSO_ANUAL = """
+WITH meses AS (
+    SELECT :mes_inicial + LEVEL - 1 AS mes,
+           ADD_MONTHS(TO_DATE('01/01/' || :ano, 'DD/MM/YYYY'), :mes_inicial + LEVEL - 2) AS dt_ref
+    FROM DUAL
+    CONNECT BY LEVEL <= :mes_final - :mes_inicial + 1
+),
+janela AS (
+    SELECT MIN(dt_ref) - 90 AS dt_inicio, MAX(dt_ref) AS dt_fim FROM meses
+),
+zerados_diarios AS (
+    -- Uma leitura de pchistest: só os dias com estoque zerado interessam à contagem
+    SELECT h.codfilial, h.codprod, h.data
+    FROM pchistest h, janela j
+    WHERE h.data >= j.dt_inicio AND h.data < j.dt_fim
+      AND h.qtestger <= 0
+),
+dias_estoque_zerado AS (
+    SELECT m.mes, z.codfilial, z.codprod, COUNT(*) AS qtd_dias_zerados
+    FROM zerados_diarios z
+    JOIN meses m ON z.data >= m.dt_ref - 90 AND z.data < m.dt_ref
+    GROUP BY m.mes, z.codfilial, z.codprod
+),
+vendas_diarias AS (
+    -- Uma leitura de pcmov, já somada por dia para a junção com os meses ficar pequena
+    SELECT mv.codfilial, mv.codprod, TRUNC(mv.dtmov) AS dia, SUM(mv.qt) AS qt
+    FROM pcmov mv, janela j
+    WHERE mv.codoper = 'S'
+      AND mv.dtmov >= j.dt_inicio AND mv.dtmov < j.dt_fim
+      AND mv.dtcancel IS NULL
+    GROUP BY mv.codfilial, mv.codprod, TRUNC(mv.dtmov)
+),
+vendas_ultimos_90_dias AS (
+    SELECT m.mes, vd.codfilial, vd.codprod, SUM(vd.qt) AS qtd_vendas_90d
+    FROM vendas_diarias vd
+    JOIN meses m ON vd.dia >= m.dt_ref - 90 AND vd.dia < m.dt_ref
+    GROUP BY m.mes, vd.codfilial, vd.codprod
+),
+estoque_posicional AS (
+    SELECT
+        m.mes,
+        he.codfilial,
+        he.codprod,
+        he.qtestger AS qtd_estoque_dia_primeiro,
+        he.custorep AS valor_ultima_entrada,
+        p.descricao AS produto,
+        CASE 
+            WHEN f.classificacao = 'F' THEN 'Farma'
+            WHEN f.classificacao = 'H' THEN 'HB'
+            ELSE 'Outros'
+        END AS classificacao,
+        cat.categoria,
+        sec.descricao AS secao,
+        dep.descricao AS departamento,
+        f.codcomprador,
+        ep.nome AS comprador,
+        f.codfornec,
+        f.fornecedor
+    FROM pchistest he
+    JOIN meses m ON he.data = m.dt_ref
+    INNER JOIN pcprodut p    ON p.codprod = he.codprod
+    INNER JOIN pcfornec f    ON f.codfornec = p.codfornec
+    LEFT JOIN pcdepto dep    ON dep.codepto = p.codepto
+    LEFT JOIN pcsecao sec    ON sec.codsec = p.codsec AND sec.codepto = dep.codepto
+    LEFT JOIN pccategoria cat ON cat.codcategoria = p.codcategoria AND cat.codsec = sec.codsec
+    LEFT JOIN pcempr ep      ON ep.matricula = f.codcomprador
+    WHERE TRIM(UPPER(dep.descricao)) NOT IN ('IMOBILIZADO', 'ESTOQUE DE INSUMOS', 'MATERIAIS DE CONSUMO')
+),
+produtos_novos AS (
+    SELECT m.mes, pe.codfilial, pe.codprod, pe.dtprimcompra
+    FROM pcest pe
+    JOIN meses m ON pe.dtprimcompra >= m.dt_ref - 120 AND pe.dtprimcompra < m.dt_ref
+)
+SELECT
+    e.codfilial,
+    e.classificacao,
+    e.codprod,
+    e.produto,
+    e.categoria,
+    e.secao,
+    e.departamento,
+    e.codcomprador,
+    e.comprador,
+    e.codfornec,
+    e.fornecedor,
+    e.valor_ultima_entrada,
+    e.qtd_estoque_dia_primeiro AS qtd_total_estoque,
+    
+    NVL(v.qtd_vendas_90d, 0) AS qtd_vendas_90d,
+    NVL(d.qtd_dias_zerados, 0) AS qtd_dias_zerados,
+    
+    ROUND(e.qtd_estoque_dia_primeiro * e.valor_ultima_entrada, 2) AS valor_estoque,
+    
+    -- VMD Corrigida: Venda / (90 dias - dias zerados)
+    ROUND(
+        CASE
+            WHEN (90 - NVL(d.qtd_dias_zerados, 0)) <= 0 THEN 0
+            ELSE NVL(v.qtd_vendas_90d, 0) / (90 - NVL(d.qtd_dias_zerados, 0))
+        END, 4) AS vmd_corrigida,
+
+    -- VALOR EXCEDENTE BASEADO NA VMD CORRIGIDA
+    ROUND(
+        GREATEST(0,
+            CASE
+                WHEN n.codprod IS NOT NULL THEN 0 -- Isenta novos
+                WHEN NVL(v.qtd_vendas_90d, 0) = 0 THEN (e.qtd_estoque_dia_primeiro * e.valor_ultima_entrada) -- Sem venda = 100% Excesso
+                
+                WHEN e.classificacao = 'Farma' THEN
+                    (e.qtd_estoque_dia_primeiro - ( (NVL(v.qtd_vendas_90d, 0) / NULLIF(90 - NVL(d.qtd_dias_zerados, 0), 0)) * 90) ) * e.valor_ultima_entrada
+                
+                WHEN e.classificacao = 'HB' THEN
+                    (e.qtd_estoque_dia_primeiro - ( (NVL(v.qtd_vendas_90d, 0) / NULLIF(90 - NVL(d.qtd_dias_zerados, 0), 0)) * 60) ) * e.valor_ultima_entrada
+                ELSE 0
+            END
+        ), 2) AS valor_excedente,
+
+    CASE WHEN n.codprod IS NOT NULL THEN 'Sim' ELSE 'Não' END AS is_produto_novo,
+    e.mes AS mes
+FROM estoque_posicional e
+LEFT JOIN vendas_ultimos_90_dias v ON e.mes = v.mes AND e.codfilial = v.codfilial AND e.codprod = v.codprod
+LEFT JOIN dias_estoque_zerado d   ON e.mes = d.mes AND e.codfilial = d.codfilial AND e.codprod = d.codprod
+LEFT JOIN produtos_novos n        ON e.mes = n.mes AND e.codfilial = n.codfilial AND e.codprod = n.codprod
+ORDER BY e.mes, e.codfilial, valor_excedente DESC
+"""
+
+# --- CACHE POR MÊS ---
+# Cada mês de referência fica em um Parquet próprio, chaveado por ano, mês e versão da
+# consulta (hash do SQL). Meses fechados nunca mudam e são servidos do cache; o mês
+# corrente e os futuros são sempre recalculados e não são gravados.
+
+def versao_consulta():
+    return hashlib.sha1(SQL_EXCESSO_ANUAL.encode('utf-8')).hexdigest()[:10]
+
+
+def caminho_cache(ano, mes, versao):
+    return os.path.join(DIRETORIO_CACHE, f'excesso_{ano}_{mes:02d}_{versao}.parquet')
+
+
+def mes_fechado(ano, mes, hoje=None):
+    """O mês de referência está fechado quando o mês seguinte já começou."""
+    hoje = hoje or date.today()
+    return (ano, mes) < (hoje.year, hoje.month)
+
+
+def ler_cache(ano, mes, versao):
+    caminho = caminho_cache(ano, mes, versao)
+    if not os.path.exists(caminho):
+        return None
+    try:
+        return pd.read_parquet(caminho)
+    except Exception as e:
+        print(f"⚠️ Cache ilegível {caminho}, recalculando: {e}")
+        return None
+
+
+def gravar_cache(df_mes, ano, mes, versao):
+    os.makedirs(DIRETORIO_CACHE, exist_ok=True)
+    caminho = caminho_cache(ano, mes, versao)
+    temporario = caminho + '.tmp'
+    df_mes.to_parquet(temporario, index=False)
+    os.replace(temporario, caminho)
+
+
+def calcular_meses(conn, ano, mes_inicial, mes_final):
+    """Roda SQL_EXCESSO_ANUAL para o intervalo contínuo de meses e devolve {mes: DataFrame}."""
+    with telemetria.etapa('buscar'):
+        df = pd.read_sql(SQL_EXCESSO_ANUAL, con=conn,
+                         params={'ano': str(ano), 'mes_inicial': mes_inicial, 'mes_final': mes_final})
+    telemetria.registrar(len(df))
+    resultado = {mes: df_mes.reset_index(drop=True) for mes, df_mes in df.groupby('MES')}
+    return {mes: resultado.get(mes, df.iloc[0:0]) for mes in range(mes_inicial, mes_final + 1)}
+
+
+def processar_anual(ano=2025, por_mes=False, forcar=False):
+    """Gera o excesso de estoque dos 12 meses do ano.
+
+    Por padrão roda SQL_EXCESSO_ANUAL (uma varredura do histórico) só para os meses que
+    não estão no cache; forcar=True ignora o cache e recalcula tudo. por_mes=True mantém
+    o caminho antigo de 12 execuções de SQL_EXCESSO_MENSAL (sem cache), útil para conferir.
+    """
     lista_final = []
     
     try:
-        print(f"🚀 Iniciando conexão com {ORACLE_DSN}...")
-        with oracledb.connect(user=ORACLE_USER, password=ORACLE_PASSWORD, dsn=ORACLE_DSN) as conn:
+        print(f"🚀 Iniciando conexão com {conexao_oracle.ORACLE_DSN}...")
+        with conexao_oracle.conectar() as conn:
+            inicio = time.perf_counter()
             
-            for mes in range(1, 13):
-                print(f"📊 Processando Mês: {mes:02d}/2025...", end="\r")
-                df_mes = pd.read_sql(SQL_EXCESSO_MENSAL, con=conn, params={'mes_ref': mes})
-                
-                if not df_mes.empty:
-                    lista_final.append(df_mes)
+            if por_mes:
+                for mes in range(1, 13):
+                    print(f"📊 Processando Mês: {mes:02d}/{ano}...", end="\r")
+                    with telemetria.etapa('buscar'):
+                        df_mes = pd.read_sql(SQL_EXCESSO_MENSAL, con=conn, params={'mes_ref': mes, 'ano': str(ano)})
+                    telemetria.registrar(len(df_mes))
+                    
+                    if not df_mes.empty:
+                        lista_final.append(df_mes)
+            else:
+                versao = versao_consulta()
+                por_mes_ref = {}
+                if not forcar:
+                    for mes in range(1, 13):
+                        if mes_fechado(ano, mes):
+                            df_cache = ler_cache(ano, mes, versao)
+                            if df_cache is not None:
+                                por_mes_ref[mes] = df_cache
+                pendentes = [mes for mes in range(1, 13) if mes not in por_mes_ref]
+                print(f"🗄️ Cache (versão {versao}): {len(por_mes_ref)} mês(es) reaproveitado(s), "
+                      f"{len(pendentes)} a calcular.")
+
+                if pendentes:
+                    # Uma passada cobrindo do primeiro ao último mês pendente
+                    mes_inicial, mes_final = min(pendentes), max(pendentes)
+                    print(f"📊 Processando {mes_inicial:02d} a {mes_final:02d}/{ano} em uma passada...")
+                    calculados = calcular_meses(conn, ano, mes_inicial, mes_final)
+                    for mes, df_mes in calculados.items():
+                        if mes in por_mes_ref:
+                            continue
+                        por_mes_ref[mes] = df_mes
+                        if mes_fechado(ano, mes):
+                            gravar_cache(df_mes, ano, mes, versao)
+
+                lista_final = [por_mes_ref[mes] for mes in sorted(por_mes_ref) if not por_mes_ref[mes].empty]
             
             if not lista_final:
                 print("\n❌ Nenhum dado encontrado.")
                 return
 
-            print("\n🔄 Consolidando resultados...")
+            print(f"\n🔄 Consolidando resultados... ({time.perf_counter() - inicio:.1f}s)")
             df_final = pd.concat(lista_final, ignore_index=True)
             
 
             df_final = df_final.sort_values(by=['MES', 'CODFILIAL'])
             
-            nome_arquivo = 'excesso_estoque_completo_2025.csv'
-            verificar_e_apagar_csv(nome_arquivo)
-            df_final.to_csv(nome_arquivo, index=False, sep=';', encoding='utf-8-sig', decimal=',')
+            nome_arquivo = f'excesso_estoque_completo_{ano}.csv'
+            conexao_oracle.verificar_e_apagar(nome_arquivo)
+            with telemetria.etapa('gravar'):
+                df_final.to_csv(nome_arquivo, index=False, sep=';', encoding='utf-8-sig', decimal=',')
+            telemetria.registrar(bytes_gravados=os.path.getsize(nome_arquivo))
+            manifesto.gravar_manifesto(nome_arquivo, df_final)
             
             print(f"✨ Sucesso! Arquivo gerado: {nome_arquivo}")
             print(f"📈 Colunas geradas: {list(df_final.columns)}")
 
     except Exception as e:
         print(f"\n❌ Erro: {e}")
+        telemetria.falhou(e)
 
 if __name__ == "__main__":
-    processar_anual()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Excesso de estoque mensal consolidado no ano.')
+    parser.add_argument('--ano', type=int, default=2025, help='Ano de referência (padrão: 2025)')
+    parser.add_argument('--por-mes', action='store_true',
+                        help='Executa as 12 consultas mensais antigas em vez da consulta anual única')
+    parser.add_argument('--force', action='store_true',
+                        help='Ignora o cache por mês e recalcula todos os meses')
+    args = parser.parse_args()
+    with telemetria.medir(f'excesso_estoque_{args.ano}'):
+        processar_anual(args.ano, args.por_mes, args.force)
@@ -0,0 +1,84 @@
+import pandas as pd
+import numpy as np
+import threading
+
+# --- ÍNDICE DE FILTROS (listas de posições por valor) ---
+# Para cada coluna filtrável, as posições das linhas de cada valor ficam agrupadas (ponteiros no
+# formato CSR sobre um vetor int32 de posições). Um filtro marca só as linhas dos valores
+# escolhidos num vetor de seleção (bitmap booleano); vários filtros se combinam com E lógico, e
+# quem consome a seleção recorta apenas as colunas de que precisa. A base nunca é copiada
+# inteira e cada filtro novo custa as linhas que ele seleciona. As listas de uma coluna são
+# montadas no primeiro uso e ficam presas à base de onde vieram.
+
+
+def novo_indice(df):
+    """Índice vazio para a base; as listas de cada coluna nascem em listas_da_coluna."""
+    return {'linhas': len(df), 'listas': {}, 'trava': threading.Lock()}
+
+
+def _montar_listas(serie):
+    valores = serie.array if isinstance(serie.dtype, pd.CategoricalDtype) else pd.Categorical(serie)
+    codigos = np.asarray(valores.codes)
+    ordem = np.argsort(codigos, kind='stable').astype(np.int32)
+    # Nulos (código -1) ficam no começo da ordenação e fora de qualquer lista
+    nulos = int((codigos < 0).sum())
+    contagem = np.bincount(codigos[codigos >= 0], minlength=len(valores.categories))
+    listas = {
+        'valores': valores.categories,
+        'ponteiros': np.concatenate(([0], np.cumsum(contagem))).astype(np.int64),
+        'posicoes': ordem[nulos:],
+    }
+    listas['ponteiros'].flags.writeable = False
+    listas['posicoes'].flags.writeable = False
+    return listas
+
+
+def listas_da_coluna(indice, df, coluna):
+    with indice['trava']:
+        if coluna not in indice['listas']:
+            indice['listas'][coluna] = _montar_listas(df[coluna])
+        return indice['listas'][coluna]
+
+
+def valores_presentes(indice, df, coluna):
+    """Valores da coluna com ao menos uma linha, ordenados (opções dos filtros)."""
+    listas = listas_da_coluna(indice, df, coluna)
+    return sorted(listas['valores'][np.diff(listas['ponteiros']) > 0])
+
+
+def selecionar(indice, df, filtros):
+    """Vetor de seleção (bool por linha) para {coluna: valores escolhidos}; None sem filtro ativo."""
+    selecao = None
+    for coluna, escolhidos in filtros.items():
+        if not escolhidos:
+            continue
+        listas = listas_da_coluna(indice, df, coluna)
+        marcadas = np.zeros(indice['linhas'], dtype=bool)
+        for posicao in listas['valores'].get_indexer(list(escolhidos)):
+            if posicao >= 0:
+                marcadas[listas['posicoes'][listas['ponteiros'][posicao]:listas['ponteiros'][posicao + 1]]] = True
+        selecao = marcadas if selecao is None else selecao & marcadas
+    return selecao
+
+
+def distintos(df, selecao, coluna):
+    """Quantidade de valores distintos da coluna nas linhas selecionadas (sem copiar a base)."""
+    serie = df[coluna]
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        valores = np.asarray(serie.array.codes)
+        valores = valores if selecao is None else valores[selecao]
+        return len(pd.unique(valores[valores >= 0]))
+    valores = serie.to_numpy()
+    valores = valores if selecao is None else valores[selecao]
+    return len(pd.unique(valores[~pd.isna(valores)]))
+
+
+def restringir(posicoes, selecao):
+    """Posições (iloc) que também estão na seleção."""
+    return posicoes if selecao is None else posicoes[selecao[posicoes]]
+
+
+def recortar(df, selecao, colunas=None):
+    """Linhas selecionadas só das colunas pedidas (sem seleção, a própria base sem cópia)."""
+    base = df if colunas is None else df[colunas]
+    return base if selecao is None else base.take(np.flatnonzero(selecao))
@@ -0,0 +1,322 @@
+import pandas as pd
+import conexao_oracle
+import esquemas
+import manifesto
+import telemetria
+import base_pre_vencido
+import extract
+import pre_vencido_90
+import super_estoque
+import super_final
+import total_day_prod
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from functools import partial
+import argparse
+import os
+import time
+
+# --- REGISTRO DE JOBS DE EXTRAÇÃO ---
+# Cada job é o SQL (com seus parâmetros), o pós-processamento opcional do DataFrame e os
+# arquivos de saída; o formato vem da extensão (.csv, .xlsx, .parquet). Um único runner
+# inicializa o cliente Oracle, abre um pool e executa qualquer subconjunto dos jobs.
+# Jobs com 'ativo': False só rodam quando pedidos pelo nome.
+#
+# Datas entram no SQL como bind variables (:dt_ini, :dt_fim, :dt_dia), nunca no texto: o SQL é
+# o mesmo a cada execução e janela, então o Oracle reaproveita o cursor já analisado e o cache
+# de statements da sessão (conexao_oracle.TAMANHO_CACHE_SQL) evita até o reparse. 'params' é
+# um dict fixo ou uma função chamada a cada execução (janelas móveis como "próximos 270 dias").
+
+MAX_CONEXOES = int(os.getenv('EXTRACAO_MAX_CONEXOES', '4'))
+
+
+# --- JANELAS DE DATA ---
+def hoje():
+    return datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def janela_proximos_dias(dias):
+    inicio = hoje()
+    return {'dt_ini': inicio, 'dt_fim': inicio + timedelta(days=dias)}
+
+
+def janela_mes_corrente():
+    fim = hoje()
+    return {'dt_ini': fim.replace(day=1), 'dt_fim': fim}
+
+
+def janela_dia():
+    return {'dt_dia': hoje()}
+
+
+JOBS = {
+    'valorultent': {
+        'descricao': 'Valor da última entrada por produto/filial',
+        'sql': extract.sql_vlultent,
+        'saidas': ['valorultent.csv', 'valorultent.parquet'],
+    },
+    'acompanhamento_verba': {
+        'descricao': 'Acompanhamento de verbas',
+        'sql': extract.sql_acompanhamento_verba,
+        'saidas': ['dados_acompanhamento_verba.csv', 'dados_acompanhamento_verba.parquet'],
+        'ativo': False,
+    },
+    'verba_devolucao': {
+        'descricao': 'Verbas de devolução',
+        'sql': extract.sql_acompanhamento_verba_devolucao,
+        'saidas': ['dados_acompanhamento_verba_devolucao.csv', 'dados_acompanhamento_verba_devolucao.parquet'],
+        'ativo': False,
+    },
+    'cliente': {
+        'descricao': 'Cadastro de clientes com documento limpo',
+        'sql': extract.sql_cliente,
+        'saidas': ['dados_cliente.csv', 'dados_cliente.parquet'],
+        'ativo': False,
+    },
+    'pre_vencidos': {
+        'descricao': 'Estoque pré-vencido por data de validade',
+        'sql': base_pre_vencido.sql_base_pre_vencido,
+        'params': partial(janela_proximos_dias, 270),
+        'pos': base_pre_vencido.consolidar_pre_vencidos,
+        'saidas': ['dados_pre_vencidos.xlsx', 'dados_pre_vencidos.parquet'],
+    },
+    'pre_vencidos_90': {
+        'descricao': 'Estoque pré-vencido (janela de 90 dias)',
+        'sql': pre_vencido_90.sql_pre_vencido_90,
+        'params': partial(janela_proximos_dias, 90),
+        'saidas': ['dados_pre_vencidos_90.csv', 'dados_pre_vencidos_90.parquet'],
+    },
+    'pre_vencidos_lote': {
+        'descricao': 'Estoque pré-vencido por lote',
+        'sql': pre_vencido_90.sql_pre_vencido,
+        'params': partial(janela_proximos_dias, 365),
+        'saidas': ['dados_pre_vencidos.csv'],
+        'ativo': False,
+    },
+    'super_estoque': {
+        'descricao': 'Super estoque: cobertura e valor excedente',
+        'sql': super_estoque.sql_super_estoque,
+        'saidas': ['super_estoque.csv', 'super_estoque.parquet'],
+    },
+    'rca_prod': {
+        'descricao': 'Faturamento por RCA e produto',
+        'sql': super_final.sql_rac,
+        'params': janela_mes_corrente,
+        'saidas': ['dados_rca_prod.csv', 'dados_rca_prod.parquet'],
+    },
+    'telev_prod': {
+        'descricao': 'Faturamento por televendas, produto e dia',
+        'sql': super_final.sql_telev,
+        'params': janela_mes_corrente,
+        'saidas': ['dados_telev_prod.csv', 'dados_telev_prod.parquet'],
+    },
+    'total_day_rca': {
+        'descricao': 'Pedidos do dia por RCA',
+        'sql': total_day_prod.sql_total_day_rca,
+        'params': janela_dia,
+        'saidas': ['total_day_rcca.csv', 'total_day_rcca.parquet'],
+    },
+    'total_day_televenda': {
+        'descricao': 'Pedidos do dia por televendas',
+        'sql': total_day_prod.sql_total_day_televenda,
+        'params': janela_dia,
+        'saidas': ['total_day_televenda.csv', 'total_day_televenda.parquet'],
+    },
+}
+
+
+def gravar_saida(df, nome_arquivo):
+    """Grava o DataFrame no formato indicado pela extensão do arquivo."""
+    conexao_oracle.verificar_e_apagar(nome_arquivo)
+    extensao = os.path.splitext(nome_arquivo)[1].lower()
+    with telemetria.etapa('gravar'):
+        _gravar_formato(df, nome_arquivo, extensao)
+    # Parquet é resumido pelos próprios rodapés; CSV/xlsx pelo DataFrame gravado
+    manifesto.gravar_manifesto(nome_arquivo, df if extensao != '.parquet' else None)
+    telemetria.registrar(bytes_gravados=telemetria.tamanho_em_disco(nome_arquivo))
+    print(f' Relatório salvo como {nome_arquivo}.')
+
+
+def _gravar_formato(df, nome_arquivo, extensao):
+    if extensao == '.csv':
+        df.to_csv(nome_arquivo, index=False, sep=';', encoding='utf-8-sig', decimal=',', date_format='%d/%m/%Y')
+    elif extensao == '.xlsx':
+        with pd.ExcelWriter(nome_arquivo, date_format='DD/MM/YYYY', datetime_format='DD/MM/YYYY') as writer:
+            df.to_excel(writer, index=False)
+    elif extensao == '.parquet':
+        if esquemas.esquema_de(nome_arquivo) is not None:
+            esquemas.gravar_tipado(df, nome_arquivo)
+        else:
+            df.to_parquet(nome_arquivo, compression='snappy', index=False)
+    else:
+        raise ValueError(f'Formato de saída não suportado: {nome_arquivo}')
+
+
+def parametros(nome, extras=None):
+    """Binds do job: os padrões (fixos ou calculados agora) com os extras sobrepostos.
+
+    Só entram extras que o job declara: um bind a mais no execute é erro no Oracle.
+    """
+    padrao = JOBS[nome].get('params') or {}
+    if callable(padrao):
+        padrao = padrao()
+    return {**padrao, **{chave: valor for chave, valor in (extras or {}).items() if chave in padrao}}
+
+
+def _com_sufixo(nome_arquivo, sufixo):
+    raiz, extensao = os.path.splitext(nome_arquivo)
+    return f'{raiz}{sufixo}{extensao}'
+
+
+def executar_job(nome, conexao, params=None, sufixo=''):
+    """Roda o SQL do job, aplica o pós-processamento e grava todas as saídas.
+
+    params: binds já resolvidos (padrão: parametros(nome)); sufixo vai no nome das saídas.
+    """
+    job = JOBS[nome]
+    params = parametros(nome) if params is None else params
+    with telemetria.etapa('buscar'):
+        df = pd.read_sql(job['sql'], con=conexao, params=params or None)
+    telemetria.registrar(len(df))
+    if job.get('pos'):
+        df = job['pos'](df)
+    for nome_arquivo in job['saidas']:
+        gravar_saida(df, _com_sufixo(nome_arquivo, sufixo))
+    print(f'[+] Job {nome}: {len(df)} registros')
+
+
+def selecionar_jobs(nomes=None):
+    """Jobs pedidos pelo nome (na ordem dada) ou, sem nomes, todos os ativos."""
+    if not nomes:
+        return [nome for nome, job in JOBS.items() if job.get('ativo', True)]
+    desconhecidos = [nome for nome in nomes if nome not in JOBS]
+    if desconhecidos:
+        raise KeyError(f"Job(s) desconhecido(s): {', '.join(desconhecidos)}. Use --listar.")
+    return list(dict.fromkeys(nomes))
+
+
+def executar_jobs(nomes=None, paralelo=MAX_CONEXOES, extras=None):
+    """Executa os jobs num único pool: um startup do cliente Oracle para todos os relatórios.
+
+    extras: binds da linha de comando (ex. {'dt_dia': datetime(2025, 12, 11)}).
+    Retorna o conjunto de jobs que falharam.
+    """
+    selecionados = selecionar_jobs(nomes)
+    inicio_execucao = time.perf_counter()
+    tempos = []
+    falhas = set()
+    paralelo = max(1, min(paralelo, len(selecionados)))
+
+    try:
+        pool = conexao_oracle.criar_pool(paralelo)
+    except Exception as e:
+        print(conexao_oracle.descrever_erro(e))
+        print('Verificar as credenciais, DNS e o status do servidor.')
+        return set(selecionados)
+
+    try:
+        print(f'Conexão com sucesso. Executando {len(selecionados)} job(s) com até {paralelo} sessão(ões).')
+        with ThreadPoolExecutor(max_workers=paralelo) as executor:
+            futuros = {
+                executor.submit(conexao_oracle.executar_tarefa, pool, nome,
+                                lambda conexao, nome=nome: executar_job(nome, conexao, parametros(nome, extras))): nome
+                for nome in selecionados
+            }
+            for futuro in as_completed(futuros):
+                nome = futuros[futuro]
+                try:
+                    tempos.append(futuro.result())
+                except Exception as e:
+                    falhas.add(nome)
+                    print(f'[!] Erro no job {nome}: {conexao_oracle.descrever_erro(e)}')
+    finally:
+        pool.close()
+
+    conexao_oracle.imprimir_resumo(tempos, inicio_execucao)
+    return falhas
+
+
+def periodos(inicio, fim, passo='dia'):
+    """[(rotulo, dt_ini, dt_fim)] de inicio a fim (inclusive) em passos de um dia ou de um mês."""
+    resultado = []
+    atual = inicio
+    while atual <= fim:
+        if passo == 'mes':
+            proximo = datetime(atual.year + atual.month // 12, atual.month % 12 + 1, 1)
+            resultado.append((f'{atual:%Y%m}', atual, min(proximo - timedelta(days=1), fim)))
+        else:
+            proximo = atual + timedelta(days=1)
+            resultado.append((f'{atual:%Y%m%d}', atual, atual))
+        atual = proximo
+    return resultado
+
+
+def executar_backfill(nomes, inicio, fim, passo='dia', extras=None):
+    """Roda os jobs para cada período numa única conexão, com saídas sufixadas pelo período.
+
+    Só os binds mudam de um período para o outro: o cursor vem do cache de statements da
+    sessão em vez de um novo parse a cada janela. Retorna os (job, período) que falharam.
+    """
+    selecionados = selecionar_jobs(nomes)
+    falhas = set()
+    with conexao_oracle.conectar() as conexao:
+        for nome in selecionados:
+            base = parametros(nome, extras)
+            if not {'dt_dia', 'dt_ini', 'dt_fim'} & set(base):
+                print(f'[i] Job {nome}: sem janela de datas, fora do backfill.')
+                continue
+            for rotulo, dt_ini, dt_fim in periodos(inicio, fim, passo):
+                params = dict(base)
+                params.update({chave: valor for chave, valor in
+                               (('dt_dia', dt_ini), ('dt_ini', dt_ini), ('dt_fim', dt_fim)) if chave in base})
+                try:
+                    with telemetria.medir(f'{nome}[{rotulo}]'):
+                        executar_job(nome, conexao, params, sufixo=f'_{rotulo}')
+                except Exception as e:
+                    falhas.add((nome, rotulo))
+                    print(f'[!] Erro no job {nome}[{rotulo}]: {conexao_oracle.descrever_erro(e)}')
+    return falhas
+
+
+def _data(texto):
+    return datetime.strptime(texto, '%Y-%m-%d')
+
+
+def _bind(texto):
+    """NOME=AAAA-MM-DD (ou NOME=texto) vindo de --param."""
+    chave, _, valor = texto.partition('=')
+    try:
+        return chave, _data(valor)
+    except ValueError:
+        return chave, valor
+
+
+def listar_jobs():
+    for nome, job in JOBS.items():
+        situacao = '' if job.get('ativo', True) else ' (sob demanda)'
+        binds = ', '.join(f'{chave}={valor:%Y-%m-%d}' if isinstance(valor, datetime) else f'{chave}={valor}'
+                          for chave, valor in parametros(nome).items())
+        print(f"{nome:<22} {job['descricao']}{situacao} -> {', '.join(job['saidas'])}" + (f' [{binds}]' if binds else ''))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Executa os jobs de extração registrados.')
+    parser.add_argument('jobs', nargs='*', help='Jobs a executar (padrão: todos os ativos).')
+    parser.add_argument('--listar', action='store_true', help='Lista os jobs registrados e sai.')
+    parser.add_argument('--paralelo', type=int, default=MAX_CONEXOES, help='Máximo de queries simultâneas no servidor.')
+    parser.add_argument('--param', type=_bind, action='append', default=[], metavar='NOME=AAAA-MM-DD',
+                        help='Sobrescreve um bind dos jobs (ex. dt_dia=2025-12-11); pode repetir.')
+    parser.add_argument('--backfill', nargs=2, type=_data, metavar=('INICIO', 'FIM'),
+                        help='Roda os jobs com janela de datas para cada período de INICIO a FIM (AAAA-MM-DD).')
+    parser.add_argument('--passo', choices=['dia', 'mes'], default='dia', help='Tamanho de cada período do backfill.')
+    args = parser.parse_args()
+    extras = dict(args.param)
+
+    if args.listar:
+        listar_jobs()
+    elif args.backfill:
+        falhas = executar_backfill(args.jobs, *args.backfill, args.passo, extras)
+        raise SystemExit(1 if falhas else 0)
+    else:
+        falhas = executar_jobs(args.jobs, args.paralelo, extras)
+        raise SystemExit(1 if falhas else 0)
@@ -0,0 +1,194 @@
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from datetime import date, datetime
+import argparse
+import hashlib
+import json
+import os
+
+# --- MANIFESTO DAS EXTRAÇÕES ---
+# Cada arquivo (ou dataset particionado) gerado pelas extrações ganha um <saida>.manifesto.json
+# com registros, datas mínima/máxima, hash do esquema e checksum do conteúdo. Os painéis usam
+# chave_cache() como argumento das funções com st.cache_data: a chave só muda quando o
+# conteúdo muda, então o cache recarrega quando chega dado novo e nunca fora disso.
+
+SUFIXO = '.manifesto.json'
+TAMANHO_BLOCO = 1024 * 1024
+
+
+def caminho_manifesto(caminho):
+    # Ao lado do arquivo/pasta e fora do dataset: não vira fragmento para quem lê o Parquet
+    return caminho.rstrip('/\\') + SUFIXO
+
+
+def _arquivos(caminho):
+    """Arquivos de dados da saída (relativos a ela), ignorando parciais '.xxx' e '_xxx'."""
+    if not os.path.isdir(caminho):
+        return [os.path.basename(caminho)]
+    arquivos = []
+    for raiz, pastas, nomes in os.walk(caminho):
+        pastas[:] = sorted(p for p in pastas if not p.startswith(('.', '_')))
+        arquivos += [os.path.relpath(os.path.join(raiz, nome), caminho)
+                     for nome in sorted(nomes) if not nome.startswith(('.', '_'))]
+    return arquivos
+
+
+def _sha256(arquivo):
+    h = hashlib.sha256()
+    with open(arquivo, 'rb') as f:
+        for bloco in iter(lambda: f.read(TAMANHO_BLOCO), b''):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def _checksums(caminho, anterior=None):
+    """{arquivo: {bytes, mtime_ns, sha256}}; reaproveita o hash de quem não mudou desde o manifesto anterior."""
+    base = caminho if os.path.isdir(caminho) else os.path.dirname(caminho)
+    conhecidos = (anterior or {}).get('arquivos', {})
+    resultado = {}
+    for relativo in _arquivos(caminho):
+        info = os.stat(os.path.join(base, relativo))
+        antigo = conhecidos.get(relativo)
+        if antigo and antigo['bytes'] == info.st_size and antigo['mtime_ns'] == info.st_mtime_ns:
+            resultado[relativo] = antigo
+        else:
+            resultado[relativo] = {'bytes': info.st_size, 'mtime_ns': info.st_mtime_ns,
+                                   'sha256': _sha256(os.path.join(base, relativo))}
+    return resultado
+
+
+def _texto_data(valor):
+    return valor.isoformat() if isinstance(valor, (date, datetime)) else None
+
+
+def _resumo_parquet(caminho, arquivos):
+    """Registros e datas mínima/máxima lidos só dos rodapés (estatísticas dos row groups)."""
+    esquema = ds.dataset(caminho, format='parquet', partitioning='hive').schema
+    colunas_data = {c.name for c in esquema if pa.types.is_timestamp(c.type) or pa.types.is_date(c.type)}
+    base = caminho if os.path.isdir(caminho) else os.path.dirname(caminho)
+    registros, datas = 0, {}
+    for relativo in arquivos:
+        meta = pq.read_metadata(os.path.join(base, relativo))
+        registros += meta.num_rows
+        for i in range(meta.num_row_groups):
+            grupo = meta.row_group(i)
+            for j in range(grupo.num_columns):
+                coluna = grupo.column(j)
+                if coluna.path_in_schema not in colunas_data or not coluna.is_stats_set or not coluna.statistics.has_min_max:
+                    continue
+                minimo, maximo = datas.get(coluna.path_in_schema, (None, None))
+                estat = coluna.statistics
+                datas[coluna.path_in_schema] = (estat.min if minimo is None else min(minimo, estat.min),
+                                                estat.max if maximo is None else max(maximo, estat.max))
+    return registros, esquema, datas
+
+
+def _resumo_df(df):
+    colunas_data = df.select_dtypes(include=['datetime', 'datetimetz']).columns
+    datas = {c: (df[c].min(), df[c].max()) for c in colunas_data if df[c].notna().any()}
+    esquema = pa.Schema.from_pandas(df, preserve_index=False)
+    return len(df), esquema, {c: (mn.to_pydatetime(), mx.to_pydatetime()) for c, (mn, mx) in datas.items()}
+
+
+def gerar_manifesto(caminho, df=None):
+    """Monta o manifesto da saída. Parquet é resumido pelos rodapés; CSV/xlsx precisam do df gravado."""
+    anterior = ler_manifesto(caminho)
+    arquivos = _checksums(caminho, anterior)
+    if df is not None:
+        registros, esquema, datas = _resumo_df(df)
+    elif os.path.isdir(caminho) or caminho.endswith('.parquet'):
+        registros, esquema, datas = _resumo_parquet(caminho, list(arquivos))
+    else:
+        raise ValueError(f'Manifesto de {caminho} requer o DataFrame gravado')
+
+    esquema_texto = esquema.remove_metadata().to_string(show_schema_metadata=False)
+    conteudo = hashlib.sha256()
+    for relativo in sorted(arquivos):
+        conteudo.update(f"{relativo}:{arquivos[relativo]['sha256']}\n".encode('utf-8'))
+    return {
+        'saida': os.path.basename(caminho.rstrip('/\\')),
+        'gerado_em': datetime.now().isoformat(timespec='seconds'),
+        'registros': int(registros),
+        'datas': {coluna: {'min': _texto_data(mn), 'max': _texto_data(mx)} for coluna, (mn, mx) in sorted(datas.items())},
+        'esquema_sha256': hashlib.sha256(esquema_texto.encode('utf-8')).hexdigest(),
+        'conteudo_sha256': conteudo.hexdigest(),
+        'bytes': sum(a['bytes'] for a in arquivos.values()),
+        'arquivos': arquivos,
+    }
+
+
+def gravar_manifesto(caminho, df=None):
+    """Gera e grava o manifesto ao lado da saída (troca atômica); devolve o manifesto."""
+    manifesto = gerar_manifesto(caminho, df)
+    destino = caminho_manifesto(caminho)
+    with open(destino + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifesto, f, indent=2, ensure_ascii=False)
+    os.replace(destino + '.tmp', destino)
+    return manifesto
+
+
+def ler_manifesto(caminho):
+    destino = caminho_manifesto(caminho)
+    if not os.path.exists(destino):
+        return None
+    try:
+        with open(destino, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def chave_cache(*caminhos):
+    """Chave para st.cache_data: checksum de conteúdo de cada saída.
+
+    Sem manifesto (ou com a saída mexida depois dele, ex. cópia manual) cai para tamanho + mtime,
+    que ainda invalida o cache quando o arquivo muda.
+    """
+    chave = []
+    for caminho in caminhos:
+        manifesto = ler_manifesto(caminho)
+        if manifesto is not None and _confere(caminho, manifesto):
+            chave.append(manifesto['conteudo_sha256'])
+        elif os.path.exists(caminho):
+            chave.append('|'.join(f"{relativo}:{info['bytes']}:{info['mtime_ns']}"
+                                  for relativo, info in _estado_atual(caminho).items()))
+        else:
+            chave.append(None)
+    return tuple(chave)
+
+
+def _estado_atual(caminho):
+    base = caminho if os.path.isdir(caminho) else os.path.dirname(caminho)
+    estado = {}
+    for relativo in _arquivos(caminho):
+        info = os.stat(os.path.join(base, relativo))
+        estado[relativo] = {'bytes': info.st_size, 'mtime_ns': info.st_mtime_ns}
+    return estado
+
+
+def _confere(caminho, manifesto):
+    """O manifesto ainda descreve os arquivos em disco (mesmos nomes, tamanhos e mtimes)?"""
+    if not os.path.exists(caminho):
+        return False
+    registrados = {relativo: {'bytes': info['bytes'], 'mtime_ns': info['mtime_ns']}
+                   for relativo, info in manifesto.get('arquivos', {}).items()}
+    return registrados == _estado_atual(caminho)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Mostra ou regenera o manifesto de saídas Parquet.')
+    parser.add_argument('saidas', nargs='+', help='Arquivos .parquet ou datasets particionados.')
+    parser.add_argument('--gerar', action='store_true', help='Regrava o manifesto a partir dos arquivos em disco.')
+    args = parser.parse_args()
+
+    for saida in args.saidas:
+        manifesto = gravar_manifesto(saida) if args.gerar else ler_manifesto(saida)
+        if manifesto is None:
+            print(f'[!] {saida}: sem manifesto')
+            continue
+        situacao = 'confere' if _confere(saida, manifesto) else 'DESATUALIZADO'
+        datas = ', '.join(f"{c} {d['min']}..{d['max']}" for c, d in manifesto['datas'].items())
+        print(f"{saida}: {manifesto['registros']} registros, {manifesto['bytes'] / 1e6:.1f} MB, "
+              f"conteúdo {manifesto['conteudo_sha256'][:12]}, esquema {manifesto['esquema_sha256'][:12]} "
+              f"[{situacao}] {datas}")
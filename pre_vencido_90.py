@@ -1,20 +1,5 @@
-import pandas as pd
-import oracledb
-from dotenv import load_dotenv
-import os
-
-try:
-    oracledb.init_oracle_client(lib_dir=r"C:\instantclient_23_9")
-except Exception as e:
-    print(f'Aviso: Não foi possível inicializar o cliente oracle: {e}')
-
-
-load_dotenv()
-ORACLE_USER = os.getenv('ORACLE_USER')
-ORACLE_PASSWORD = os.getenv('ORACLE_PASSWORD')
-dsn = '192.168.0.1/wint'
-
-
+# --- SQL (executado pelo runner de jobs.py) ---
+# Janela de validade em binds :dt_ini/:dt_fim; o padrão (hoje + N dias) fica em jobs.JOBS
 sql_pre_vencido_90 = """
     WITH DADOS_ESTOQUE AS (
         SELECT
@@ -37,7 +22,7 @@ sql_pre_vencido_90 = """
                 ELSE NVL(S.QT, 0)
             END AS QT,
             ROUND(ES.CUSTOULTENT, 2) AS VALOR_ULTIMA_ENTRADA,
-            TO_CHAR(NVL(SI.DTVAL, S.DTVAL), 'DD/MM/YYYY') AS DTVAL
+            TRUNC(NVL(SI.DTVAL, S.DTVAL)) AS DTVAL
         FROM
             PCESTENDERECO S 
         INNER JOIN PCENDERECO E ON S.CODENDERECO = E.CODENDERECO
@@ -50,7 +35,7 @@ sql_pre_vencido_90 = """
         LEFT JOIN PCEST ES ON ES.CODPROD = P.CODPROD AND ES.CODFILIAL = E.CODFILIAL 
         WHERE
             S.QT > 0
-            AND NVL(SI.DTVAL, S.DTVAL) BETWEEN TO_DATE('01/11/2025', 'DD/MM/YYYY') AND TO_DATE('31/07/2026', 'DD/MM/YYYY')
+            AND NVL(SI.DTVAL, S.DTVAL) BETWEEN :dt_ini AND :dt_fim
     )
     SELECT
         D.CODFILIAL, D.CLASSIFICACAO, D.FORNECEDOR, D.CODPROD, D.DESCRICAO,
@@ -85,7 +70,7 @@ sql_pre_vencido = """
                 ELSE NVL(S.QT, 0)
             END AS QT,
             ROUND(ES.CUSTOULTENT, 2) AS VALOR_ULTIMA_ENTRADA,
-            TO_CHAR(NVL(SI.DTVAL, S.DTVAL), 'DD/MM/YYYY') AS DTVAL
+            TRUNC(NVL(SI.DTVAL, S.DTVAL)) AS DTVAL
         FROM
             PCESTENDERECO S 
         INNER JOIN PCENDERECO E ON S.CODENDERECO = E.CODENDERECO
@@ -98,7 +83,7 @@ sql_pre_vencido = """
         LEFT JOIN PCEST ES ON ES.CODPROD = P.CODPROD AND ES.CODFILIAL = E.CODFILIAL 
         WHERE
             S.QT > 0
-            AND NVL(SI.DTVAL, S.DTVAL) BETWEEN TO_DATE('01/11/2025', 'DD/MM/YYYY') AND TO_DATE('31/10/2026', 'DD/MM/YYYY')
+            AND NVL(SI.DTVAL, S.DTVAL) BETWEEN :dt_ini AND :dt_fim
     )
     SELECT
         D.CODFILIAL, D.CLASSIFICACAO, D.FORNECEDOR, D.CODPROD, D.DESCRICAO, D.NUMLOTE,
@@ -112,40 +97,7 @@ sql_pre_vencido = """
 """
 
 
-def verificar_e_apagar_csv(nome_arquivo):
-    if os.path.exists(nome_arquivo):
-        try:
-            os.remove(nome_arquivo)
-            print(f' Arquivo antigo {nome_arquivo} apagado com sucesso.')
-        except OSError as e:
-            print(f' Erro ao apagar o arquivo {nome_arquivo}: {e}')
-    else:
-        print(f' Arquivo {nome_arquivo} não encontrado. Criando novo...')
-
-
-try:
-    with oracledb.connect(user=ORACLE_USER, password=ORACLE_PASSWORD, dsn=dsn) as connection:
-        print('Conexão com sucesso.')
-
-        df_pre_vencidos_90 = pd.read_sql(sql_pre_vencido_90, con=connection)
-        
-        NOME_ARQUIVO_VERBA = 'dados_pre_vencidos_90.csv'
-        verificar_e_apagar_csv(NOME_ARQUIVO_VERBA)
-        df_pre_vencidos_90.to_csv(NOME_ARQUIVO_VERBA, index=False, sep=';', encoding='utf-8-sig', decimal=',')
-        print(f' Relatório de Acompanhamento de Verba salvo como {NOME_ARQUIVO_VERBA}.')
-
-        # df_pre_vencidos = pd.read_sql(sql_pre_vencido, con=connection)
-        
-        # NOME_ARQUIVO_VERBA = 'dados_pre_vencidos.csv'
-        # verificar_e_apagar_csv(NOME_ARQUIVO_VERBA)
-        # df_pre_vencidos.to_csv(NOME_ARQUIVO_VERBA, index=False, sep=';', encoding='utf-8-sig', decimal=',')
-        # print(f' Relatório de Acompanhamento de Verba salvo como {NOME_ARQUIVO_VERBA}.')
-
-
-except oracledb.Error as e:
-    error_obj = e.args[0]
-    print(f'Erro ao se conectar ou executar a query no banco Oracle: {error_obj.code}:{error_obj.message}')
-    print('Verificar as credenciais, DNS e o status do servidor.')
-
-except Exception as e:
-    print(f'Ocorreu um erro inesperado: {e}')
\ No newline at end of file
+if __name__ == "__main__":
+    # Relatório por lote: job pre_vencidos_lote (python jobs.py pre_vencidos_lote)
+    import jobs
+    jobs.executar_jobs(['pre_vencidos_90'])
@@ -1,20 +1,4 @@
-import pandas as pd
-import oracledb
-from dotenv import load_dotenv
-import os
-
-try:
-    oracledb.init_oracle_client(lib_dir=r"C:\instantclient_23_9")
-except Exception as e:
-    print(f'Aviso: Não foi possível inicializar o cliente oracle: {e}')
-
-
-load_dotenv()
-ORACLE_USER = os.getenv('ORACLE_USER')
-ORACLE_PASSWORD = os.getenv('ORACLE_PASSWORD')
-dsn = '192.168.0.1/wint'
-
-
+# --- SQL (executado pelo runner de jobs.py) ---
 sql_super_estoque = """
     WITH dias_estoque_zerado AS (
 SELECT
@@ -175,33 +159,7 @@ ORDER BY
 """
 
 
-def verificar_e_apagar_csv(nome_arquivo):
-    if os.path.exists(nome_arquivo):
-        try:
-            os.remove(nome_arquivo)
-            print(f' Arquivo antigo {nome_arquivo} apagado com sucesso.')
-        except OSError as e:
-            print(f' Erro ao apagar o arquivo {nome_arquivo}: {e}')
-    else:
-        print(f' Arquivo {nome_arquivo} não encontrado. Criando novo...')
-
-
-try:
-    with oracledb.connect(user=ORACLE_USER, password=ORACLE_PASSWORD, dsn=dsn) as connection:
-        print('Conexão com sucesso.')
-
-        df_super_estoque = pd.read_sql(sql_super_estoque, con=connection)
-        
-        NOME_ARQUIVO_VERBA = 'super_estoque.csv'
-        verificar_e_apagar_csv(NOME_ARQUIVO_VERBA)
-        df_super_estoque.to_csv(NOME_ARQUIVO_VERBA, index=False, sep=';', encoding='utf-8-sig', decimal=',')
-        print(f' Relatório de Acompanhamento Super Estoque salvo como{NOME_ARQUIVO_VERBA}.')
- 
-
-except oracledb.Error as e:
-    error_obj = e.args[0]
-    print(f'Erro ao se conectar ou executar a query no banco Oracle: {error_obj.code}:{error_obj.message}')
-    print('Verificar as credenciais, DNS e o status do servidor.')
-
-except Exception as e:
-    print(f'Ocorreu um erro inesperado: {e}')
\ No newline at end of file
+if __name__ == "__main__":
+    # Execução, conexão e gravação ficam no runner de jobs.py
+    import jobs
+    jobs.executar_jobs(['super_estoque'])
@@ -1,20 +1,5 @@
-import pandas as pd
-import oracledb
-from dotenv import load_dotenv
-import os
-
-try:
-    oracledb.init_oracle_client(lib_dir=r"C:\instantclient_23_9")
-except Exception as e:
-    print(f'Aviso: Não foi possível inicializar o cliente oracle: {e}')
-
-
-load_dotenv()
-ORACLE_USER = os.getenv('ORACLE_USER')
-ORACLE_PASSWORD = os.getenv('ORACLE_PASSWORD')
-dsn = '192.168.0.1/wint'
-
-
+# --- SQL (executado pelo runner de jobs.py) ---
+# Período do faturamento nos binds :dt_ini/:dt_fim (padrão: mês corrente, ver jobs.JOBS)
 sql_rac = """
     SELECT
         m.codfilial AS FILIAL,
@@ -37,7 +22,7 @@ sql_rac = """
     LEFT JOIN pcsuperv s on s.codsupervisor = u.codsupervisor
     LEFT JOIN pcpedc p on p.numped = m.numped
     WHERE 
-        m.dtmov BETWEEN TO_DATE('01/11/2025', 'DD/MM/YYYY') AND TO_DATE('30/11/2025', 'DD/MM/YYYY')
+        m.dtmov BETWEEN :dt_ini AND :dt_fim
         AND m.dtcancel IS NULL AND m.codfilial <> 10 AND m.CODOPER = 'S' AND p.codemitente = 8888
     GROUP BY 
         m.codfilial,
@@ -61,7 +46,7 @@ sql_telev = """
     FROM pcmov m
     INNER JOIN pcpedc p ON p.numped = m.numped
     WHERE 
-        m.dtmov BETWEEN TO_DATE('01/11/2025', 'DD/MM/YYYY') AND TO_DATE('30/11/2025', 'DD/MM/YYYY') AND CODOPER = 'S'
+        m.dtmov BETWEEN :dt_ini AND :dt_fim AND CODOPER = 'S'
         AND m.dtcancel IS NULL AND m.codfilial <> 10 AND p.origemped = 'T' AND p.dtcancel IS NULL AND p.codemitente <> 8888
     GROUP BY 
         EXTRACT(DAY FROM m.dtmov),
@@ -71,40 +56,7 @@ sql_telev = """
 """
 
 
-def verificar_e_apagar_csv(nome_arquivo):
-    if os.path.exists(nome_arquivo):
-        try:
-            os.remove(nome_arquivo)
-            print(f' Arquivo antigo {nome_arquivo} apagado com sucesso.')
-        except OSError as e:
-            print(f' Erro ao apagar o arquivo {nome_arquivo}: {e}')
-    else:
-        print(f' Arquivo {nome_arquivo} não encontrado. Criando novo...')
-
-
-try:
-    with oracledb.connect(user=ORACLE_USER, password=ORACLE_PASSWORD, dsn=dsn) as connection:
-        print('Conexão com sucesso.')
-
-        df_rca = pd.read_sql(sql_rac, con=connection)
-        
-        NOME_ARQUIVO_VERBA = 'dados_rca_prod.csv'
-        verificar_e_apagar_csv(NOME_ARQUIVO_VERBA)
-        df_rca.to_csv(NOME_ARQUIVO_VERBA, index=False, sep=';', encoding='utf-8-sig', decimal=',')
-        print(f' Relatório de Acompanhamento de Verba salvo como {NOME_ARQUIVO_VERBA}.')
-
-        df_telev = pd.read_sql(sql_telev, con=connection)
-        
-        NOME_ARQUIVO_DEVOLUCAO = 'dados_telev_prod.csv'
-        verificar_e_apagar_csv(NOME_ARQUIVO_DEVOLUCAO) 
-        df_telev.to_csv(NOME_ARQUIVO_DEVOLUCAO, index=False, sep=';', encoding='utf-8-sig', decimal=',') 
-        print(f' Relatório de Devolução de Verba salvo como {NOME_ARQUIVO_DEVOLUCAO}.')
-
-
-except oracledb.Error as e:
-    error_obj = e.args[0]
-    print(f'Erro ao se conectar ou executar a query no banco Oracle: {error_obj.code}:{error_obj.message}')
-    print('Verificar as credenciais, DNS e o status do servidor.')
-
-except Exception as e:
-    print(f'Ocorreu um erro inesperado: {e}')
\ No newline at end of file
+if __name__ == "__main__":
+    # Execução, conexão e gravação ficam no runner de jobs.py
+    import jobs
+    jobs.executar_jobs(['rca_prod', 'telev_prod'])
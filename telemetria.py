@@ -0,0 +1,264 @@
+import pandas as pd
+from contextlib import contextmanager
+from datetime import datetime
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+# --- TELEMETRIA DAS EXTRAÇÕES ---
+# Cada extração (tarefa do pool, job ou script) grava uma linha JSON em ARQUIVO_TELEMETRIA,
+# só com acréscimos: tempo para conectar, executar, buscar e gravar, registros, bytes em
+# disco e memória. A memória da tarefa é o RSS atual no início e no fim do medir() (com tarefas
+# em paralelo no mesmo processo a diferença inclui as vizinhas); o pico do processo desde que ele
+# começou vai à parte, porque num pool ou no agendador é o de todas as tarefas. As medições ficam numa pilha por thread, então os pontos
+# instrumentados (etapa/registrar) não precisam receber a medição como parâmetro e não fazem
+# nada fora de um medir(). `python telemetria.py` mostra a tendência por job e acusa regressões.
+
+ARQUIVO_TELEMETRIA = os.getenv('EXTRACAO_TELEMETRIA', 'telemetria_extracoes.jsonl')
+ETAPAS = ['conectar', 'executar', 'buscar', 'gravar']
+
+_local = threading.local()
+_trava_arquivo = threading.Lock()
+
+
+def _memoria_windows():
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class ContadoresMemoria(ctypes.Structure):
+            _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                        ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                        ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                        ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+
+        contadores = ContadoresMemoria()
+        contadores.cb = ctypes.sizeof(contadores)
+        processo = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(processo, ctypes.byref(contadores), contadores.cb):
+            return contadores
+    except (ImportError, AttributeError, OSError):
+        pass
+    return None
+
+
+def rss_mb():
+    """Memória residente atual do processo (MB); None se a plataforma não informar."""
+    try:
+        # Linux: segundo campo de statm, em páginas
+        with open('/proc/self/statm') as f:
+            return round(int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024), 1)
+    except (OSError, ValueError, AttributeError, IndexError):
+        pass
+    contadores = _memoria_windows()
+    return round(contadores.WorkingSetSize / (1024 * 1024), 1) if contadores else None
+
+
+def pico_rss_processo_mb():
+    """Pico de memória residente do processo desde que ele começou (MB); None se a plataforma não informar."""
+    try:
+        import resource
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux informa em KB, macOS em bytes
+        return round(pico / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+    except ImportError:
+        pass
+    contadores = _memoria_windows()
+    return round(contadores.PeakWorkingSetSize / (1024 * 1024), 1) if contadores else None
+
+
+def tamanho_em_disco(caminho):
+    """Bytes de um arquivo ou da soma dos arquivos de um dataset particionado."""
+    if os.path.isdir(caminho):
+        return sum(os.path.getsize(os.path.join(raiz, nome))
+                   for raiz, _, arquivos in os.walk(caminho) for nome in arquivos)
+    return os.path.getsize(caminho) if os.path.exists(caminho) else 0
+
+
+def _pilha():
+    if not hasattr(_local, 'pilha'):
+        _local.pilha = []
+    return _local.pilha
+
+
+def atual():
+    """Medição em andamento nesta thread (ou None)."""
+    pilha = _pilha()
+    return pilha[-1] if pilha else None
+
+
+@contextmanager
+def medir(job):
+    """Mede o bloco como uma execução do job e acrescenta o registro ao log, com sucesso ou erro."""
+    medicao = {
+        'job': job,
+        'script': os.path.basename(sys.argv[0]) or 'python',
+        'inicio': datetime.now().isoformat(timespec='seconds'),
+        **{f'{etapa}_s': 0.0 for etapa in ETAPAS},
+        'registros': 0,
+        'bytes': 0,
+        'rss_inicio_mb': rss_mb(),
+    }
+    pilha = _pilha()
+    pilha.append(medicao)
+    inicio = time.perf_counter()
+    try:
+        yield medicao
+        medicao.setdefault('status', 'ok')
+    except BaseException as e:
+        medicao['status'] = 'erro'
+        medicao['erro'] = str(e)[:300]
+        raise
+    finally:
+        pilha.pop()
+        medicao['duracao_s'] = time.perf_counter() - inicio
+        medicao['rss_fim_mb'] = rss_mb()
+        medicao['pico_rss_processo_mb'] = pico_rss_processo_mb()
+        for chave in [f'{etapa}_s' for etapa in ETAPAS] + ['duracao_s']:
+            medicao[chave] = round(medicao[chave], 3)
+        gravar(medicao)
+
+
+@contextmanager
+def etapa(nome):
+    """Soma o tempo do bloco na etapa da medição atual."""
+    medicao = atual()
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        if medicao is not None:
+            medicao[f'{nome}_s'] = medicao.get(f'{nome}_s', 0.0) + time.perf_counter() - inicio
+
+
+def cronometrar(lotes, nome='buscar'):
+    """Repassa os itens de um gerador somando em `nome` só o tempo gasto para produzi-los."""
+    iterador = iter(lotes)
+    while True:
+        with etapa(nome):
+            try:
+                lote = next(iterador)
+            except StopIteration:
+                return
+        yield lote
+
+
+def registrar(registros=0, bytes_gravados=0):
+    medicao = atual()
+    if medicao is not None:
+        medicao['registros'] += int(registros)
+        medicao['bytes'] += int(bytes_gravados)
+
+
+def falhou(erro):
+    """Marca a medição atual como erro quando quem mede trata a exceção sem propagá-la."""
+    medicao = atual()
+    if medicao is not None:
+        medicao['status'] = 'erro'
+        medicao['erro'] = str(erro)[:300]
+
+
+def gravar(medicao, arquivo=None):
+    linha = json.dumps(medicao, ensure_ascii=False)
+    with _trava_arquivo:
+        with open(arquivo or ARQUIVO_TELEMETRIA, 'a', encoding='utf-8') as f:
+            f.write(linha + '\n')
+
+
+# --- RELATÓRIO ---
+def ler(arquivo=None):
+    arquivo = arquivo or ARQUIVO_TELEMETRIA
+    if not os.path.exists(arquivo):
+        return pd.DataFrame()
+    df = pd.read_json(arquivo, lines=True, convert_dates=False)
+    df['inicio'] = pd.to_datetime(df['inicio'])
+    # Registros antigos só têm o pico do processo, com o nome de antes
+    if 'pico_rss_mb' in df.columns:
+        df['pico_rss_processo_mb'] = df.get('pico_rss_processo_mb', df['pico_rss_mb']).fillna(df['pico_rss_mb'])
+    for coluna in ['rss_inicio_mb', 'rss_fim_mb', 'pico_rss_processo_mb']:
+        if coluna not in df.columns:
+            df[coluna] = float('nan')
+    df['rss_delta_mb'] = df['rss_fim_mb'] - df['rss_inicio_mb']
+    df['reg_s'] = df['registros'] / df['duracao_s'].where(df['duracao_s'] > 0)
+    return df.sort_values('inicio', kind='stable')
+
+
+def avaliar(df, janela=7, limite=1.5, minimo_s=5.0):
+    """Última execução bem-sucedida de cada job contra a mediana das `janela` anteriores.
+
+    Regressão: duração acima de `limite` x a base e ao menos `minimo_s` segundos mais lenta
+    (jobs de poucos segundos oscilam demais para um critério só proporcional).
+    """
+    linhas = []
+    for job, todas in df.groupby('job', sort=True):
+        execucoes = todas[todas['status'] == 'ok']
+        falhas_na_janela = int((todas.tail(janela + 1)['status'] != 'ok').sum())
+        if execucoes.empty:
+            linhas.append({'job': job, 'execucoes': 0, 'ultima': todas['inicio'].iloc[-1].strftime('%d/%m %H:%M'),
+                           'falhas_na_janela': falhas_na_janela, 'situacao': 'SEM SUCESSO'})
+            continue
+        ultima = execucoes.iloc[-1]
+        base = execucoes.iloc[-1 - janela:-1]
+        base_s = base['duracao_s'].median() if len(base) else None
+        razao = ultima['duracao_s'] / base_s if base_s else None
+        regressao = bool(razao is not None and razao > limite and ultima['duracao_s'] - base_s >= minimo_s)
+        linhas.append({
+            'job': job,
+            'execucoes': len(execucoes),
+            'ultima': ultima['inicio'].strftime('%d/%m %H:%M'),
+            'duracao_s': ultima['duracao_s'],
+            'base_s': round(base_s, 1) if base_s is not None else None,
+            'x_base': round(razao, 2) if razao is not None else None,
+            'registros': ultima['registros'],
+            'reg_s': round(ultima['reg_s']) if pd.notna(ultima['reg_s']) else None,
+            'base_reg_s': round(base['reg_s'].median()) if len(base) and pd.notna(base['reg_s'].median()) else None,
+            'mb': round(ultima['bytes'] / 1e6, 1),
+            'rss_fim_mb': ultima['rss_fim_mb'],
+            'rss_delta_mb': ultima['rss_delta_mb'],
+            'pico_proc_mb': ultima['pico_rss_processo_mb'],
+            'falhas_na_janela': falhas_na_janela,
+            'situacao': 'REGRESSÃO' if regressao else '',
+        })
+    return pd.DataFrame(linhas)
+
+
+def imprimir_tendencia(df, job, ultimas=10):
+    execucoes = df[df['job'] == job].tail(ultimas)
+    if execucoes.empty:
+        print(f'[!] Nenhuma execução de {job} em {ARQUIVO_TELEMETRIA}.')
+        return
+    colunas = (['inicio', 'status'] + [f'{etapa}_s' for etapa in ETAPAS] + ['duracao_s', 'registros', 'reg_s', 'bytes']
+               + ['rss_inicio_mb', 'rss_fim_mb', 'rss_delta_mb', 'pico_rss_processo_mb'])
+    print(f'\n--- {job}: últimas {len(execucoes)} execuções ---')
+    print(execucoes[colunas].to_string(index=False))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Tendência das extrações e regressões contra a base móvel.')
+    parser.add_argument('jobs', nargs='*', help='Mostra as últimas execuções destes jobs em detalhe.')
+    parser.add_argument('--arquivo', default=ARQUIVO_TELEMETRIA, help='Log JSONL da telemetria.')
+    parser.add_argument('--janela', type=int, default=7, help='Execuções anteriores que formam a base (mediana).')
+    parser.add_argument('--limite', type=float, default=1.5, help='Razão duração/base a partir da qual é regressão.')
+    parser.add_argument('--minimo-s', type=float, default=5.0, help='Piora mínima em segundos para acusar regressão.')
+    parser.add_argument('--ultimas', type=int, default=10, help='Execuções mostradas por job no detalhe.')
+    args = parser.parse_args()
+
+    df_telemetria = ler(args.arquivo)
+    if df_telemetria.empty:
+        print(f'[!] Sem registros em {args.arquivo}.')
+        raise SystemExit(0)
+
+    resumo = avaliar(df_telemetria, args.janela, args.limite, args.minimo_s)
+    print(f'--- Extrações ({len(df_telemetria)} registros, base = mediana das {args.janela} anteriores) ---')
+    print(resumo.to_string(index=False))
+    for job in args.jobs:
+        imprimir_tendencia(df_telemetria, job, args.ultimas)
+
+    regressoes = resumo[resumo['situacao'] == 'REGRESSÃO']
+    if not regressoes.empty:
+        print(f"\n[!] Regressão em: {', '.join(regressoes['job'])}")
+    raise SystemExit(1 if not regressoes.empty else 0)
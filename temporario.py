@@ -1,18 +1,44 @@
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pyarrow.dataset as ds
 import oracledb
-from dotenv import load_dotenv
+import conexao_oracle
+import dimensoes
+import esquemas
+import manifesto
+import telemetria
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from functools import partial
+import argparse
+import glob
+import hashlib
+import json
 import os
+import shutil
+import threading
+import time
 
 # --- CONFIGURAÇÕES INICIAIS ---
-load_dotenv()
-ORACLE_USER = os.getenv('ORACLE_USER')
-ORACLE_PASSWORD = os.getenv('ORACLE_PASSWORD')
-dsn = '192.168.0.1/wint'
+# Credenciais, DSN e cliente Oracle vêm de conexao_oracle
 
-try:
-    oracledb.init_oracle_client(lib_dir=r"C:\instantclient_23_9")
-except Exception as e:
-    print(f'Aviso: Cliente Oracle: {e}')
+# Streaming: quantidade de linhas por fetchmany / row group do Parquet
+TAMANHO_LOTE = int(os.getenv('EXTRACAO_TAMANHO_LOTE', '50000'))
+
+# Incremental: marca d'água por tabela + janela retroativa para cancelamentos tardios (dtcancel)
+ARQUIVO_MARCAS = 'marcas_incrementais.json'
+DIAS_RETROATIVOS = int(os.getenv('EXTRACAO_DIAS_RETROATIVOS', '7'))
+
+# Paralelismo: teto de conexões simultâneas no Winthor (pool e workers usam o mesmo limite)
+MAX_CONEXOES = int(os.getenv('EXTRACAO_MAX_CONEXOES', '4'))
+
+# Retomada: a extração completa é montada em <saida>.parcial e só toma o lugar da anterior no fim.
+# Nos fatos fatiados cada fatia concluída é um checkpoint; uma nova execução dentro do prazo
+# retoma só as fatias que faltam em vez de buscar tudo de novo.
+ARQUIVO_CHECKPOINT = '_checkpoint.json'
+HORAS_RETOMADA = float(os.getenv('EXTRACAO_HORAS_RETOMADA', '24'))
+_trava_checkpoint = threading.Lock()
 
 # Queries 
 queries = {
@@ -52,7 +78,7 @@ queries = {
         LEFT JOIN pcusuari u ON u.codusur = m.codusur
         LEFT JOIN pcsuperv s ON s.codsupervisor = u.codsupervisor
         LEFT JOIN pcpedc p ON p.numped = m.numped
-        WHERE m.codoper = 'S' AND m.dtmov >= TO_DATE('01/01/2024', 'DD/MM/YYYY') AND m.dtcancel is null 
+        WHERE m.codoper = 'S' AND m.dtmov >= :dt_corte AND m.dtcancel is null 
         GROUP BY m.codfilial, m.dtmov, m.numped, m.codusur, s.codsupervisor, m.codcli, m.codfornec, m.codprod, m.numlote, m.datavalidade, p.codemitente, p.TIPOFV, p.ORIGEMPED
     """,
     'fato_pedido_venda.parquet': """
@@ -92,7 +118,7 @@ queries = {
             end as posicao_pedido
         from pcpedc pc
         inner join pcpedi pi on pi.numped = pc.numped
-        where pc.data >= to_date('01/12/2025', 'DD/MM/YYYY') and pc.dtcancel is null
+        where pc.data >= :dt_corte and pc.dtcancel is null
         order by posicao_pedido
     """,
     'fato_pretacao_receber.parquet': """
@@ -106,26 +132,666 @@ queries = {
             codsupervisor as cod_supervisor, numtransvenda,
             numped, codemitentepedido as cod_emitente_pedido
         from pcprest
-        where dtemissao >= to_date('01/01/2025', 'SS/MM/YYYY') and dtcancel is null and dtpag is null
+        where dtemissao >= :dt_corte and dtcancel is null and dtpag is null
     """
 }
 
-def exportar_para_parquet(query, nome_arquivo, conexao):
+# Binds das queries: o início do histórico de cada fato (:dt_corte) fica fora do texto do SQL,
+# que assim é o mesmo em toda execução, fatia e janela (cursor reaproveitado no Oracle)
+PARAMETROS = {
+    'fato_venda.parquet': {'dt_corte': datetime(2024, 1, 1)},
+    'fato_pedido_venda.parquet': {'dt_corte': datetime(2025, 12, 1)},
+    'fato_pretacao_receber.parquet': {'dt_corte': datetime(2025, 1, 1)},
+}
+
+# Fatos que aceitam extração incremental -> coluna de data usada como marca d'água
+INCREMENTAIS = {
+    'fato_venda.parquet': 'DATA_MOVIMENTACAO',
+    'fato_pedido_venda.parquet': 'DATA_PEDIDO',
+}
+_trava_marcas = threading.Lock()
+
+# Fatos grandes divididos em fatias disjuntas, cada fatia numa conexão do pool e em arquivos próprios.
+# O arquivo vira um diretório (dataset Hive ANO=/MES=[/COD_FILIAL=]) derivado da coluna de data,
+# o que permite aos leitores ler só as partições do período desejado.
+FATIADOS = {
+    'fato_venda.parquet': {'por': 'mes', 'coluna': 'DATA_MOVIMENTACAO', 'inicio': PARAMETROS['fato_venda.parquet']['dt_corte'],
+                           'particoes': ['ANO', 'MES']},
+    'fato_pedido_venda.parquet': {'por': 'mes', 'coluna': 'DATA_PEDIDO', 'inicio': PARAMETROS['fato_pedido_venda.parquet']['dt_corte'],
+                                  'particoes': ['ANO', 'MES']},
+}
+
+def _tipo_arrow(tipo_db, precisao, escala):
+    """Traduz o tipo da coluna do cursor Oracle para o tipo Arrow equivalente."""
+    if tipo_db is oracledb.DB_TYPE_NUMBER:
+        if escala == 0 and precisao and precisao <= 18:
+            return pa.int64()
+        return pa.float64()
+    if tipo_db in (oracledb.DB_TYPE_BINARY_FLOAT, oracledb.DB_TYPE_BINARY_DOUBLE):
+        return pa.float64()
+    if tipo_db in (oracledb.DB_TYPE_DATE, oracledb.DB_TYPE_TIMESTAMP,
+                   oracledb.DB_TYPE_TIMESTAMP_LTZ, oracledb.DB_TYPE_TIMESTAMP_TZ):
+        return pa.timestamp('us')
+    return pa.string()
+
+
+def _esquema_cursor(descricao):
+    # O esquema vem do cursor e não do primeiro lote: um lote só com nulos não pode definir o tipo do arquivo
+    return pa.schema([
+        pa.field(col[0], _tipo_arrow(col[1], col[4], col[5])) for col in descricao
+    ])
+
+
+def exportar_streaming(query, nome_arquivo, conexao, tamanho_lote=TAMANHO_LOTE, params=None):
+    """Busca a query em lotes (fetchmany) gravando cada lote como um row group do Parquet.
+
+    O pico de memória fica limitado ao tamanho do lote, não ao tamanho da tabela.
+    Retorna o total de registros gravados.
+    """
+    total = 0
+    with conexao.cursor() as cursor:
+        cursor.arraysize = tamanho_lote
+        cursor.prefetchrows = tamanho_lote + 1
+        with telemetria.etapa('executar'):
+            cursor.execute(query, params or {})
+
+        colunas = [col[0] for col in cursor.description]
+        # Esquema declarado (contrato de tipos) tem prioridade sobre o inferido do cursor
+        esquema = esquemas.esquema_de(nome_arquivo) or _esquema_cursor(cursor.description)
+
+        with pq.ParquetWriter(nome_arquivo, esquema, compression='snappy') as writer:
+            while True:
+                with telemetria.etapa('buscar'):
+                    linhas = cursor.fetchmany()
+                    if not linhas:
+                        break
+                    tabela = esquemas.para_tabela(pd.DataFrame.from_records(linhas, columns=colunas), esquema)
+                with telemetria.etapa('gravar'):
+                    writer.write_table(tabela)
+                total += len(linhas)
+                print(f'    ... {nome_arquivo}: {total} registros', end='\r')
+
+            if total == 0:
+                writer.write_table(esquema.empty_table())
+    return total
+
+
+def _lotes_arrow(query, conexao, tamanho_lote, params=None, esquema=None):
+    """Lotes Arrow montados pelo próprio driver (fetch_df_batches), sem objetos Python por linha.
+
+    Com esquema, cada lote é ajustado a ele ainda no Arrow (esquemas.ajustar_tabela).
+    """
+    if not hasattr(conexao, 'fetch_df_batches'):
+        raise RuntimeError('python-oracledb sem fetch_df_batches (requer 3.0+); use o caminho padrão sem --arrow')
+    # O driver executa a query junto com o primeiro lote: aqui execução e busca caem em 'buscar'
+    lotes = conexao.fetch_df_batches(statement=query, parameters=params or None, size=tamanho_lote, fetch_decimals=True)
+    for lote in telemetria.cronometrar(lotes):
+        with telemetria.etapa('buscar'):
+            tabela = pa.table(lote)
+            if esquema is not None:
+                tabela = esquemas.ajustar_tabela(tabela, esquema)
+        yield tabela
+
+
+def exportar_arrow(query, nome_arquivo, conexao, tamanho_lote=TAMANHO_LOTE, params=None):
+    """Como exportar_streaming, mas os lotes vão do cursor direto para Arrow e dali para o arquivo.
+
+    Extensão .arrow/.feather grava Arrow IPC (formato de arquivo); qualquer outra grava Parquet.
+    Retorna o total de registros gravados.
+    """
+    esquema = esquemas.esquema_de(nome_arquivo)
+    ipc = nome_arquivo.endswith(('.arrow', '.feather'))
+    writer = None
+    total = 0
+
+    def abrir(schema):
+        if ipc:
+            return pa.ipc.new_file(nome_arquivo, schema)
+        return pq.ParquetWriter(nome_arquivo, schema, compression='snappy')
+
+    try:
+        for tabela in _lotes_arrow(query, conexao, tamanho_lote, params, esquema):
+            if writer is None:
+                writer = abrir(tabela.schema)
+            if tabela.num_rows:
+                with telemetria.etapa('gravar'):
+                    writer.write_table(tabela)
+            total += tabela.num_rows
+            print(f'    ... {nome_arquivo}: {total} registros', end='\r')
+
+        if writer is None:
+            # Nenhum lote: o arquivo sai vazio, com o esquema declarado ou o das colunas da query
+            vazia = esquema.empty_table() if esquema is not None else pa.table(
+                conexao.fetch_df_all(statement=query, parameters=params or None, fetch_decimals=True))
+            writer = abrir(vazia.schema)
+            writer.write_table(vazia)
+    finally:
+        if writer is not None:
+            with telemetria.etapa('gravar'):
+                writer.close()
+    return total
+
+
+def exportar_para_parquet(query, nome_arquivo, conexao, streaming=True, tamanho_lote=TAMANHO_LOTE, arrow=False, params=None):
+    """Extração completa em <saida>.parcial; o arquivo anterior só é substituído quando ela termina."""
+    parcial = caminho_parcial(nome_arquivo)
     try:
-        if os.path.exists(nome_arquivo):
-            os.remove(nome_arquivo)
+        _restaurar_anterior(nome_arquivo)
+        _remover(parcial)
         
         print(f'[...] Extraindo: {nome_arquivo}')
-        df = pd.read_sql(query, con=conexao)
-        
-        # O "pulo do gato": Salvar como parquet com compressão snappy
-        df.to_parquet(nome_arquivo, compression='snappy', index=False)
-        print(f'[+] Sucesso: {nome_arquivo} ({len(df)} registros)')
+        inicio = time.perf_counter()
+
+        if arrow:
+            total = exportar_arrow(query, parcial, conexao, tamanho_lote, params)
+        elif streaming:
+            total = exportar_streaming(query, parcial, conexao, tamanho_lote, params)
+        else:
+            with telemetria.etapa('buscar'):
+                df = pd.read_sql(query, con=conexao, params=params or None)
+            # O "pulo do gato": Salvar como parquet com compressão snappy
+            with telemetria.etapa('gravar'):
+                if esquemas.esquema_de(nome_arquivo) is not None:
+                    esquemas.gravar_tipado(df, parcial)
+                else:
+                    df.to_parquet(parcial, compression='snappy', index=False)
+            total = len(df)
+        _trocar_destino(parcial, nome_arquivo)
+
+        duracao = time.perf_counter() - inicio
+        taxa = total / duracao if duracao > 0 else 0
+        telemetria.registrar(total, telemetria.tamanho_em_disco(nome_arquivo))
+        manifesto.gravar_manifesto(nome_arquivo)
+        print(f'[+] Sucesso: {nome_arquivo} ({total} registros em {duracao:.1f}s, {taxa:,.0f} reg/s)')
+        return total
         
     except Exception as e:
         print(f'[!] Erro em {nome_arquivo}: {e}')
+        telemetria.falhou(e)
+        _remover(parcial)
+        return None
+
+def exportar_dimensao(query, nome_arquivo, conexao, tamanho_lote=TAMANHO_LOTE, arrow=False):
+    """Extrai a dimensão e grava só o que mudou por chave (delta); sem mudança, mantém o arquivo.
+
+    Sem base em disco faz a extração completa. Retorna o total de registros da dimensão.
+    """
+    if not os.path.isfile(nome_arquivo):
+        print(f'[i] {nome_arquivo}: sem base, extração completa.')
+        total = exportar_para_parquet(query, nome_arquivo, conexao, tamanho_lote=tamanho_lote, arrow=arrow)
+        if total is not None:
+            dimensoes.registrar_completa(nome_arquivo)
+        return total
+
+    try:
+        print(f'[...] Comparando: {nome_arquivo}')
+        inicio = time.perf_counter()
+        esquema = esquemas.esquema_de(nome_arquivo)
+        buscar = _lotes_arrow if arrow else _lotes_cursor
+        lotes = list(buscar(query, conexao, tamanho_lote, esquema=esquema))
+        nova = pa.concat_tables(lotes) if lotes else esquema.empty_table()
+        with telemetria.etapa('gravar'):
+            modo, mudancas, gravados = dimensoes.aplicar(nome_arquivo, nova)
+        telemetria.registrar(nova.num_rows, gravados)
+
+        duracao = time.perf_counter() - inicio
+        if modo == 'sem_alteracao':
+            print(f'[=] {nome_arquivo}: sem alterações, arquivo mantido ({nova.num_rows} registros, {duracao:.1f}s)')
+        else:
+            print(f"[+] Sucesso: {nome_arquivo} ({modo}: {len(mudancas['inseridos'])} nova(s), "
+                  f"{len(mudancas['alterados'])} alterada(s), {len(mudancas['removidos'])} removida(s), {duracao:.1f}s)")
+        return nova.num_rows
+
+    except Exception as e:
+        print(f'[!] Erro em {nome_arquivo}: {e}')
+        telemetria.falhou(e)
+        return None
+
+
+def ler_marcas():
+    if not os.path.exists(ARQUIVO_MARCAS):
+        return {}
+    with open(ARQUIVO_MARCAS, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def gravar_marca(nome_arquivo, coluna, fatiado_por=None, particoes=None):
+    """Registra como marca d'água a maior data presente no arquivo já consolidado."""
+    maior = pq.read_table(nome_arquivo, columns=[coluna]).column(coluna).to_pandas().max()
+    if pd.isna(maior):
+        return
+
+    with _trava_marcas:
+        marcas = ler_marcas()
+        marcas[nome_arquivo] = {
+            'coluna': coluna,
+            'marca': maior.isoformat(),
+            'fatiado_por': fatiado_por,
+            'particoes': particoes,
+            'atualizado_em': datetime.now().isoformat(timespec='seconds'),
+        }
+        with open(ARQUIVO_MARCAS, 'w', encoding='utf-8') as f:
+            json.dump(marcas, f, indent=2, ensure_ascii=False)
+
+
+def inicio_incremental(marca, dias_retroativos):
+    dt_inicio = datetime.fromisoformat(marca['marca']).replace(hour=0, minute=0, second=0, microsecond=0)
+    return dt_inicio - timedelta(days=dias_retroativos)
+
+
+def exportar_incremental(query, nome_arquivo, conexao, dias_retroativos=DIAS_RETROATIVOS, tamanho_lote=TAMANHO_LOTE, arrow=False, params=None):
+    """Busca só a janela após a marca d'água (menos os dias retroativos) e mescla no arquivo existente.
+
+    Os dias da janela são substituídos por inteiro: linhas canceladas depois da última
+    extração somem do resultado, desde que o cancelamento caia dentro da janela retroativa.
+    Sem marca ou sem arquivo anterior, faz a extração completa.
+    """
+    coluna = INCREMENTAIS[nome_arquivo]
+    marca = ler_marcas().get(nome_arquivo)
+
+    if marca is None or not os.path.isfile(nome_arquivo):
+        print(f'[i] {nome_arquivo}: sem marca d\'água, extração completa.')
+        total = exportar_para_parquet(query, nome_arquivo, conexao, tamanho_lote=tamanho_lote, arrow=arrow, params=params)
+        if total is not None:
+            gravar_marca(nome_arquivo, coluna)
+        return total
+
+    dt_inicio = inicio_incremental(marca, dias_retroativos)
+    query_janela = f"SELECT * FROM ({query}) WHERE {coluna} >= :dt_inicio"
+    arquivo_janela = f'{nome_arquivo}.janela'
+    arquivo_tmp = f'{nome_arquivo}.tmp'
+
+    try:
+        print(f'[...] Extraindo: {nome_arquivo} a partir de {dt_inicio:%d/%m/%Y}')
+        inicio = time.perf_counter()
+        exportar = exportar_arrow if arrow else exportar_streaming
+        total = exportar(query_janela, arquivo_janela, conexao, tamanho_lote, {**(params or {}), 'dt_inicio': dt_inicio})
+
+        with telemetria.etapa('gravar'):
+            # Linhas sem data nunca caem na janela (NULL >= :dt_inicio é falso): ficam do arquivo antigo
+            antigo = pq.read_table(nome_arquivo, filters=(ds.field(coluna) < dt_inicio) | ds.field(coluna).is_null())
+            novo = pq.read_table(arquivo_janela).cast(antigo.schema)
+            pq.write_table(pa.concat_tables([antigo, novo]), arquivo_tmp, compression='snappy', row_group_size=tamanho_lote)
+            os.replace(arquivo_tmp, nome_arquivo)
+        gravar_marca(nome_arquivo, coluna)
+        manifesto.gravar_manifesto(nome_arquivo)
+
+        duracao = time.perf_counter() - inicio
+        taxa = total / duracao if duracao > 0 else 0
+        telemetria.registrar(total, telemetria.tamanho_em_disco(nome_arquivo))
+        print(f'[+] Sucesso: {nome_arquivo} ({total} registros na janela, {antigo.num_rows} mantidos, {duracao:.1f}s, {taxa:,.0f} reg/s)')
+        return total
+
+    except Exception as e:
+        print(f'[!] Erro em {nome_arquivo}: {e}')
+        telemetria.falhou(e)
+        return None
+    finally:
+        for temporario in (arquivo_janela, arquivo_tmp):
+            if os.path.exists(temporario):
+                os.remove(temporario)
+
+def _inicio_mes(data):
+    return datetime(data.year, data.month, 1)
+
+
+def _proximo_mes(data):
+    return datetime(data.year + data.month // 12, data.month % 12 + 1, 1)
+
+
+def fatias_por_mes(coluna, inicio, ate=None):
+    """Divide o domínio da coluna de data em faixas mensais disjuntas que cobrem todas as linhas.
+
+    A primeira faixa é aberta para baixo (inclui nulos) e a última aberta para cima, então
+    a união das fatias é exatamente o resultado da query sem fatiamento.
+    Retorna uma lista de (rotulo, filtro_sql, params).
+    """
+    limites = []
+    mes = _proximo_mes(inicio)
+    ate = ate or datetime.now()
+    while mes <= ate:
+        limites.append(mes)
+        mes = _proximo_mes(mes)
+
+    if not limites:
+        return [(f'{inicio:%Y%m}', '1 = 1', {})]
+
+    fatias = [(f'{inicio:%Y%m}', f'({coluna} < :dt_fim OR {coluna} IS NULL)', {'dt_fim': limites[0]})]
+    for dt_ini, dt_fim in zip(limites, limites[1:]):
+        fatias.append((f'{dt_ini:%Y%m}', f'{coluna} >= :dt_ini AND {coluna} < :dt_fim', {'dt_ini': dt_ini, 'dt_fim': dt_fim}))
+    fatias.append((f'{limites[-1]:%Y%m}', f'{coluna} >= :dt_ini', {'dt_ini': limites[-1]}))
+    return fatias
+
+
+def fatias_por_filial(conexao):
+    """Uma fatia por filial cadastrada e uma fatia de resto (filial nula ou fora do cadastro)."""
+    with conexao.cursor() as cursor:
+        codigos = [str(linha[0]) for linha in cursor.execute("SELECT codigo FROM pcfilial ORDER BY codigo")]
+
+    fatias = [(f'F{codigo}', 'COD_FILIAL = :cod_filial', {'cod_filial': codigo}) for codigo in codigos]
+    binds = {f'f{i}': codigo for i, codigo in enumerate(codigos)}
+    lista = ', '.join(f':{nome}' for nome in binds) or 'NULL'
+    fatias.append(('Fresto', f'(COD_FILIAL IS NULL OR COD_FILIAL NOT IN ({lista}))', binds))
+    return fatias
+
+
+def _chaves_particao(tabela, coluna, particoes):
+    """Valores de partição de cada linha do lote; datas/filiais nulas vão para a partição 0."""
+    datas = pd.to_datetime(tabela.column(coluna).to_pandas())
+    chaves = pd.DataFrame({
+        'ANO': datas.dt.year.fillna(0).astype(int),
+        'MES': datas.dt.month.fillna(0).astype(int),
+    })
+    if 'COD_FILIAL' in particoes:
+        chaves['COD_FILIAL'] = pd.to_numeric(tabela.column('COD_FILIAL').to_pandas(), errors='coerce').fillna(0).astype(int)
+    return chaves[particoes]
+
+
+def _lotes_cursor(query, conexao, tamanho_lote, params=None, esquema=None):
+    """Lotes via fetchmany convertidos para Arrow (esquema declarado ou o inferido do cursor)."""
+    with conexao.cursor() as cursor:
+        cursor.arraysize = tamanho_lote
+        cursor.prefetchrows = tamanho_lote + 1
+        with telemetria.etapa('executar'):
+            cursor.execute(query, params or {})
+
+        colunas = [col[0] for col in cursor.description]
+        esquema = esquema or _esquema_cursor(cursor.description)
+        while True:
+            with telemetria.etapa('buscar'):
+                linhas = cursor.fetchmany()
+                if not linhas:
+                    break
+                tabela = esquemas.para_tabela(pd.DataFrame.from_records(linhas, columns=colunas), esquema)
+            yield tabela
+
+
+def exportar_fatia(query, diretorio, rotulo, filtro, params, coluna, particoes, conexao, tamanho_lote=TAMANHO_LOTE, arrow=False, checkpoint=None):
+    """Extrai uma fatia da query para o dataset particionado, um arquivo da fatia por partição.
+
+    Cada lote é distribuído entre as partições ANO=/MES=[/COD_FILIAL=] e os arquivos da
+    fatia só substituem os anteriores (mesmo rótulo) quando a fatia inteira terminou.
+    Com checkpoint, a fatia concluída é registrada no diretório para uma retomada pular.
+    """
+    inicio = time.perf_counter()
+    writers = {}
+    total = 0
+    buscar = _lotes_arrow if arrow else _lotes_cursor
+    try:
+        for tabela in buscar(f"SELECT * FROM ({query}) WHERE {filtro}", conexao, tamanho_lote, params,
+                             esquemas.esquema_de(diretorio)):
+            if not tabela.num_rows:
+                continue
+            # Colunas usadas como partição ficam só no caminho (padrão Hive)
+            esquema_arquivo = pa.schema([campo for campo in tabela.schema if campo.name not in particoes])
+            chaves = _chaves_particao(tabela, coluna, particoes)
+
+            for valores, posicoes in chaves.groupby(particoes, sort=False).indices.items():
+                valores = valores if isinstance(valores, tuple) else (valores,)
+                subdir = os.path.join(diretorio, *(f'{nome}={valor}' for nome, valor in zip(particoes, valores)))
+                if subdir not in writers:
+                    os.makedirs(subdir, exist_ok=True)
+                    # Prefixo '.' deixa o arquivo parcial invisível para quem lê o dataset
+                    writers[subdir] = pq.ParquetWriter(os.path.join(subdir, f'.fatia_{rotulo}.parquet.tmp'), esquema_arquivo, compression='snappy')
+                with telemetria.etapa('gravar'):
+                    writers[subdir].write_table(tabela.take(posicoes).select(esquema_arquivo.names))
+            total += tabela.num_rows
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    for antigo in glob.glob(os.path.join(diretorio, '**', f'fatia_{rotulo}.parquet'), recursive=True):
+        os.remove(antigo)
+    gravados = 0
+    for subdir in writers:
+        final = os.path.join(subdir, f'fatia_{rotulo}.parquet')
+        os.replace(os.path.join(subdir, f'.fatia_{rotulo}.parquet.tmp'), final)
+        gravados += os.path.getsize(final)
+    if checkpoint is not None:
+        _marcar_fatia(diretorio, rotulo, checkpoint)
+
+    duracao = time.perf_counter() - inicio
+    taxa = total / duracao if duracao > 0 else 0
+    telemetria.registrar(total, gravados)
+    print(f'[+] Sucesso: {diretorio}[{rotulo}] ({total} registros em {len(writers)} partição(ões), {duracao:.1f}s, {taxa:,.0f} reg/s)')
+
+
+def caminho_parcial(caminho):
+    # Mesma extensão no fim: o esquema declarado e o formato continuam valendo para o parcial
+    raiz, extensao = os.path.splitext(caminho.rstrip('/\\'))
+    return f'{raiz}.parcial{extensao}'
+
+
+def _remover(caminho):
+    if os.path.isdir(caminho):
+        shutil.rmtree(caminho)
+    elif os.path.exists(caminho):
+        os.remove(caminho)
+
+
+def _restaurar_anterior(destino):
+    """Desfaz uma troca interrompida entre tirar a versão anterior e colocar a nova."""
+    anterior = destino + '.anterior'
+    if os.path.exists(anterior) and not os.path.exists(destino):
+        os.replace(anterior, destino)
+        print(f'[i] {destino}: versão anterior restaurada após troca interrompida.')
+
+
+def _trocar_destino(parcial, destino):
+    """Coloca a extração concluída no lugar da anterior, que só é apagada depois da troca."""
+    if not os.path.exists(parcial):
+        # Sem extração nova não há troca: a versão em uso continua no lugar
+        raise FileNotFoundError(f'{parcial}: extração não gerou arquivo; {destino} mantido')
+    if os.path.isfile(parcial) and not os.path.isdir(destino):
+        os.replace(parcial, destino)
+    else:
+        # Diretório não é trocado atomicamente: a anterior sai de lado e volta se a troca cair no meio
+        anterior = destino + '.anterior'
+        _remover(anterior)
+        if os.path.exists(destino):
+            os.replace(destino, anterior)
+        os.replace(parcial, destino)
+        _remover(anterior)
+    # Uma base nova invalida os deltas de dimensão gravados sobre a anterior
+    dimensoes.descartar_deltas(destino)
+
+
+def _chave_fatia(filtro, params):
+    # A fatia só vale como checkpoint se o filtro e os limites forem os mesmos (o mês aberto fecha)
+    return filtro + ' ' + json.dumps(params, default=str, sort_keys=True)
+
+
+def _ler_checkpoint(diretorio):
+    caminho = os.path.join(diretorio, ARQUIVO_CHECKPOINT)
+    if not os.path.exists(caminho):
+        return None
+    with open(caminho, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _gravar_checkpoint(diretorio, checkpoint):
+    # Prefixo '_' deixa o checkpoint fora do dataset para quem lê o Parquet
+    caminho = os.path.join(diretorio, ARQUIVO_CHECKPOINT)
+    with open(caminho + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f, indent=2, ensure_ascii=False)
+    os.replace(caminho + '.tmp', caminho)
+
+
+def _marcar_fatia(diretorio, rotulo, chave):
+    with _trava_checkpoint:
+        checkpoint = _ler_checkpoint(diretorio)
+        checkpoint['fatias'][rotulo] = chave
+        _gravar_checkpoint(diretorio, checkpoint)
+
+
+def preparar_parcial(arquivo, assinatura):
+    """Diretório parcial do fato fatiado e as fatias já concluídas nele ({rotulo: chave}).
+
+    O parcial é reaproveitado só se foi começado com a mesma query/particionamento e dentro de
+    HORAS_RETOMADA; fora disso começa do zero.
+    """
+    parcial = caminho_parcial(arquivo)
+    checkpoint = _ler_checkpoint(parcial) if os.path.isdir(parcial) else None
+    if checkpoint is not None:
+        idade_h = (datetime.now() - datetime.fromisoformat(checkpoint['iniciado_em'])).total_seconds() / 3600
+        if checkpoint['assinatura'] == assinatura and idade_h <= HORAS_RETOMADA:
+            return parcial, checkpoint['fatias']
+        print(f'[i] {arquivo}: extração parcial descartada (de {checkpoint["iniciado_em"]}, outra configuração ou vencida).')
+    _remover(parcial)
+    os.makedirs(parcial)
+    _gravar_checkpoint(parcial, {'assinatura': assinatura, 'iniciado_em': datetime.now().isoformat(timespec='seconds'), 'fatias': {}})
+    return parcial, {}
+
+
+def concluir_parcial(arquivo):
+    """Todas as fatias gravadas: o parcial vira o dataset e a versão anterior sai."""
+    parcial = caminho_parcial(arquivo)
+    os.remove(os.path.join(parcial, ARQUIVO_CHECKPOINT))
+    _trocar_destino(parcial, arquivo)
+    print(f'[+] {arquivo}: extração completa no lugar da versão anterior.')
+
+
+def particoes_de(arquivo, args):
+    particoes = list(FATIADOS[arquivo]['particoes'])
+    if args.particionar_filial and 'COD_FILIAL' not in particoes:
+        particoes.append('COD_FILIAL')
+    return particoes
+
+
+def planejar_fatiado(arquivo, sql, args, pool):
+    """Monta as tarefas de um fato fatiado; no modo incremental só as fatias a partir da janela."""
+    config = FATIADOS[arquivo]
+    por = args.fatiar_por or config['por']
+    particoes = particoes_de(arquivo, args)
+
+    if por == 'filial':
+        with pool.acquire() as conexao:
+            fatias = fatias_por_filial(conexao)
+    else:
+        fatias = fatias_por_mes(config['coluna'], config['inicio'])
+
+    marca = ler_marcas().get(arquivo)
+    _restaurar_anterior(arquivo)
+    concluidas = None
+    if (args.incremental and por == 'mes' and os.path.isdir(arquivo) and marca is not None
+            and marca.get('fatiado_por') == 'mes' and marca.get('particoes') == particoes):
+        mes_janela = f"{_inicio_mes(inicio_incremental(marca, args.dias_retroativos)):%Y%m}"
+        # A primeira fatia é aberta para baixo: se a janela cai nela, tudo é refeito
+        if mes_janela > fatias[0][0]:
+            fatias = [f for f in fatias if f[0] >= mes_janela]
+        print(f'[i] {arquivo}: incremental, {len(fatias)} fatia(s) a partir de {mes_janela}')
+        # Um parcial de extração completa que ficou para trás não pode ser trocado no fim desta
+        _remover(caminho_parcial(arquivo))
+        destino = arquivo
+        os.makedirs(arquivo, exist_ok=True)
+    else:
+        # Completa: monta no parcial (o dataset atual segue legível) e retoma as fatias já concluídas
+        assinatura = {'por': por, 'particoes': particoes, 'query': hashlib.sha256(sql.encode('utf-8')).hexdigest()}
+        destino, concluidas = preparar_parcial(arquivo, assinatura)
+        pendentes = [f for f in fatias if concluidas.get(f[0]) != _chave_fatia(f[1], f[2])]
+        if len(pendentes) < len(fatias):
+            print(f'[i] {arquivo}: retomando, {len(fatias) - len(pendentes)} fatia(s) já concluída(s), {len(pendentes)} pendente(s)')
+        fatias = pendentes
+
+    return [
+        (arquivo, f'{arquivo}[{rotulo}]',
+         partial(exportar_fatia, sql, destino, rotulo, filtro, {**PARAMETROS.get(arquivo, {}), **params}, config['coluna'], particoes,
+                 tamanho_lote=args.lote, arrow=args.arrow,
+                 checkpoint=None if concluidas is None else _chave_fatia(filtro, params)))
+        for rotulo, filtro, params in fatias
+    ]
+
+
+def extrair_arquivo(arquivo, sql, args, conexao):
+    if args.incremental and arquivo in INCREMENTAIS:
+        total = exportar_incremental(sql, arquivo, conexao, args.dias_retroativos, args.lote, args.arrow, PARAMETROS.get(arquivo))
+    elif args.dimensoes_delta and arquivo in dimensoes.DIMENSOES:
+        total = exportar_dimensao(sql, arquivo, conexao, args.lote, args.arrow)
+    else:
+        total = exportar_para_parquet(sql, arquivo, conexao, streaming=not args.sem_streaming, tamanho_lote=args.lote,
+                                      arrow=args.arrow, params=PARAMETROS.get(arquivo))
+        if arquivo in INCREMENTAIS and total is not None:
+            gravar_marca(arquivo, INCREMENTAIS[arquivo])
+        if total is not None:
+            dimensoes.registrar_completa(arquivo)
+    if total is None:
+        # Os exportadores já registraram o erro; a falha sobe para o executor contabilizar
+        raise RuntimeError(f'extração de {arquivo} falhou')
+
+
+def planejar_tarefas(args, pool):
+    """Lista de (arquivo, rotulo, funcao(conexao)) prontas para o executor."""
+    tarefas = []
+    for arquivo, sql in queries.items():
+        if arquivo in FATIADOS and args.fatiar_por != 'nenhum':
+            tarefas += planejar_fatiado(arquivo, sql, args, pool)
+        else:
+            tarefas.append((arquivo, arquivo, partial(extrair_arquivo, arquivo, sql, args)))
+    return tarefas
+
+
+def executar_em_paralelo(args, pool=None):
+    """Executa todas as extrações no pool e devolve o conjunto de arquivos que falharam.
+
+    Com `pool` (ex. o do agendador) as sessões saem dele, que continua aberto ao final;
+    sem ele, um pool próprio de args.paralelo sessões é criado e fechado aqui.
+    """
+    inicio_execucao = time.perf_counter()
+    tempos = []
+    falhas = set()
+    pool_proprio = pool is None
+    if pool_proprio:
+        pool = conexao_oracle.criar_pool(args.paralelo)
+    try:
+        tarefas = planejar_tarefas(args, pool)
+        with ThreadPoolExecutor(max_workers=args.paralelo) as executor:
+            futuros = {
+                executor.submit(conexao_oracle.executar_tarefa, pool, rotulo, funcao): (arquivo, rotulo)
+                for arquivo, rotulo, funcao in tarefas
+            }
+            for futuro in as_completed(futuros):
+                arquivo, rotulo = futuros[futuro]
+                try:
+                    tempos.append(futuro.result())
+                except Exception as e:
+                    falhas.add(arquivo)
+                    print(f'[!] Erro em {rotulo}: {e}')
+    finally:
+        if pool_proprio:
+            pool.close()
+
+    # A marca d'água de um fato fatiado só avança quando todas as fatias foram gravadas;
+    # na extração completa é também quando o parcial toma o lugar do dataset anterior
+    fatiados = {a for a in queries if a in FATIADOS and args.fatiar_por != 'nenhum'}
+    for arquivo in fatiados - falhas:
+        if os.path.isdir(caminho_parcial(arquivo)):
+            concluir_parcial(arquivo)
+        if arquivo in INCREMENTAIS:
+            gravar_marca(arquivo, INCREMENTAIS[arquivo], args.fatiar_por or FATIADOS[arquivo]['por'], particoes_de(arquivo, args))
+    # O manifesto descreve o que está em disco, inclusive as fatias que chegaram antes de uma falha
+    for arquivo in fatiados:
+        if os.path.exists(arquivo):
+            manifesto.gravar_manifesto(arquivo)
+
+    conexao_oracle.imprimir_resumo(tempos, inicio_execucao)
+    return falhas
+
+def criar_parser():
+    parser = argparse.ArgumentParser(description='Extração das dimensões e fatos para Parquet.')
+    parser.add_argument('--lote', type=int, default=TAMANHO_LOTE, help='Linhas por lote no modo streaming.')
+    parser.add_argument('--sem-streaming', action='store_true', help='Usa pd.read_sql carregando a tabela inteira em memória.')
+    parser.add_argument('--arrow', action='store_true', help='Busca os lotes direto em Arrow pelo driver (fetch_df_batches), sem pandas.')
+    parser.add_argument('--incremental', action='store_true', help='Extrai os fatos só a partir da marca d\'água gravada.')
+    parser.add_argument('--dimensoes-delta', action='store_true', help='Regrava só as chaves alteradas das dimensões (ou nada, se não mudaram).')
+    parser.add_argument('--dias-retroativos', type=int, default=DIAS_RETROATIVOS, help='Dias relidos antes da marca (cancelamentos tardios).')
+    parser.add_argument('--paralelo', type=int, default=MAX_CONEXOES, help='Máximo de queries simultâneas no servidor.')
+    parser.add_argument('--fatiar-por', choices=['mes', 'filial', 'nenhum'], help='Sobrescreve o fatiamento dos fatos grandes.')
+    parser.add_argument('--particionar-filial', action='store_true', help='Acrescenta COD_FILIAL às partições ANO/MES.')
+    return parser
+
 
 if __name__ == "__main__":
-    with oracledb.connect(user=ORACLE_USER, password=ORACLE_PASSWORD, dsn=dsn) as connection:
-        for arquivo, sql in queries.items():
-            exportar_para_parquet(sql, arquivo, connection)
\ No newline at end of file
+    args = criar_parser().parse_args()
+
+    falhas = executar_em_paralelo(args)
+    raise SystemExit(1 if falhas else 0)
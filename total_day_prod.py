@@ -1,20 +1,13 @@
 import pandas as pd
-import oracledb
-from dotenv import load_dotenv
+import conexao_oracle
+import telemetria
+from datetime import datetime
+import argparse
 import os
+import time
 
-try:
-    oracledb.init_oracle_client(lib_dir=r"C:\instantclient_23_9")
-except Exception as e:
-    print(f'Aviso: Não foi possível inicializar o cliente oracle: {e}')
-
-
-load_dotenv()
-ORACLE_USER = os.getenv('ORACLE_USER')
-ORACLE_PASSWORD = os.getenv('ORACLE_PASSWORD')
-dsn = '192.168.0.1/wint'
-
-
+# --- SQL (executado pelo runner de jobs.py) ---
+# Dia dos pedidos no bind :dt_dia (padrão: hoje, ver jobs.JOBS)
 sql_total_day_rca = """
     SELECT
         c.codfilial AS filial,
@@ -29,7 +22,8 @@ sql_total_day_rca = """
         i.qt AS qt_vendida,
         i.pvenda AS vl_venda,
         i.posicao AS posicao_pedido,
-        pm.DESCRICAORESUMIDA
+        pm.DESCRICAORESUMIDA,
+        c.numped AS num_pedido
     FROM
         pcpedc c
     INNER JOIN
@@ -45,7 +39,7 @@ sql_total_day_rca = """
     INNER JOIN
         pcprodut p ON p.codprod = i.codprod 
     WHERE
-        c.data = TO_DATE('2025-12-11', 'YYYY-MM-DD') --- AND TO_DATE('2025-12-12', 'YYYY-MM-DD')
+        c.data = :dt_dia
         AND c.condvenda IN (1, 5)
 """
 sql_total_day_televenda = """
@@ -61,7 +55,8 @@ sql_total_day_televenda = """
         p.descricao as nm_produto,
         i.qt as qt_vendida,
         i.pvenda as vl_venda,
-        i.posicao as posicao_pedido
+        i.posicao as posicao_pedido,
+        c.numped as num_pedido
     from pcpedc c
     left join pcpedi i on i.numped = c.numped
     left join pcempr e on e.matricula = c.codemitente
@@ -69,45 +64,179 @@ sql_total_day_televenda = """
     left join pcprodut p on p.codprod = i.codprod
     left join pcusuari u on u.codusur = e.codusur
     left join pcsuperv s on s.codsupervisor = u.codsupervisor
-    where c.data = TO_DATE('2025-12-11', 'YYYY-MM-DD')
+    where c.data = :dt_dia
         and c.condvenda in (1,5) 
         AND c.codemitente <> 8888
 """
 
-def verificar_e_apagar_csv(nome_arquivo):
-    if os.path.exists(nome_arquivo):
-        try:
-            os.remove(nome_arquivo)
-            print(f' Arquivo antigo {nome_arquivo} apagado com sucesso.')
-        except OSError as e:
-            print(f' Erro ao apagar o arquivo {nome_arquivo}: {e}')
-    else:
-        print(f' Arquivo {nome_arquivo} não encontrado. Criando novo...')
+# --- MODO POLLING (intraday) ---
+# Em vez de reler o dia inteiro a cada atualização, cada ciclo busca só os pedidos do dia
+# inseridos ou alterados desde o ciclo anterior: ORA_ROWSCN (SCN da última alteração do
+# bloco) acima da marca, em PCPEDC ou em PCPEDI. Os itens desses NUM_PEDIDO substituem a
+# contribuição anterior de cada pedido nos totais em memória; pedidos que saíram do filtro
+# (cancelados para outra condição de venda, televendas 8888) só perdem a contribuição.
+# A marca do ciclo seguinte é o SCN de MARGEM_SCN_S segundos antes do início deste: alterações
+# que caem na sobreposição são relidas (a substituição por pedido torna isso inofensivo).
+
+SQL_PEDIDOS_ALTERADOS = """
+    SELECT c.numped FROM pcpedc c
+    WHERE c.data = :dt_dia AND c.ORA_ROWSCN > :scn
+    UNION
+    SELECT i.numped FROM pcpedi i INNER JOIN pcpedc c ON c.numped = i.numped
+    WHERE c.data = :dt_dia AND i.ORA_ROWSCN > :scn
+"""
+SQL_SCN = "SELECT TIMESTAMP_TO_SCN(SYSTIMESTAMP - NUMTODSINTERVAL(:margem, 'SECOND')) FROM DUAL"
+MARGEM_SCN_S = int(os.getenv('TOTAL_DAY_MARGEM_SCN_S', '60'))
+
+# visão -> (SQL do dia, saídas do job com o detalhe)
+VISOES = {
+    'rca': (sql_total_day_rca, ['total_day_rcca.csv', 'total_day_rcca.parquet']),
+    'televenda': (sql_total_day_televenda, ['total_day_televenda.csv', 'total_day_televenda.parquet']),
+}
+# total -> (visão de origem, chave, nome descritivo)
+TOTAIS = {
+    'rca': ('rca', 'COD_RCA', 'NM_RCA'),
+    'supervisor': ('rca', 'CODSUPERVISOR', 'SUPERVISOR'),
+    'produto': ('rca', 'COD_PRODUTO', 'NM_PRODUTO'),
+    'televenda': ('televenda', 'COD_TELEVENDA', 'NM_TELEVENDA'),
+}
+
+
+def novo_estado(dia):
+    return {
+        'dia': dia,
+        'scn': 0,
+        'detalhe': {visao: None for visao in VISOES},
+        'totais': {nome: None for nome in TOTAIS},
+    }
 
 
-try:
-    with oracledb.connect(user=ORACLE_USER, password=ORACLE_PASSWORD, dsn=dsn) as connection:
-        print('Conexão com sucesso.')
+def _contribuicao(linhas, chave):
+    """Totais de um conjunto de itens por chave; cada pedido conta uma vez por chave que toca."""
+    valor = pd.to_numeric(linhas['QT_VENDIDA'], errors='coerce').fillna(0) * pd.to_numeric(linhas['VL_VENDA'], errors='coerce').fillna(0)
+    return (linhas.assign(VALOR=valor)
+            .groupby(chave, dropna=False)
+            .agg(QT_VENDIDA=('QT_VENDIDA', 'sum'), VALOR=('VALOR', 'sum'), PEDIDOS=('NUM_PEDIDO', 'nunique')))
 
-        df_total_day_rca = pd.read_sql(sql_total_day_rca, con=connection)
-        
-        NOME_ARQUIVO_VERBA = 'total_day_rcca.csv'
-        verificar_e_apagar_csv(NOME_ARQUIVO_VERBA)
-        df_total_day_rca.to_csv(NOME_ARQUIVO_VERBA, index=False, sep=';', encoding='utf-8-sig', decimal=',')
-        print(f' Relatório de Acompanhamento RCA salvo como {NOME_ARQUIVO_VERBA}.')
 
-        df_total_day_televenda = pd.read_sql(sql_total_day_televenda, con=connection)
-        
-        NOME_ARQUIVO_DEVOLUCAO = 'total_day_televenda.csv'
-        verificar_e_apagar_csv(NOME_ARQUIVO_DEVOLUCAO) 
-        df_total_day_televenda.to_csv(NOME_ARQUIVO_DEVOLUCAO, index=False, sep=';', encoding='utf-8-sig', decimal=',') 
-        print(f' Relatório de Acompanhamento televendas salvo como {NOME_ARQUIVO_DEVOLUCAO}.')
+def aplicar_delta(estado, visao, alterados, novas):
+    """Troca as linhas dos pedidos alterados pelas recém-buscadas e ajusta os totais da visão."""
+    detalhe = estado['detalhe'][visao]
+    if detalhe is None:
+        detalhe = novas.iloc[0:0]
+    saem = detalhe['NUM_PEDIDO'].isin(list(alterados))
+    antigas = detalhe[saem]
+    for nome, (origem, chave, _) in TOTAIS.items():
+        if origem != visao:
+            continue
+        atual = estado['totais'][nome]
+        delta = _contribuicao(novas, chave).sub(_contribuicao(antigas, chave), fill_value=0)
+        atual = delta if atual is None else atual.add(delta, fill_value=0)
+        # Chave sem nenhum pedido restante sai do total
+        estado['totais'][nome] = atual[atual['PEDIDOS'] > 0]
+    estado['detalhe'][visao] = pd.concat([detalhe[~saem], novas], ignore_index=True)
+    return len(antigas), len(novas)
 
 
-except oracledb.Error as e:
-    error_obj = e.args[0]
-    print(f'Erro ao se conectar ou executar a query no banco Oracle: {error_obj.code}:{error_obj.message}')
-    print('Verificar as credenciais, DNS e o status do servidor.')
+def totais_publicaveis(estado, nome):
+    """Total com o nome descritivo (o mais recente no detalhe), ordenado por valor."""
+    origem, chave, descricao = TOTAIS[nome]
+    total = estado['totais'][nome]
+    detalhe = estado['detalhe'][origem]
+    if total is None or detalhe is None:
+        return pd.DataFrame(columns=[chave, descricao, 'QT_VENDIDA', 'VALOR', 'PEDIDOS'])
+    nomes = detalhe.drop_duplicates(chave, keep='last').set_index(chave)[descricao]
+    total = total.reset_index()
+    total.insert(1, descricao, total[chave].map(nomes))
+    total['PEDIDOS'] = total['PEDIDOS'].astype(int)
+    total['VALOR'] = total['VALOR'].round(2)
+    return total.sort_values('VALOR', ascending=False, ignore_index=True)
 
-except Exception as e:
-    print(f'Ocorreu um erro inesperado: {e}')
\ No newline at end of file
+
+def consultar(conexao, estado):
+    """Um ciclo: pedidos alterados desde a marca, aplicados a cada visão. Devolve {visao: (saíram, entraram)}."""
+    with conexao.cursor() as cursor:
+        cursor.execute(SQL_SCN, {'margem': MARGEM_SCN_S})
+        proxima_marca = cursor.fetchone()[0]
+    params = {'dt_dia': estado['dia'], 'scn': estado['scn']}
+    with telemetria.etapa('buscar'):
+        alterados = pd.read_sql(SQL_PEDIDOS_ALTERADOS, con=conexao, params=params)['NUMPED']
+        resultado = {}
+        for visao, (sql, _) in VISOES.items():
+            if alterados.empty and estado['detalhe'][visao] is not None:
+                resultado[visao] = (0, 0)
+                continue
+            novas = pd.read_sql(f"SELECT * FROM ({sql}) WHERE num_pedido IN ({SQL_PEDIDOS_ALTERADOS})",
+                                con=conexao, params=params)
+            telemetria.registrar(len(novas))
+            # A subconsulta de `novas` relê os pedidos alterados: um pedido que mudou depois da
+            # leitura de `alterados` vem só em `novas` e também precisa ter as linhas antigas trocadas
+            resultado[visao] = aplicar_delta(estado, visao, set(alterados) | set(novas['NUM_PEDIDO']), novas)
+    estado['scn'] = proxima_marca
+    return resultado
+
+
+def publicar(estado):
+    """Grava o detalhe do dia nas saídas dos jobs e os totais em total_day_totais_<total>.csv."""
+    import jobs
+    for visao, (_, saidas) in VISOES.items():
+        for nome_arquivo in saidas:
+            jobs.gravar_saida(estado['detalhe'][visao], nome_arquivo)
+    for nome in TOTAIS:
+        jobs.gravar_saida(totais_publicaveis(estado, nome), f'total_day_totais_{nome}.csv')
+
+
+def executar_polling(intervalo_min=5, ciclos=0):
+    """Consulta os deltas do dia a cada intervalo_min e republica quando algo mudou.
+
+    A conexão fica aberta entre ciclos (mesmo SQL, cursor vindo do cache de statements) e é
+    refeita após uma falha sem perder os totais. ciclos=0 roda até ser interrompido.
+    """
+    estado = None
+    conexao = None
+    ciclo = 0
+    while not ciclos or ciclo < ciclos:
+        ciclo += 1
+        inicio = time.perf_counter()
+        dia = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        if estado is None or estado['dia'] != dia:
+            print(f'[i] Polling de {dia:%d/%m/%Y}: carga inicial do dia.')
+            estado = novo_estado(dia)
+        try:
+            with telemetria.medir('total_day_polling'):
+                if conexao is None:
+                    conexao = conexao_oracle.conectar()
+                resultado = consultar(conexao, estado)
+                if any(entraram or sairam for sairam, entraram in resultado.values()) or ciclo == 1:
+                    with telemetria.etapa('gravar'):
+                        publicar(estado)
+            resumo = ', '.join(f'{visao}: -{sairam}/+{entraram}' for visao, (sairam, entraram) in resultado.items())
+            print(f'[+] Ciclo {ciclo} ({datetime.now():%H:%M:%S}): {resumo} itens em {time.perf_counter() - inicio:.1f}s')
+        except Exception as e:
+            print(f'[!] Ciclo {ciclo}: {conexao_oracle.descrever_erro(e)}')
+            if conexao is not None:
+                try:
+                    conexao.close()
+                except Exception:
+                    pass
+            conexao = None
+        if not ciclos or ciclo < ciclos:
+            time.sleep(max(0, intervalo_min * 60 - (time.perf_counter() - inicio)))
+    if conexao is not None:
+        conexao.close()
+    return estado
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Pedidos do dia por RCA e televendas.')
+    parser.add_argument('--polling', action='store_true', help='Fica consultando só os pedidos alterados e republica os totais.')
+    parser.add_argument('--intervalo-min', type=float, default=5, help='Minutos entre ciclos do polling.')
+    parser.add_argument('--ciclos', type=int, default=0, help='Encerra após N ciclos (0 = até interromper).')
+    args = parser.parse_args()
+
+    if args.polling:
+        executar_polling(args.intervalo_min, args.ciclos)
+    else:
+        # Execução, conexão e gravação ficam no runner de jobs.py
+        import jobs
+        jobs.executar_jobs(['total_day_rca', 'total_day_televenda'])
@@ -1,11 +1,11 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
 import plotly.express as px
-import plotly.graph_objects as go
 import os
-from datetime import datetime
-import gc
+import base_vendas
+import cache_compartilhado
+import indice_filtros
+import manifesto
 
 # Aumentar limite de células para renderização de estilos
 pd.set_option("styler.render.max_elements", 1000000)
@@ -49,125 +49,185 @@ def formata_coluna_moeda(df: pd.DataFrame, colunas: list) -> pd.DataFrame:
                 st.warning(f'Não foi possivel formatar a coluna {coluna} como moeda: {e}')
     return df_formatado
 
-@st.cache_data(show_spinner=False)
-def load_and_clean_dim(path, id_col, colunas_uteis):
-    if not os.path.exists(path): return pd.DataFrame()
-    df = pd.read_parquet(path, columns=[c.upper() for c in colunas_uteis])
-    df.columns = [c.lower() for c in df.columns]
-    id_col = id_col.lower()
-    df[id_col] = pd.to_numeric(df[id_col], errors='coerce').fillna(0).astype(np.int32)
-    df = df.drop_duplicates(subset=[id_col])
-    for col in df.select_dtypes(include=['object']).columns:
-        df[col] = df[col].fillna('N/I').str.strip().str.upper().astype('category')
-    return df
-
-@st.cache_data(show_spinner=False)
-def processar_base_completa():
-    if not os.path.exists('fato_venda.parquet'): return pd.DataFrame()
-    
-    # Otimização de Memória: Carregar apenas colunas necessárias
-    cols_load = ['COD_FILIAL', 'DATA_MOVIMENTACAO', 'NUM_PEDIDO', 'COD_VENDEDOR', 
-                 'COD_SUPERVISOR', 'COD_CLIENTE', 'COD_PRODUTO', 'QT_VENDIDA', 
-                 'VALOR_LIQUIDO', 'ORIGEM_PEDIDO']
-    try:
-        df = pd.read_parquet('fato_venda.parquet', columns=cols_load)
-    except:
-        df = pd.read_parquet('fato_venda.parquet')
-        df.columns = [c.upper() for c in df.columns]
-        df = df[[c for c in cols_load if c in df.columns]]
-        gc.collect()
+def anos_disponiveis():
+    """Anos da última base publicada (um arquivo por ano no ponteiro)."""
+    ponteiro = base_vendas.ultima_publicada()
+    if ponteiro is None: return []
+    return sorted(a for a in map(int, ponteiro['anos']) if a > 0)
 
-    df.columns = [c.upper() for c in df.columns]
-    
-    # Garantir colunas opcionais que podem não vir da query SQL
-    for col in ['COD_SUPERVISOR', 'ORIGEM_PEDIDO']:
-        if col not in df.columns:
-            df[col] = 0 if 'COD' in col else 'N/I'
-    
-    df['DATA_MOVIMENTACAO'] = pd.to_datetime(df['DATA_MOVIMENTACAO'], errors='coerce')
-    df['ANO'] = df['DATA_MOVIMENTACAO'].dt.year.fillna(0).astype(np.int16)
-    df['MES'] = df['DATA_MOVIMENTACAO'].dt.month.fillna(0).astype(np.int8)
-    
-    # Tratamento Financeiro
-    for col in ['QT_VENDIDA', 'VALOR_LIQUIDO']:
-        if df[col].dtype == 'object':
-            df[col] = df[col].str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
-        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(np.float32)
-    
-    # IDs
-    for col in ['COD_FILIAL', 'NUM_PEDIDO', 'COD_VENDEDOR', 'COD_SUPERVISOR', 'COD_CLIENTE', 'COD_PRODUTO']:
-        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(np.int32)
-
-    # Merges Sequenciais para Otimização de RAM
-    df_p = load_and_clean_dim('dim_produto.parquet', 'cod_produto', ['cod_produto', 'nm_produto', 'categoria', 'secao'])
-    df = df.merge(df_p, left_on='COD_PRODUTO', right_on='cod_produto', how='left')
-    del df_p
-    
-    df_c = load_and_clean_dim('dim_cliente.parquet', 'cod_cliente', ['cod_cliente', 'nm_cliente'])
-    df = df.merge(df_c, left_on='COD_CLIENTE', right_on='cod_cliente', how='left')
-    del df_c
-    
-    df_v = load_and_clean_dim('dim_vendedor.parquet', 'cod_vendedor', ['cod_vendedor', 'nm_vendedor'])
-    df = df.merge(df_v, left_on='COD_VENDEDOR', right_on='cod_vendedor', how='left')
-    del df_v
-
-    # Higienização de Strings Final
-    cols_str = ['nm_produto', 'categoria', 'secao', 'nm_cliente', 'nm_vendedor', 'ORIGEM_PEDIDO']
-    for col in cols_str:
-        if col in df.columns:
-            df[col] = df[col].astype(object).fillna('NAO CADASTRADO').astype(str).str.upper().astype('category')
-    
-    return df
+def versao_base():
+    """Versão da última base publicada; None enquanto o agendador não publicar nenhuma."""
+    ponteiro = base_vendas.ultima_publicada()
+    return ponteiro and ponteiro['versao']
 
-# --- 2. LOGICA DE NEGÓCIO ---
+# A base preparada é publicada pelo agendador (nó base_vendas) e mapeada em memória; o painel
+# só lê a última publicação. O cache compartilhado entrega o mesmo DataFrame a todas as sessões
+# e, a cada acesso, confere a versão do ponteiro: publicação nova mapeia os arquivos novos, e a
+# antiga sai do cache. Os índices de clientes e de filtros são montados junto, sobre as mesmas linhas.
+@cache_compartilhado.compartilhado(lambda anos=None: versao_base())
+def processar_base_completa(anos=None):
+    df = base_vendas.abrir(base_vendas.ultima_publicada(), anos)
+    return df, base_vendas.indice_clientes(df), indice_filtros.novo_indice(df)
 
-df_base = processar_base_completa()
-hoje = df_base['DATA_MOVIMENTACAO'].max()
+# O cubo mensal é publicado junto com a base (base_vendas.montar_cubo): a visão executiva
+# agrega milhares de células em vez de todas as linhas de venda.
+@cache_compartilhado.compartilhado(lambda: manifesto.chave_cache(base_vendas.ARQUIVO_CUBO))
+def carregar_cubo():
+    if not os.path.exists(base_vendas.ARQUIVO_CUBO):
+        return pd.DataFrame(columns=base_vendas.DIMENSOES_CUBO + ['VALOR_LIQUIDO', 'QT_VENDIDA', 'PEDIDOS'])
+    return pd.read_parquet(base_vendas.ARQUIVO_CUBO)
+
+# Filtros da barra lateral (coluna da base: rótulo); cada um tem suas listas de posições
+FILTROS_SIDEBAR = {
+    'nm_vendedor': "Filtrar por Vendedor",
+    'COD_SUPERVISOR': "Filtrar por Supervisor",
+    'COD_FILIAL': "Filtrar por Filial",
+    'ORIGEM_PEDIDO': "Filtrar por Origem",
+    'categoria': "Filtrar por Categoria",
+}
+
+# --- 2. LOGICA DE NEGÓCIO ---
 
 # Sidebar Profissional
 with st.sidebar:
     st.image("https://cdn-icons-png.flaticon.com/512/3222/3222800.png", width=80)
     st.title("Filtros Executivos")
-    
-    vendedores = sorted(df_base['nm_vendedor'].unique())
-    f_vendedor = st.multiselect("Filtrar por Vendedor", options=vendedores)
+
+    # Os anos escolhidos definem quais arquivos anuais da base publicada são mapeados (um ano só
+    # é servido sem cópia; vários são concatenados, com RAM proporcional ao período)
+    anos_base = anos_disponiveis()
+    f_anos = st.multiselect("Anos Analisados", options=anos_base, default=anos_base[-2:])
+
+if versao_base() is None:
+    st.error("Base de vendas ainda não publicada: rode `python base_vendas.py` ou aguarde o nó base_vendas do agendador.")
+    st.stop()
+
+df_base, indice_cli, indice_filt = processar_base_completa(tuple(sorted(f_anos)) if f_anos else None)
+hoje = df_base['DATA_MOVIMENTACAO'].max()
+
+with st.sidebar:
+    # Par de anos comparado por todos os painéis (visão executiva, status dos SKUs, erosão de mix):
+    # por padrão os dois mais recentes do período carregado
+    anos_periodo = sorted(f_anos) if f_anos else sorted(int(a) for a in df_base['ANO'].unique() if a > 0)
+    c_ano_ref, c_ano_atual = st.columns(2)
+    ano_ref = c_ano_ref.selectbox("Ano Base", options=anos_periodo, index=max(len(anos_periodo) - 2, 0))
+    ano_atual = c_ano_atual.selectbox("Ano Comparado", options=anos_periodo, index=max(len(anos_periodo) - 1, 0))
+
+    filtros = {coluna: st.multiselect(rotulo, options=indice_filtros.valores_presentes(indice_filt, df_base, coluna))
+               for coluna, rotulo in FILTROS_SIDEBAR.items()}
     
     st.markdown("---")
     st.caption(f"Dados sincronizados até: {hoje.strftime('%d/%m/%Y')}")
 
-# Aplicação de Filtros
-df_f = df_base if not f_vendedor else df_base[df_base['nm_vendedor'].isin(f_vendedor)]
+# Aplicação de Filtros: vetor de seleção pelas listas de posições (None = base inteira)
+selecao = indice_filtros.selecionar(indice_filt, df_base, filtros)
 
-# --- 3. DASHBOARD UI ---
+def recorte(colunas):
+    """Linhas filtradas só das colunas pedidas; sem filtro, a própria base sem cópia."""
+    return indice_filtros.recortar(df_base, selecao, colunas)
 
-tab1, tab2, tab3, tab4 = st.tabs(["🏛️ Gestão de Carteira", "🔍 Raio-X do Cliente", "🎯 Sugestão de Mix", "📅 Evolução de Itens"])
+def linhas_do_cliente(cliente):
+    """Linhas do cliente pelo índice (custo proporcional ao cliente), já restritas aos filtros."""
+    return df_base.take(indice_filtros.restringir(base_vendas.linhas_cliente(indice_cli, cliente), selecao))
+
+clientes_list = base_vendas.clientes_do_indice(indice_cli) if selecao is None else sorted(recorte(['nm_cliente'])['nm_cliente'].unique())
+
+# Resultados memorizados pelos próprios insumos (versão da base, anos, filtros e, quando há, o
+# cliente): trocar o cliente de uma aba não refaz as contas das outras nem as da própria aba
+# que não dependem dele.
+versao = versao_base()
+anos_sel = tuple(sorted(f_anos)) if f_anos else None
+chave_filtros = tuple((coluna, tuple(valores)) for coluna, valores in filtros.items() if valores)
+
+def _base_filtrada(anos, chave_filtros):
+    df, indice_c, indice_f = processar_base_completa(anos)
+    return df, indice_c, indice_filtros.selecionar(indice_f, df, dict(chave_filtros))
+
+def _linhas_cliente(anos, chave_filtros, cliente):
+    df, indice_c, sel = _base_filtrada(anos, chave_filtros)
+    return df.take(indice_filtros.restringir(base_vendas.linhas_cliente(indice_c, cliente), sel))
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def contagens_distintas(versao, anos, chave_filtros):
+    df, _, sel = _base_filtrada(anos, chave_filtros)
+    return indice_filtros.distintos(df, sel, 'COD_CLIENTE'), indice_filtros.distintos(df, sel, 'nm_produto')
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def itens_cliente(versao, anos, chave_filtros, cliente):
+    return _linhas_cliente(anos, chave_filtros, cliente).groupby(['nm_produto', 'categoria'], observed=True).agg(
+        Qtd=('QT_VENDIDA', 'sum'),
+        Total_RS=('VALOR_LIQUIDO', 'sum'),
+        Ultima_Vez=('DATA_MOVIMENTACAO', 'max')
+    ).reset_index().sort_values('Total_RS', ascending=False).head(100)
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def portfolio_categorias(versao, anos, chave_filtros):
+    """Categorias vendidas e o SKU mais vendido de cada uma (produto isca)."""
+    df, _, sel = _base_filtrada(anos, chave_filtros)
+    df_f = indice_filtros.recortar(df, sel, ['categoria', 'nm_produto', 'VALOR_LIQUIDO'])
+    top_vendas = df_f.groupby(['categoria', 'nm_produto'], observed=True)['VALOR_LIQUIDO'].sum().reset_index()
+    top_vendas = top_vendas.sort_values(['categoria', 'VALOR_LIQUIDO'], ascending=[True, False]).drop_duplicates('categoria')
+    return set(df_f['categoria'].unique()), top_vendas
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def erosao_mix(versao, anos, chave_filtros, ano_ref, ano_atual):
+    """Clientes com menos categorias distintas em ano_atual do que em ano_ref."""
+    df, _, sel = _base_filtrada(anos, chave_filtros)
+    df_mix = indice_filtros.recortar(df, sel, ['ANO', 'nm_cliente', 'categoria'])
+    mix_ref = df_mix[df_mix['ANO'] == ano_ref].groupby('nm_cliente', observed=True)['categoria'].nunique()
+    mix_atual = df_mix[df_mix['ANO'] == ano_atual].groupby('nm_cliente', observed=True)['categoria'].nunique()
+    erosao = (mix_ref - mix_atual).reset_index()
+    erosao.columns = ['Cliente', 'Perda_de_Mix']
+    return erosao[erosao['Perda_de_Mix'] > 0].sort_values('Perda_de_Mix', ascending=False).head(20)
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def historico_itens(versao, anos, chave_filtros, cliente):
+    """Produtos x meses (quantidade) do cliente, com total, do mais vendido ao menos vendido."""
+    df_c = _linhas_cliente(anos, chave_filtros, cliente)
+    pivot = df_c.pivot_table(index='nm_produto', columns=['ANO', 'MES'], values='QT_VENDIDA', aggfunc='sum', fill_value=0, observed=True)
+    
+    # Formatando colunas para MM/AAAA
+    pivot.columns = [f"{m:02d}/{y}" for y, m in pivot.columns]
+    
+    # Adicionando Total e Ordenando
+    pivot['Total'] = pivot.sum(axis=1)
+    return pivot.sort_values('Total', ascending=False)
+
+# --- 3. DASHBOARD UI ---
+# Cada aba é um fragmento: interagir com os widgets dela reexecuta só a própria aba.
 
 # --- ABA 1: VISÃO MACRO (EXECUTIVE SUMMARY) ---
-with tab1:
-    st.subheader("Performance Consolidada 2024-2025")
+@st.fragment
+def aba_gestao_carteira():
+    cubo_f = base_vendas.recortar_cubo(carregar_cubo(), f_anos, filtros)
+
+    st.subheader(f"Performance Consolidada {ano_ref}-{ano_atual}")
     
+    # Contagens distintas não somam entre células do cubo: saem da base pela seleção
+    clientes_ativos, skus_ativos = contagens_distintas(versao, anos_sel, chave_filtros)
+
     k1, k2, k3, k4 = st.columns(4)
     with k1:
-        st.metric("Faturamento Líquido", formatar_moeda(df_f['VALOR_LIQUIDO'].sum()))
+        st.metric("Faturamento Líquido", formatar_moeda(cubo_f['VALOR_LIQUIDO'].sum()))
     with k2:
-        st.metric("Clientes Ativos (Total)", df_f['COD_CLIENTE'].nunique())
+        st.metric("Clientes Ativos (Total)", clientes_ativos)
     with k3:
-        fat_25 = df_f[df_f['ANO'] == 2025]['VALOR_LIQUIDO'].sum()
-        fat_24 = df_f[df_f['ANO'] == 2024]['VALOR_LIQUIDO'].sum()
-        delta = ((fat_25 / fat_24) - 1) * 100 if fat_24 > 0 else 0
-        st.metric("Faturamento 2025", formatar_moeda(fat_25), f"{delta:.1f}% YoY")
+        fat_atual = cubo_f.loc[cubo_f['ANO'] == ano_atual, 'VALOR_LIQUIDO'].sum()
+        fat_ref = cubo_f.loc[cubo_f['ANO'] == ano_ref, 'VALOR_LIQUIDO'].sum()
+        delta = ((fat_atual / fat_ref) - 1) * 100 if fat_ref > 0 else 0
+        st.metric(f"Faturamento {ano_atual}", formatar_moeda(fat_atual), f"{delta:.1f}% vs {ano_ref}")
     with k4:
-        st.metric("Mix Ativo", f"{df_f['nm_produto'].nunique()} SKUs")
+        st.metric("Mix Ativo", f"{skus_ativos} SKUs")
 
     st.divider()
     
     c_left, c_right = st.columns([2, 1])
     with c_left:
         st.markdown("**Sazonalidade Comparativa**")
-        evol = df_f.groupby(['ANO', 'MES'])['VALOR_LIQUIDO'].sum().reset_index()
+        evol = cubo_f.groupby(['ANO', 'MES'], observed=True)['VALOR_LIQUIDO'].sum().reset_index()
         evol['VALOR_FMT'] = evol['VALOR_LIQUIDO'].apply(formatar_moeda)
         fig_evol = px.line(evol, x='MES', y='VALOR_LIQUIDO', color='ANO', markers=True, 
-                           color_discrete_map={2024: '#94A3B8', 2025: '#2563EB'},
+                           color_discrete_map={ano_ref: '#94A3B8', ano_atual: '#2563EB'},
                            custom_data=['VALOR_FMT'], text='VALOR_FMT')
         fig_evol.update_layout(plot_bgcolor='rgba(0,0,0,0)', margin=dict(l=0, r=0, t=30, b=0))
         fig_evol.update_traces(hovertemplate="Mês: %{x}<br>Valor: %{customdata[0]}", textposition="top center")
@@ -175,7 +235,7 @@ with tab1:
         
     with c_right:
         st.markdown("**Top 10 Categorias**")
-        cat_data = df_f.groupby('categoria')['VALOR_LIQUIDO'].sum().reset_index().sort_values('VALOR_LIQUIDO', ascending=False).head(10)
+        cat_data = cubo_f.groupby('categoria', observed=True)['VALOR_LIQUIDO'].sum().reset_index().sort_values('VALOR_LIQUIDO', ascending=False).head(10)
         cat_data['VALOR_FMT'] = cat_data['VALOR_LIQUIDO'].apply(formatar_moeda)
         fig_cat = px.bar(cat_data, x='VALOR_LIQUIDO', y='categoria', orientation='h', 
                          color_continuous_scale='Blues', color='VALOR_LIQUIDO', text='VALOR_FMT')
@@ -184,7 +244,7 @@ with tab1:
 
     st.divider()
     st.markdown("**Distribuição por Origem do Pedido**")
-    origem_data = df_f.groupby('ORIGEM_PEDIDO')['VALOR_LIQUIDO'].sum().reset_index()
+    origem_data = cubo_f.groupby('ORIGEM_PEDIDO', observed=True)['VALOR_LIQUIDO'].sum().reset_index()
     origem_data['VALOR_FMT'] = origem_data['VALOR_LIQUIDO'].apply(formatar_moeda)
     
     fig_tree = px.treemap(origem_data, path=['ORIGEM_PEDIDO'], values='VALOR_LIQUIDO',
@@ -194,13 +254,13 @@ with tab1:
     st.plotly_chart(fig_tree, use_container_width=True)
 
 # --- ABA 2: VISÃO MICRO (CUSTOMER DRILL-DOWN) ---
-with tab2:
-    clientes_list = sorted(df_f['nm_cliente'].unique())
+@st.fragment
+def aba_raio_x():
     col_sel, col_empty = st.columns([1, 2])
     cliente_sel = col_sel.selectbox("Selecione o Cliente para Auditoria:", options=clientes_list)
     
     if cliente_sel:
-        df_c = df_f[df_f['nm_cliente'] == cliente_sel]
+        df_c = linhas_do_cliente(cliente_sel)
         
         # Header do Cliente
         st.markdown(f"### 👤 {cliente_sel}")
@@ -221,13 +281,9 @@ with tab2:
         t_l, t_r = st.columns([2, 1])
         with t_l:
             st.markdown("**Performance de SKUs (Top 100)**")
-            itens = df_c.groupby(['nm_produto', 'categoria']).agg(
-                Qtd=('QT_VENDIDA', 'sum'),
-                Total_RS=('VALOR_LIQUIDO', 'sum'),
-                Ultima_Vez=('DATA_MOVIMENTACAO', 'max')
-            ).reset_index().sort_values('Total_RS', ascending=False).head(100)
+            itens = itens_cliente(versao, anos_sel, chave_filtros, cliente_sel)
             
-            itens['Status'] = itens['Ultima_Vez'].apply(lambda x: '🔵 ATIVO' if x.year == 2025 else '🔴 CHURN')
+            itens['Status'] = itens['Ultima_Vez'].apply(lambda x: '🔵 ATIVO' if x.year == ano_atual else '🔴 CHURN')
             itens['Ultima_Vez'] = itens['Ultima_Vez'].dt.strftime('%d/%m/%Y')
             itens = formata_coluna_moeda(itens, ['Total_RS'])
             st.dataframe(itens, use_container_width=True, hide_index=True)
@@ -252,15 +308,16 @@ with tab2:
                 st.info("Sem dados suficientes para exibir o gráfico.")
 
 # --- ABA 3: SUGESTÃO DE MIX (OPPORTUNITY FINDER) ---
-with tab3:
+@st.fragment
+def aba_sugestao_mix():
     st.subheader("🎯 Inteligência Comercial: Cross-Selling")
     
     cliente_mix = st.selectbox("Selecione o Cliente para Sugestão de Venda:", options=clientes_list, key="mix_sel")
     
     if cliente_mix:
         # Lógica Sênior: GAP de Categorias
-        todas_categorias = set(df_f['categoria'].unique())
-        atuais_cli = set(df_f[df_f['nm_cliente'] == cliente_mix]['categoria'].unique())
+        todas_categorias, top_vendas = portfolio_categorias(versao, anos_sel, chave_filtros)
+        atuais_cli = set(linhas_do_cliente(cliente_mix)['categoria'].unique())
         gap = todas_categorias - atuais_cli
         
         col_mix_l, col_mix_r = st.columns([1, 2])
@@ -275,9 +332,6 @@ with tab3:
             st.markdown("#### 💡 Sugestões de Expansão (Porta de Entrada)")
             if gap:
                 # Pegar o Top 1 SKU de cada categoria faltante (baseado na venda geral da empresa)
-                top_vendas = df_f.groupby(['categoria', 'nm_produto'])['VALOR_LIQUIDO'].sum().reset_index()
-                top_vendas = top_vendas.sort_values(['categoria', 'VALOR_LIQUIDO'], ascending=[True, False]).drop_duplicates('categoria')
-                
                 sugestoes = top_vendas[top_vendas['categoria'].isin(gap)].head(8)
                 
                 st.dataframe(sugestoes[['categoria', 'nm_produto']].rename(columns={'categoria':'Categoria Faltante', 'nm_produto':'Produto Isca (Mais Vendido)'}), 
@@ -290,33 +344,20 @@ with tab3:
 
     st.divider()
     st.markdown("#### 🚩 Alertas de Erosão de Mix")
-    # Clientes que tinham mix maior em 2024 do que em 2025
-    mix_24 = df_f[df_f['ANO'] == 2024].groupby('nm_cliente')['categoria'].nunique()
-    mix_25 = df_f[df_f['ANO'] == 2025].groupby('nm_cliente')['categoria'].nunique()
-    erosao = (mix_24 - mix_25).reset_index()
-    erosao.columns = ['Cliente', 'Perda_de_Mix']
-    st.write("Clientes que reduziram a variedade de categorias compradas (Risco de Abandono):")
-    st.dataframe(erosao[erosao['Perda_de_Mix'] > 0].sort_values('Perda_de_Mix', ascending=False).head(20), use_container_width=True, hide_index=True)
+    # Clientes que tinham mix maior no ano base do que no ano comparado
+    st.write(f"Clientes que reduziram a variedade de categorias compradas de {ano_ref} para {ano_atual} (Risco de Abandono):")
+    st.dataframe(erosao_mix(versao, anos_sel, chave_filtros, ano_ref, ano_atual), use_container_width=True, hide_index=True)
 
 # --- ABA 4: EVOLUÇÃO DE ITENS (ITEM HISTORY) ---
-with tab4:
+@st.fragment
+def aba_evolucao_itens():
     st.subheader("📅 Histórico de Compras: Item x Mês")
     
-    clientes_list_4 = sorted(df_f['nm_cliente'].unique())
-    cliente_sel_4 = st.selectbox("Selecione o Cliente:", options=clientes_list_4, key="tab4_cliente")
+    cliente_sel_4 = st.selectbox("Selecione o Cliente:", options=clientes_list, key="tab4_cliente")
     
     if cliente_sel_4:
-        df_c_4 = df_f[df_f['nm_cliente'] == cliente_sel_4]
-        
         # Pivot Table: Produtos x Meses (Quantidade)
-        pivot = df_c_4.pivot_table(index='nm_produto', columns=['ANO', 'MES'], values='QT_VENDIDA', aggfunc='sum', fill_value=0)
-        
-        # Formatando colunas para MM/AAAA
-        pivot.columns = [f"{m:02d}/{y}" for y, m in pivot.columns]
-        
-        # Adicionando Total e Ordenando
-        pivot['Total'] = pivot.sum(axis=1)
-        pivot = pivot.sort_values('Total', ascending=False)
+        pivot = historico_itens(versao, anos_sel, chave_filtros, cliente_sel_4)
         
         # OTIMIZAÇÃO: Limitar visualização para evitar travamento (Top 150 itens)
         limit = 150
@@ -338,4 +379,14 @@ with tab4:
         st.dataframe(styler, use_container_width=True)
         
         if len(pivot) > limit:
-            st.caption(f"ℹ️ A visualização foi limitada aos {limit} itens mais relevantes para manter a velocidade. Use o botão de download para ver tudo.")
\ No newline at end of file
+            st.caption(f"ℹ️ A visualização foi limitada aos {limit} itens mais relevantes para manter a velocidade. Use o botão de download para ver tudo.")
+
+tab1, tab2, tab3, tab4 = st.tabs(["🏛️ Gestão de Carteira", "🔍 Raio-X do Cliente", "🎯 Sugestão de Mix", "📅 Evolução de Itens"])
+with tab1:
+    aba_gestao_carteira()
+with tab2:
+    aba_raio_x()
+with tab3:
+    aba_sugestao_mix()
+with tab4:
+    aba_evolucao_itens()
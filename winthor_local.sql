@@ -0,0 +1,259 @@
+-- --- WINTHOR LOCAL (STAND-IN) ---
+-- Só as tabelas PC* e colunas que as extrações deste repositório leem, com os tipos do
+-- Winthor (NUMBER / VARCHAR2 / DATE). Criado por gerar_winthor_local.py no schema do
+-- usuário da aplicação; não é uma cópia do dicionário completo do Winthor.
+
+CREATE TABLE PCFILIAL (
+    CODIGO          VARCHAR2(2) PRIMARY KEY,
+    RAZAOSOCIAL     VARCHAR2(60)
+);
+
+CREATE TABLE PCEMPR (
+    MATRICULA       NUMBER(8) PRIMARY KEY,
+    NOME            VARCHAR2(40),
+    CODUSUR         NUMBER(4)
+);
+
+CREATE TABLE PCSUPERV (
+    CODSUPERVISOR   NUMBER(4) PRIMARY KEY,
+    NOME            VARCHAR2(40)
+);
+
+CREATE TABLE PCUSUARI (
+    CODUSUR         NUMBER(4) PRIMARY KEY,
+    NOME            VARCHAR2(40),
+    CODSUPERVISOR   NUMBER(4)
+);
+
+CREATE TABLE PCPRACA (
+    CODPRACA        NUMBER(6) PRIMARY KEY,
+    PRACA           VARCHAR2(25)
+);
+
+CREATE TABLE PCCLIENT (
+    CODCLI          NUMBER(9) PRIMARY KEY,
+    CLIENTE         VARCHAR2(60),
+    FANTASIA        VARCHAR2(40),
+    CODCLIPRINC     NUMBER(9),
+    CGCENT          VARCHAR2(18),
+    TIPOFJ          VARCHAR2(1),
+    CODPRACA        NUMBER(6)
+);
+
+CREATE TABLE PCFORNEC (
+    CODFORNEC       NUMBER(6) PRIMARY KEY,
+    FORNECEDOR      VARCHAR2(60),
+    CLASSIFICACAO   VARCHAR2(1),
+    CODCOMPRADOR    NUMBER(8),
+    REVENDA         VARCHAR2(1),
+    CODCLI          NUMBER(9)
+);
+
+CREATE TABLE PCDEPTO (
+    CODEPTO         NUMBER(6) PRIMARY KEY,
+    DESCRICAO       VARCHAR2(25)
+);
+
+CREATE TABLE PCSECAO (
+    CODSEC          NUMBER(6) PRIMARY KEY,
+    CODEPTO         NUMBER(6),
+    DESCRICAO       VARCHAR2(40)
+);
+
+CREATE TABLE PCCATEGORIA (
+    CODCATEGORIA    NUMBER(6),
+    CODSEC          NUMBER(6),
+    CATEGORIA       VARCHAR2(40),
+    CONSTRAINT PK_PCCATEGORIA PRIMARY KEY (CODCATEGORIA, CODSEC)
+);
+
+CREATE TABLE PCMARCA (
+    CODMARCA        NUMBER(8) PRIMARY KEY,
+    MARCA           VARCHAR2(40)
+);
+
+CREATE TABLE PCPRODUT (
+    CODPROD         NUMBER(6) PRIMARY KEY,
+    DESCRICAO       VARCHAR2(40),
+    CODFORNEC       NUMBER(6),
+    CODEPTO         NUMBER(6),
+    CODSEC          NUMBER(6),
+    CODCATEGORIA    NUMBER(6),
+    CODMARCA        NUMBER(8),
+    ESTOQUEPORLOTE  VARCHAR2(1),
+    DTEXCLUSAO      DATE
+);
+
+CREATE TABLE PCPRODFILIAL (
+    CODPROD                 NUMBER(6),
+    CODFILIAL               VARCHAR2(2),
+    ESTOQUEPORDTVALIDADEPK  VARCHAR2(1),
+    CONSTRAINT PK_PCPRODFILIAL PRIMARY KEY (CODPROD, CODFILIAL)
+);
+
+CREATE TABLE PCEST (
+    CODFILIAL       VARCHAR2(2),
+    CODPROD         NUMBER(6),
+    QTESTGER        NUMBER(20,6),
+    QTGIRODIA       NUMBER(20,6),
+    VALORULTENT     NUMBER(18,6),
+    CUSTOULTENT     NUMBER(18,6),
+    DTPRIMCOMPRA    DATE,
+    CONSTRAINT PK_PCEST PRIMARY KEY (CODFILIAL, CODPROD)
+);
+
+CREATE TABLE PCHISTEST (
+    CODFILIAL       VARCHAR2(2),
+    CODPROD         NUMBER(6),
+    DATA            DATE,
+    QTESTGER        NUMBER(20,6),
+    CUSTOREP        NUMBER(18,6)
+);
+CREATE INDEX PCHISTEST_DATA ON PCHISTEST (DATA, CODFILIAL, CODPROD);
+
+CREATE TABLE PCMOV (
+    NUMTRANSITEM    NUMBER(12) PRIMARY KEY,
+    CODOPER         VARCHAR2(2),
+    DTMOV           DATE,
+    DTCANCEL        DATE,
+    CODFILIAL       VARCHAR2(2),
+    NUMPED          NUMBER(10),
+    CODUSUR         NUMBER(4),
+    CODCLI          NUMBER(9),
+    CODFORNEC       NUMBER(6),
+    CODPROD         NUMBER(6),
+    NUMLOTE         VARCHAR2(20),
+    DATAVALIDADE    DATE,
+    QT              NUMBER(20,6),
+    PUNIT           NUMBER(18,6),
+    VLOUTROS        NUMBER(18,6),
+    VLOUTRASDESP    NUMBER(18,6),
+    VLFRETE_RATEIO  NUMBER(18,6),
+    VLREPASSE       NUMBER(18,6),
+    ST              NUMBER(18,6),
+    VLIPI           NUMBER(18,6)
+);
+CREATE INDEX PCMOV_DTMOV ON PCMOV (DTMOV, CODOPER);
+CREATE INDEX PCMOV_NUMPED ON PCMOV (NUMPED);
+
+CREATE TABLE PCPEDC (
+    NUMPED          NUMBER(10) PRIMARY KEY,
+    NUMTRANSVENDA   NUMBER(10),
+    DATA            DATE,
+    DTCANCEL        DATE,
+    CODCLI          NUMBER(9),
+    CODUSUR         NUMBER(4),
+    CODEMITENTE     NUMBER(8),
+    CODFILIAL       VARCHAR2(2),
+    VLTOTAL         NUMBER(18,2),
+    VLATEND         NUMBER(18,2),
+    TIPOFV          VARCHAR2(2),
+    ORIGEMPED       VARCHAR2(1),
+    POSICAO         VARCHAR2(2),
+    CONDVENDA       NUMBER(2)
+);
+CREATE INDEX PCPEDC_DATA ON PCPEDC (DATA);
+
+CREATE TABLE PCPEDI (
+    NUMPED          NUMBER(10),
+    CODPROD         NUMBER(6),
+    NUMSEQ          NUMBER(6),
+    QT              NUMBER(20,6),
+    QTFALTA         NUMBER(20,6),
+    PVENDA          NUMBER(18,6),
+    NUMLOTE         VARCHAR2(20),
+    POSICAO         VARCHAR2(2),
+    CODPROMOCAOMED  NUMBER(10),
+    CONSTRAINT PK_PCPEDI PRIMARY KEY (NUMPED, NUMSEQ)
+);
+
+CREATE TABLE PCPROMOCAOMED (
+    CODPROMOCAOMED      NUMBER(10) PRIMARY KEY,
+    DESCRICAORESUMIDA   VARCHAR2(40)
+);
+
+CREATE TABLE PCCOB (
+    CODCOB          VARCHAR2(4) PRIMARY KEY,
+    COBRANCA        VARCHAR2(30)
+);
+
+CREATE TABLE PCLIB (
+    CODFUNC         NUMBER(8),
+    CODTABELA       VARCHAR2(3),
+    CODIGOA         VARCHAR2(10),
+    CODIGON         NUMBER(10)
+);
+
+CREATE TABLE PCPREST (
+    CODCLI              NUMBER(9),
+    PREST               VARCHAR2(2),
+    DUPLIC              NUMBER(10),
+    VALOR               NUMBER(18,2),
+    DTVENC              DATE,
+    VPAGO               NUMBER(18,2),
+    TXPERM              NUMBER(10,6),
+    DTPAG               DATE,
+    DTEMISSAO           DATE,
+    DTCANCEL            DATE,
+    CODFILIAL           VARCHAR2(2),
+    CODUSUR             NUMBER(4),
+    CODSUPERVISOR       NUMBER(4),
+    CODCOB              VARCHAR2(4),
+    VALORDESC           NUMBER(18,2),
+    VLDEVOL             NUMBER(18,2),
+    DTDEVOL             DATE,
+    NUMTRANSVENDA       NUMBER(10),
+    NUMPED              NUMBER(10),
+    CODEMITENTEPEDIDO   NUMBER(8)
+);
+CREATE INDEX PCPREST_DTEMISSAO ON PCPREST (DTEMISSAO);
+
+CREATE TABLE PCVERBA (
+    NUMVERBA                NUMBER(10) PRIMARY KEY,
+    CODFILIAL               VARCHAR2(2),
+    CODFORNEC               NUMBER(6),
+    CODCONTA                VARCHAR2(10),
+    NUMNOTA                 NUMBER(10),
+    NUMTRANSENTDEVFORNEC    NUMBER(10),
+    DTCADASTRO              DATE,
+    DTVENC                  DATE,
+    DTCANCEL                DATE,
+    REFERENCIA              VARCHAR2(40),
+    REFERENCIA1             VARCHAR2(40),
+    VALOR                   NUMBER(18,2)
+);
+
+CREATE TABLE PCAPLICVERBA (
+    NUMVERBA        NUMBER(10),
+    VLAPLIC         NUMBER(18,2),
+    DTESTORNO       DATE
+);
+
+CREATE TABLE PCMOVCRFOR (
+    NUMVERBA        NUMBER(10),
+    TIPO            VARCHAR2(1),
+    VALOR           NUMBER(18,6),
+    DTESTORNO       DATE
+);
+
+CREATE TABLE PCENDERECO (
+    CODENDERECO     NUMBER(10) PRIMARY KEY,
+    CODFILIAL       VARCHAR2(2),
+    TIPOENDER       VARCHAR2(2)
+);
+
+CREATE TABLE PCESTENDERECO (
+    CODENDERECO     NUMBER(10),
+    CODPROD         NUMBER(6),
+    QT              NUMBER(20,6),
+    DTVAL           DATE,
+    CONSTRAINT PK_PCESTENDERECO PRIMARY KEY (CODENDERECO, CODPROD)
+);
+
+CREATE TABLE PCESTENDERECOI (
+    CODENDERECO     NUMBER(10),
+    CODPROD         NUMBER(6),
+    NUMLOTE         VARCHAR2(20),
+    QT              NUMBER(20,6),
+    DTVAL           DATE
+);